@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so session and authentication queries are measured too
+    'projects.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,7 +50,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'projects.middleware.NotificationMiddleware',
+    'projects.middleware.ChromeContextMiddleware',
+    'projects.middleware.PermissionResolverMiddleware',
 ]
 
 ROOT_URLCONF = 'project_management_system.urls'
@@ -66,8 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'projects.views.base_context',
-                'projects.context_processors.notification_context',
+                'projects.context_processors.chrome_context',
             ],
         },
     },
@@ -182,3 +184,79 @@ CACHES = {
         'LOCATION': 'unique-snowflake',
     }
 }
+
+# Conditional GET versions (utils.versions) live in CACHES['versions'], or the
+# default cache without one. Every process must see the same versions, so use
+# a shared backend (Redis, Memcached, database) when running more than one
+# process; in a process-local cache they expire after VERSION_LOCAL_TIMEOUT
+# seconds instead (reported by check --deploy as projects.W001)
+VERSION_LOCAL_TIMEOUT = 60
+
+# Notification outbox: 'thread' writes queued notifications from a background
+# worker in this process, 'sync' writes them right after the transaction commits.
+# None picks 'sync' on SQLite, whose single writer would lock the thread worker
+# out, and 'thread' elsewhere. Failed batches are retried with backoff, then
+# handed to the job queue; if that cannot be written either they are appended
+# to the spool file and written once the database is back
+NOTIFICATION_OUTBOX_WORKER = None
+NOTIFICATION_OUTBOX_SPOOL = BASE_DIR / 'notification_outbox.jsonl'
+NOTIFICATION_OUTBOX_BATCH_SIZE = 500
+NOTIFICATION_OUTBOX_RETRIES = 3
+NOTIFICATION_OUTBOX_RETRY_DELAY = 0.5  # seconds, doubled per retry
+
+# Notification retention (prune_notifications command): notifications older
+# than the retention period are deleted, or archived when ARCHIVE is on, in
+# primary-key batches; each user keeps at least KEEP_PER_USER of their newest
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_RETENTION_KEEP_PER_USER = 20
+NOTIFICATION_RETENTION_ARCHIVE = False
+NOTIFICATION_RETENTION_BATCH_SIZE = 1000
+
+# Background jobs (run_workers command): slow side effects such as emails,
+# report generation and file deletes are queued after commit and run by a
+# pool of workers, retried with exponential backoff. 'sync' runs them right
+# after the commit instead, without a worker
+JOB_QUEUE_MODE = 'queue'
+JOB_QUEUE_WORKERS = 4
+JOB_QUEUE_POLL_INTERVAL = 1  # seconds
+JOB_QUEUE_MAX_ATTEMPTS = 5
+JOB_QUEUE_RETRY_BASE = 30  # seconds, doubled per attempt
+JOB_QUEUE_RETRY_MAX = 3600
+JOB_QUEUE_LOCK_TIMEOUT = 600  # running jobs older than this are requeued
+JOB_QUEUE_RELEASE_INTERVAL = 60  # seconds between each worker's stale job checks
+JOB_QUEUE_KEEP_DAYS = 7
+
+# Email dispatch (send_queued_emails command, or a job after each queue):
+# queued emails are sent in batches over one SMTP connection per batch
+EMAIL_DISPATCH_BATCH_SIZE = 100
+EMAIL_DISPATCH_MAX_ATTEMPTS = 5
+EMAIL_DISPATCH_LOCK_TIMEOUT = 600  # sending emails older than this are requeued
+
+# Streaming exports (exports/<name>/<format>/ and the export_data command):
+# rows are read from the database in chunks of this many
+EXPORT_CHUNK_SIZE = 2000
+
+# Bulk team onboarding (teams/<id>/members/import/ and the import_team_members
+# command): passwords are hashed across HASH_WORKERS processes (None: one per
+# CPU) and rows are inserted BATCH_SIZE at a time
+TEAM_ONBOARDING_HASH_WORKERS = None
+TEAM_ONBOARDING_BATCH_SIZE = 500
+
+# Batch task changes (api/tasks/batch/): most tasks changed in one request
+TASK_BATCH_MAX_SIZE = 500
+
+# Kanban ordering (api/tasks/<id>/reorder/): a column is rebalanced by a job
+# once a move produces a rank longer than this (rebalance_task_ranks command)
+TASK_RANK_MAX_LENGTH = 32
+
+# Notification stream (Server-Sent Events, needs an ASGI server). The channel
+# fans changes out to streams; use projects.utils.streams.RedisChannel with
+# NOTIFICATION_STREAM_REDIS_URL when running more than one process
+NOTIFICATION_STREAM_CHANNEL = 'projects.utils.streams.LocalChannel'
+NOTIFICATION_STREAM_HEARTBEAT = 25  # seconds
+NOTIFICATION_STREAM_MAX_AGE = 600  # seconds
+
+# Query instrumentation (projects.middleware.QueryBudgetMiddleware). Per-view
+# budgets live in projects/urls.py; Server-Timing exposes SQL figures to
+# anyone who can load a page, so it is only on in development by default
+QUERY_BUDGET_SERVER_TIMING = DEBUG
@@ -3,8 +3,11 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django.contrib import messages
 from django import forms
+from django.utils import timezone
 from django.forms.models import BaseInlineFormSet
-from .models import User, Team, TeamMember, Project, Task, File, Notification, ProjectReport, Profile
+from .models import User, Team, TeamMember, Project, Task, File, Notification, ArchivedNotification, ProjectReport, Profile, ProjectAccess, DailyTaskStats, Job, OutgoingEmail
+from .utils.chrome import invalidate_header
+from .utils.counters import update_read_state
 
 class ProfileInline(admin.StackedInline):
     model = Profile
@@ -99,16 +102,61 @@ class NotificationAdmin(admin.ModelAdmin):
 
     @admin.action(description='Mark selected as read')
     def mark_as_read(self, request, queryset):
-        queryset.update(read=True)
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
+        update_read_state(queryset, read=True)
+        invalidate_header(*user_ids)
 
     @admin.action(description='Mark selected as unread')
     def mark_as_unread(self, request, queryset):
-        queryset.update(read=False)
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
+        update_read_state(queryset, read=False)
+        invalidate_header(*user_ids)
 
     actions = [mark_as_read, mark_as_unread]
 
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'message', 'created_at', 'archived_at', 'read')
+    list_filter = ('action_type', 'archived_at')
+    search_fields = ['user__username', 'message']
+
 @admin.register(ProjectReport)
 class ProjectReportAdmin(admin.ModelAdmin):
-    list_display = ('project', 'generated_on')
-    search_fields = ['project__name']
-    list_filter = ('project', 'generated_on')
\ No newline at end of file
+    list_display = ('__str__', 'report_type', 'generated_by', 'status', 'generated_on', 'completed_at')
+    search_fields = ['project__name', 'generated_by__username']
+    list_filter = ('report_type', 'status', 'generated_on')
+    readonly_fields = ('data', 'data_version', 'error', 'completed_at')
+@admin.register(ProjectAccess)
+class ProjectAccessAdmin(admin.ModelAdmin):
+    list_display = ('user', 'project', 'team', 'role')
+    search_fields = ['user__username', 'project__name']
+    list_filter = ('role',)
+
+@admin.register(DailyTaskStats)
+class DailyTaskStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'team', 'project', 'user', 'status', 'created_count', 'completed_count')
+    list_filter = ('status', 'date')
+    search_fields = ['user__username', 'project__name']
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('func', 'status', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'func')
+    search_fields = ['func', 'last_error']
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at')
+
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=Job.STATUS_RUNNING).update(
+            status=Job.STATUS_QUEUED, attempts=0, run_at=timezone.now(), finished_at=None
+        )
+        messages.success(request, f"{updated} jobs queued again")
+    retry_jobs.short_description = "Run selected jobs again"
+
+    actions = [retry_jobs]
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'template')
+    search_fields = ['to_email', 'subject']
+    readonly_fields = ('attempts', 'claimed_by', 'claimed_at', 'last_error', 'created_at', 'sent_at')
@@ -0,0 +1,18 @@
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def check_version_cache(app_configs, **kwargs):
+    """Conditional GET versions must be shared by every web process"""
+    from .utils.versions import version_cache_alias, version_cache_is_shared
+    if version_cache_is_shared():
+        return []
+    return [Warning(
+        f"Versions are stored in the process-local cache {version_cache_alias()!r}.",
+        hint=(
+            "With more than one process a bump in one is invisible to the others until "
+            "VERSION_LOCAL_TIMEOUT expires. Configure CACHES['versions'] (or the default "
+            "cache) with a shared backend such as Redis, Memcached or the database cache."
+        ),
+        id='projects.W001',
+    )]
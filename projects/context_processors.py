@@ -1,15 +1,9 @@
-from .models import Notification
+from .utils.chrome import get_chrome
 
-def notification_context(request):
-    """Add notifications to template context"""
+def chrome_context(request):
+    """Add lazily evaluated header/sidebar data to template context"""
     if request.user.is_authenticated:
-        notifications = (request.user.notifications
-                       .select_related('content_type')
-                       .order_by('-created_at')[:5])
-        return {
-            'notifications': notifications,
-            'unread_notifications_count': request.user.notifications.filter(read=False).count()
-        }
+        return get_chrome(request).as_context()
     return {
         'notifications': [],
         'unread_notifications_count': 0
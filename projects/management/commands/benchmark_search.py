@@ -0,0 +1,105 @@
+import itertools
+import random
+import sqlite3
+import time
+from django.core.management.base import BaseCommand, CommandError
+from projects.utils.search import fts5_expression, parse_query
+
+SYLLABLES = 'ka lo mi ne ru sa ti vo ba de fi gu ha je ko lu ma no pe qi ra se tu vi wa xo ye zu'.split()
+VOCABULARY_SIZE = 20000
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare substring (icontains) and FTS5 prefix search latency on synthetic '
+        'task tables of increasing size, in a scratch in-memory SQLite database. '
+        'The application database is not touched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 100000, 1000000],
+            help='Numbers of tasks to benchmark'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=20,
+            help='Number of sample queries per size'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = sorted({
+            ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(VOCABULARY_SIZE)
+        })
+        # Zipf-like word frequencies, as in real task text
+        self.cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+        self.vocabulary = vocabulary
+        # Typed prefixes of random words, as sent by the search box
+        queries = [
+            rng.choice(vocabulary)[:rng.randint(3, 6)]
+            for _ in range(options['queries'])
+        ]
+        self.stdout.write(f"{'tasks':>10} {'icontains ms':>14} {'fts5 ms':>10} {'speedup':>8}")
+        for size in options['sizes']:
+            db = sqlite3.connect(':memory:')
+            try:
+                self._populate(db, size, rng)
+            except sqlite3.OperationalError as e:
+                raise CommandError(f"SQLite FTS5 is not available: {e}")
+            like_ms = self._time(db, queries, self._like_search)
+            fts_ms = self._time(db, queries, self._fts_search)
+            db.close()
+            self.stdout.write(
+                f"{size:>10} {like_ms:>14.2f} {fts_ms:>10.2f} {like_ms / max(fts_ms, 0.001):>7.1f}x"
+            )
+
+    def _populate(self, db, size, rng):
+        db.execute(
+            "CREATE TABLE task (id INTEGER PRIMARY KEY, title TEXT, description TEXT, created_at INTEGER)"
+        )
+        db.execute(
+            "CREATE VIRTUAL TABLE task_fts USING fts5(title, description, content='task', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        batch = []
+        for i in range(1, size + 1):
+            batch.append((
+                i,
+                ' '.join(rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=4)),
+                ' '.join(rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=20)),
+                i
+            ))
+            if len(batch) == 10000:
+                db.executemany("INSERT INTO task VALUES (?, ?, ?, ?)", batch)
+                batch = []
+        db.executemany("INSERT INTO task VALUES (?, ?, ?, ?)", batch)
+        db.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+        db.commit()
+
+    def _like_search(self, db, query):
+        terms = parse_query(query)
+        where = ' AND '.join(['(title LIKE ? OR description LIKE ?)'] * len(terms))
+        params = [p for term in terms for p in (f'%{term}%', f'%{term}%')]
+        # Same shape as the ORM query: Task.Meta orders by -created_at
+        return db.execute(
+            f"SELECT id FROM task WHERE {where} ORDER BY created_at DESC LIMIT 5", params
+        ).fetchall()
+
+    def _fts_search(self, db, query):
+        return db.execute(
+            "SELECT rowid FROM task_fts WHERE task_fts MATCH ? "
+            "ORDER BY bm25(task_fts, 10.0, 1.0) LIMIT 5",
+            [fts5_expression(parse_query(query))]
+        ).fetchall()
+
+    def _time(self, db, queries, search):
+        start = time.perf_counter()
+        for query in queries:
+            search(db, query)
+        return (time.perf_counter() - start) * 1000 / len(queries)
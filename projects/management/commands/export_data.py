@@ -0,0 +1,42 @@
+import gzip
+from django.core.management.base import BaseCommand, CommandError
+from projects.utils.exports import EXPORT_FORMATS, EXPORTS, export_chunks, parse_export_filters
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream tasks, projects, team membership or notification history of all '
+        'users to a CSV or JSON file in constant memory, e.g. for audits'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('export', choices=sorted(EXPORTS), help='What to export')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', help='Output format')
+        parser.add_argument('--team', type=int, help='Only rows of this team')
+        parser.add_argument('--project', type=int, help='Only rows of this project')
+        parser.add_argument('--start', help='Only rows created on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Only rows created on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output file')
+
+    def handle(self, *args, **options):
+        try:
+            filters = parse_export_filters(options)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = export_chunks(options['export'], options['format'], **filters)
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        opener = gzip.open if options['gzip'] else open
+        size = 0
+        with opener(options['output'], 'wt', encoding='utf-8', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {options['export']} to {options['output']} ({size} characters)"
+        ))
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from projects.models import User
+from projects.utils.imports import ImportFormatError, import_tasks, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Import tasks from a CSV or JSON file, validating and inserting them in '
+        'batches. Columns: project (id), title, assigned_to (username or email), '
+        'start_date, due_date, and optionally description, status and priority'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file to import')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='File format (default: from the file extension)'
+        )
+        parser.add_argument(
+            '--as-user',
+            help='Username whose permissions apply (default: no permission check)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows validated and inserted per batch'
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='Import the valid rows even if some rows fail'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate without importing anything'
+        )
+
+    def handle(self, *args, **options):
+        importer = None
+        if options['as_user']:
+            try:
+                importer = User.objects.get(username=options['as_user'])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user: {options['as_user']}")
+
+        import_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        try:
+            with open(options['path'], 'rb') as source:
+                rows = read_rows(source, import_format)
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        result = import_tasks(
+            rows,
+            importer=importer,
+            batch_size=options['batch_size'],
+            skip_invalid=options['skip_invalid'],
+            dry_run=options['dry_run']
+        )
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {'; '.join(error['errors'])}")
+        verb = 'Validated' if options['dry_run'] else f"Imported {result['created']} of"
+        summary = (
+            f"{verb} {result['rows']} tasks ({result['failed']} invalid) "
+            f"in {result['seconds']}s ({result['rows_per_second']} rows/s)"
+        )
+        if result['failed'] and not options['skip_invalid']:
+            raise CommandError(f"{summary}; nothing was imported")
+        self.stdout.write(self.style.SUCCESS(summary))
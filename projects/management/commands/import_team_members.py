@@ -0,0 +1,86 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from projects.models import Team, User
+from projects.utils.imports import ImportFormatError, read_rows
+from projects.utils.onboarding import provision_team_members
+
+
+class Command(BaseCommand):
+    help = (
+        'Create accounts for a CSV or JSON roster and add them to a team, hashing '
+        'passwords across a process pool. Columns: username, email, and optionally '
+        'password, first_name and last_name'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('team_id', type=int, help='Team the members join')
+        parser.add_argument('path', help='CSV or JSON roster file')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='File format (default: from the file extension)'
+        )
+        parser.add_argument(
+            '--as-user',
+            help='Username adding the members (default: no permission check)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Password hashing processes (default: TEAM_ONBOARDING_HASH_WORKERS)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows validated and inserted per batch'
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='Create the valid rows even if some rows fail'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate without creating anything'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            team = Team.objects.select_related('owner').get(pk=options['team_id'])
+        except Team.DoesNotExist:
+            raise CommandError(f"Unknown team: {options['team_id']}")
+        created_by = None
+        if options['as_user']:
+            try:
+                created_by = User.objects.get(username=options['as_user'])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user: {options['as_user']}")
+
+        import_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        try:
+            with open(options['path'], 'rb') as source:
+                rows = read_rows(source, import_format, key='members')
+            result = provision_team_members(
+                team, rows,
+                created_by=created_by,
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                skip_invalid=options['skip_invalid'],
+                dry_run=options['dry_run']
+            )
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {'; '.join(error['errors'])}")
+        verb = 'Validated' if options['dry_run'] else f"Added {result['created']} of"
+        summary = (
+            f"{verb} {result['rows']} members to {team.name} ({result['failed']} invalid) "
+            f"in {result['seconds']}s ({result['rows_per_second']} rows/s)"
+        )
+        if result['failed'] and not options['skip_invalid']:
+            raise CommandError(f"{summary}; nothing was created")
+        self.stdout.write(self.style.SUCCESS(summary))
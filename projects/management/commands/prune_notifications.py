@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from projects.utils.retention import prune_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete or archive notifications past the retention period in primary-key '
+        'batches, keeping a minimum of recent notifications per user. Meant to run '
+        'periodically, e.g. nightly from cron'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Retention period (default: NOTIFICATION_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            help='Newest notifications kept per user regardless of age '
+                 '(default: NOTIFICATION_RETENTION_KEEP_PER_USER)'
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            default=None,
+            help='Move rows to the archive table instead of only deleting them'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows per batch (default: NOTIFICATION_RETENTION_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Stop after this many batches; the next run resumes'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be removed without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        verbose = options['verbosity'] > 1
+
+        def report(totals):
+            if verbose:
+                self.stdout.write(
+                    f"Batch {totals['batches']}: {totals['removed']} removed, {totals['kept']} kept, "
+                    f"{totals['rows_per_second']} rows/s"
+                )
+
+        result = prune_notifications(
+            days=options['days'],
+            keep_per_user=options['keep'],
+            archive=options['archive'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+            progress=report
+        )
+        prefix = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {result['removed']} notifications ({result['archived']} archived), "
+            f"kept {result['kept']} of {result['scanned']} scanned in {result['batches']} batches, "
+            f"{result['seconds']}s ({result['rows_per_second']} rows/s)"
+        ))
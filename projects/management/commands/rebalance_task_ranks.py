@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from projects.utils.kanban import rebalance_long_ranks
+
+
+class Command(BaseCommand):
+    help = 'Respace the Kanban ranks of every column holding a rank longer than the limit'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-length',
+            type=int,
+            help='Longest rank left alone (default: TASK_RANK_MAX_LENGTH)'
+        )
+
+    def handle(self, *args, **options):
+        result = rebalance_long_ranks(max_length=options['max_length'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebalanced {result['tasks']} tasks in {result['columns']} columns"
+        ))
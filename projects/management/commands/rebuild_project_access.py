@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from projects.utils.access import rebuild_project_access
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the project access index from teams, projects and tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows inserted per batch'
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_project_access(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt project access index ({written} rows)"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from projects.utils.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from teams, projects and tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of documents inserted per batch'
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index ({written} documents)"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from projects.utils.rollups import reconcile_task_stats
+
+
+class Command(BaseCommand):
+    help = 'Backfill the daily task rollup and repair any drift from the task table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report differences without changing anything'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows written per batch'
+        )
+
+    def handle(self, *args, **options):
+        result = reconcile_task_stats(
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size']
+        )
+        prefix = 'Would reconcile' if options['dry_run'] else 'Reconciled'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} daily task stats: {result['created']} created, "
+            f"{result['updated']} updated, {result['deleted']} deleted"
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from projects.utils.counters import repair_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the member, project and task counters of teams and projects and the unread notification counts of users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report differences without changing anything'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows written per batch'
+        )
+
+    def handle(self, *args, **options):
+        result = repair_counters(
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size']
+        )
+        prefix = 'Would repair' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} counters: {result['teams']} teams, {result['projects']} projects, {result['users']} users"
+        ))
@@ -0,0 +1,63 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from projects.utils.benchmarks import compare_reports, run_benchmarks
+from projects.utils.seeding import SCALES
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the key views against seeded data at several scales and write a JSON report. '
+        'Each scale runs in a scratch test database; the configured database is not touched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            nargs='+',
+            choices=sorted(SCALES),
+            default=['small', 'medium'],
+            help='Volume presets to benchmark'
+        )
+        parser.add_argument('--repeat', type=int, default=10, help='Timed requests per view')
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--output',
+            default='benchmark-report.json',
+            help='Where to write the JSON report'
+        )
+        parser.add_argument('--compare', help='Previous report to compare medians against')
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as report_file:
+                    previous = json.load(report_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        report = run_benchmarks(
+            scales=options['scales'],
+            repeat=options['repeat'],
+            cold=options['cold'],
+            seed=options['seed']
+        )
+        with open(options['output'], 'w') as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+
+        self.stdout.write(f"{'scale':<8} {'view':<18} {'median ms':>10} {'p95 ms':>8} {'queries':>8}")
+        for scale, result in report['scales'].items():
+            for view, figures in result['views'].items():
+                self.stdout.write(
+                    f"{scale:<8} {view:<18} {figures['median_ms']:>10.2f} "
+                    f"{figures['p95_ms']:>8.2f} {figures['queries']:>8}"
+                )
+        if previous:
+            self.stdout.write(f"\nChange against {options['compare']}:")
+            for scale, view, old_ms, new_ms, change, old_queries, new_queries in compare_reports(previous, report):
+                self.stdout.write(
+                    f"{scale:<8} {view:<18} {old_ms:>9.2f} -> {new_ms:<9.2f} {change:>+7.1f}% "
+                    f"queries {old_queries} -> {new_queries}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
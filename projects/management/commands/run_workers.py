@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from projects.utils.jobs import purge_finished_jobs, run_workers
+
+
+class Command(BaseCommand):
+    help = (
+        'Run background jobs (emails, reports, file cleanup) with a pool of '
+        'worker threads or processes until interrupted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of workers (default: JOB_QUEUE_WORKERS)'
+        )
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help='Run workers as processes instead of threads, for CPU-bound jobs'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Seconds an idle worker waits before checking again (default: JOB_QUEUE_POLL_INTERVAL)'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no due jobs are left, e.g. when run from cron'
+        )
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help='Delete jobs finished more than JOB_QUEUE_KEEP_DAYS ago before starting'
+        )
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            purged = purge_finished_jobs()
+            self.stdout.write(f"Purged {purged} finished jobs")
+        run_workers(
+            workers=options['workers'],
+            processes=options['processes'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst']
+        )
+        self.stdout.write(self.style.SUCCESS('Job workers stopped'))
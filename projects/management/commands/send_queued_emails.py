@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from projects.utils.email import dispatch_emails
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails in batches, one SMTP connection per batch, and report throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Emails per connection (default: EMAIL_DISPATCH_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Stop after this many batches'
+        )
+
+    def handle(self, *args, **options):
+        result = dispatch_emails(batch_size=options['batch_size'], max_batches=options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {result['sent']} emails in {result['batches']} batches "
+            f"({result['retried']} to retry, {result['failed']} failed), "
+            f"{result['seconds']}s ({result['emails_per_second']} emails/s)"
+        ))
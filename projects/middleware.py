@@ -1,17 +1,71 @@
-from .models import Notification
+from django.conf import settings
+import json
+import logging
+from .utils.chrome import ChromeContext
+from .utils.permissions import PermissionResolver
+from .utils.querybudget import budget_for, query_stats_recorded, record_queries
 
-class NotificationMiddleware:
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+class QueryBudgetMiddleware:
+    """
+    Measure the queries of every request: count, SQL time and repeated query
+    shapes. Logs one structured record per request (a warning when the URL's
+    budget in projects.urls.QUERY_BUDGETS is exceeded) and, with
+    QUERY_BUDGET_SERVER_TIMING, adds a Server-Timing header for browser devtools.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'QUERY_BUDGET_SERVER_TIMING', settings.DEBUG)
+
+    def __call__(self, request):
+        with record_queries() as stats:
+            response = self.get_response(request)
+
+        budget = budget_for(request)
+        match = getattr(request, 'resolver_match', None)
+        payload = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.url_name if match else None,
+            'status': response.status_code,
+            'budget': budget,
+            **stats.as_dict(),
+        }
+        over_budget = budget is not None and stats.count > budget
+        level = logging.WARNING if over_budget else logging.DEBUG
+        # Serializing every request is wasted work when nobody listens
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps(payload), extra={'query_stats': payload})
+        if self.server_timing:
+            timing = stats.server_timing()
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = f"{existing}, {timing}" if existing else timing
+        query_stats_recorded.send(sender=self.__class__, request=request, stats=stats)
+        return response
+
+class ChromeContextMiddleware:
+    """Attach a lazy, request-scoped ChromeContext; no queries run here"""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.chrome = ChromeContext(request.user)
+        return self.get_response(request)
+
+class PermissionResolverMiddleware:
+    """Attach a request-scoped PermissionResolver to request and request.user"""
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
+        resolver = PermissionResolver(request.user)
+        request.permissions = resolver
         if request.user.is_authenticated:
-            request.notifications = request.user.notifications.select_related(
-                'content_type'
-            ).order_by('-created_at')[:5]
-            request.unread_notifications_count = request.user.notifications.filter(
-                read=False
-            ).count()
+            # Module-level checks such as has_project_permission(user, ...)
+            # find the resolver through the user object
+            request.user._permission_resolver = resolver
         return self.get_response(request)
 
 class PermissionLoggingMiddleware:
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-18 01:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_project_access(apps, schema_editor):
+    # Historical models only: the live access helpers import the live models
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    TeamMember = apps.get_model('projects', 'TeamMember')
+    ProjectAccess = apps.get_model('projects', 'ProjectAccess')
+
+    members_by_team = {}
+    for team_id, user_id in TeamMember.objects.values_list('team_id', 'user_id'):
+        members_by_team.setdefault(team_id, []).append(user_id)
+
+    def rows():
+        projects = Project.objects.values_list('id', 'team_id', 'team__owner_id', 'manager_id')
+        for project_id, team_id, owner_id, manager_id in projects.iterator():
+            if owner_id:
+                yield ProjectAccess(user_id=owner_id, project_id=project_id, team_id=team_id, role='owner')
+            if manager_id:
+                yield ProjectAccess(user_id=manager_id, project_id=project_id, team_id=team_id, role='manager')
+            for user_id in members_by_team.get(team_id, []):
+                yield ProjectAccess(user_id=user_id, project_id=project_id, team_id=team_id, role='member')
+        assignees = Task.objects.values_list('project_id', 'project__team_id', 'assigned_to_id').distinct()
+        for project_id, team_id, user_id in assignees.iterator():
+            if user_id:
+                yield ProjectAccess(user_id=user_id, project_id=project_id, team_id=team_id, role='assignee')
+
+    ProjectAccess.objects.bulk_create(rows(), batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0021_alter_teammember_created_by'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Team Owner'), ('manager', 'Project Manager'), ('member', 'Team Member'), ('assignee', 'Task Assignee')], max_length=20)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_entries', to='projects.project')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_entries', to='projects.team')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'project access',
+                'indexes': [models.Index(fields=['user', 'role', 'project'], name='projects_pr_user_id_b4a59b_idx'), models.Index(fields=['team', 'role'], name='projects_pr_team_id_ca6b7b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'project', 'role'), name='unique_project_access_role')],
+            },
+        ),
+        migrations.RunPython(backfill_project_access, migrations.RunPython.noop),
+    ]
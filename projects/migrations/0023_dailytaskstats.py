@@ -0,0 +1,67 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_daily_task_stats(apps, schema_editor):
+    # Historical models only: the live rollup helpers import the live models
+    Task = apps.get_model('projects', 'Task')
+    DailyTaskStats = apps.get_model('projects', 'DailyTaskStats')
+    tz = timezone.get_current_timezone()
+    fields = ('day', 'project__team_id', 'project_id', 'assigned_to_id', 'status')
+
+    stats = {}
+    created = (
+        Task.objects.annotate(day=TruncDate('created_at', tzinfo=tz))
+        .values_list(*fields).annotate(count=Count('pk')).order_by()
+    )
+    for *key, count in created.iterator():
+        stats.setdefault(tuple(key), {'created_count': 0, 'completed_count': 0})['created_count'] = count
+    completed = (
+        Task.objects.filter(status='done', completed_at__isnull=False)
+        .annotate(day=TruncDate('completed_at', tzinfo=tz))
+        .values_list(*fields).annotate(count=Count('pk')).order_by()
+    )
+    for *key, count in completed.iterator():
+        stats.setdefault(tuple(key), {'created_count': 0, 'completed_count': 0})['completed_count'] = count
+
+    DailyTaskStats.objects.bulk_create([
+        DailyTaskStats(date=day, team_id=team_id, project_id=project_id, user_id=user_id, status=status, **counts)
+        for (day, team_id, project_id, user_id, status), counts in stats.items()
+        if team_id and project_id and user_id
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0022_projectaccess'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTaskStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('todo', 'To Do'), ('inprogress', 'In Progress'), ('done', 'Done')], max_length=20)),
+                ('created_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_task_stats', to='projects.project')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_task_stats', to='projects.team')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_task_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'daily task stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['user', 'date'], name='projects_da_user_id_164a36_idx'), models.Index(fields=['team', 'date'], name='projects_da_team_id_2fc671_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'team', 'project', 'user', 'status'), name='unique_daily_task_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_task_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0023_dailytaskstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The full-text schema is written out here rather than imported from
+# projects.utils.search, which loads the live models
+FTS_TABLE = 'projects_search_fts'
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(projects_searchdocument.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(projects_searchdocument.body, '')), 'B')"
+)
+SQLITE_SETUP = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"title, body, content='projects_searchdocument', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS projects_search_ai AFTER INSERT ON projects_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS projects_search_ad AFTER DELETE ON projects_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS projects_search_au AFTER UPDATE ON projects_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+SQLITE_TEARDOWN = [
+    "DROP TRIGGER IF EXISTS projects_search_au",
+    "DROP TRIGGER IF EXISTS projects_search_ad",
+    "DROP TRIGGER IF EXISTS projects_search_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+PG_SETUP = [
+    f"CREATE INDEX IF NOT EXISTS projects_search_vector_idx ON projects_searchdocument USING GIN (({PG_VECTOR}))",
+]
+PG_TEARDOWN = [
+    "DROP INDEX IF EXISTS projects_search_vector_idx",
+]
+
+
+def _sqlite_has_fts5(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def install_search_backend(apps, schema_editor):
+    """Create the FTS5 table or tsvector index for the current database"""
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite' and _sqlite_has_fts5(cursor):
+            statements = SQLITE_SETUP
+        elif vendor == 'postgresql':
+            statements = PG_SETUP
+        else:
+            # Search falls back to substring matching
+            return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall_search_backend(apps, schema_editor):
+    statements = {'sqlite': SQLITE_TEARDOWN, 'postgresql': PG_TEARDOWN}.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def backfill_search_documents(apps, schema_editor):
+    Team = apps.get_model('projects', 'Team')
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    SearchDocument = apps.get_model('projects', 'SearchDocument')
+
+    def documents():
+        for pk, name, description in Team.objects.values_list('id', 'name', 'description').iterator():
+            yield SearchDocument(kind='team', object_id=pk, title=name, body=description or '', team_id=pk)
+        projects = Project.objects.values_list('id', 'name', 'description', 'team_id')
+        for pk, name, description, team_id in projects.iterator():
+            yield SearchDocument(kind='project', object_id=pk, title=name, body=description or '',
+                                 project_id=pk, team_id=team_id)
+        tasks = Task.objects.values_list('id', 'title', 'description', 'project_id', 'project__team_id')
+        for pk, title, description, project_id, team_id in tasks.iterator():
+            yield SearchDocument(kind='task', object_id=pk, title=title, body=description or '',
+                                 project_id=project_id, team_id=team_id)
+
+    SearchDocument.objects.bulk_create(documents(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0024_notification_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('task', 'Task'), ('team', 'Team')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='projects.project')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='projects.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'project'], name='projects_se_kind_fbe096_idx'), models.Index(fields=['kind', 'team'], name='projects_se_kind_90457a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(install_search_backend, uninstall_search_backend),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
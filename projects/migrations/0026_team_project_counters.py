@@ -0,0 +1,98 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:26
+
+from collections import Counter, defaultdict
+from django.db import migrations, models
+from django.db.models import Count
+
+
+TASK_COUNTER_FIELDS = {
+    'todo': 'todo_tasks_count',
+    'inprogress': 'inprogress_tasks_count',
+    'done': 'done_tasks_count',
+}
+
+
+def backfill_counters(apps, schema_editor):
+    # Historical models only: the live counter helpers import the live models
+    Team = apps.get_model('projects', 'Team')
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    TeamMember = apps.get_model('projects', 'TeamMember')
+
+    teams, projects = defaultdict(Counter), defaultdict(Counter)
+    for team_id, count in TeamMember.objects.values_list('team_id').annotate(count=Count('pk')).order_by():
+        teams[team_id]['members_count'] = count
+    for team_id, count in Project.objects.values_list('team_id').annotate(count=Count('pk')).order_by():
+        teams[team_id]['projects_count'] = count
+    tasks = (
+        Task.objects.filter(status__in=TASK_COUNTER_FIELDS)
+        .values_list('project_id', 'project__team_id', 'status').annotate(count=Count('pk')).order_by()
+    )
+    for project_id, team_id, status, count in tasks:
+        field = TASK_COUNTER_FIELDS[status]
+        projects[project_id][field] += count
+        teams[team_id][field] += count
+
+    for model, counters in ((Team, teams), (Project, projects)):
+        fields = sorted({field for counts in counters.values() for field in counts})
+        if not fields:
+            continue
+        # Load the rows: model(pk=...) would evaluate Team.owner's callable default
+        rows = []
+        for row in model.objects.only(*fields).iterator():
+            if row.pk in counters:
+                for field, count in counters[row.pk].items():
+                    setattr(row, field, count)
+                rows.append(row)
+        model.objects.bulk_update(rows, fields, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0025_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='inprogress_tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='done_tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='inprogress_tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='members_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='projects_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='todo_tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
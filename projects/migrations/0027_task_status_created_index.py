@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0026_team_project_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', '-created_at'], name='projects_ta_assigne_a92d47_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:10
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_counts(apps, schema_editor):
+    # Historical models only: the live counter helpers import the live models
+    User = apps.get_model('projects', 'User')
+    Notification = apps.get_model('projects', 'Notification')
+    unread = dict(
+        Notification.objects.filter(read=False).values_list('user_id').annotate(count=Count('pk')).order_by()
+    )
+    # The new column defaults to 0, so only users with unread notifications change
+    users = []
+    for user in User.objects.only('unread_notifications_count').iterator():
+        if user.pk in unread:
+            user.unread_notifications_count = unread[user.pk]
+            users.append(user)
+    User.objects.bulk_update(users, ['unread_notifications_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0027_task_status_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notifications_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
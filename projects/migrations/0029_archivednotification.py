@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0028_user_unread_notifications_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_id', models.BigIntegerField(unique=True)),
+                ('message', models.TextField()),
+                ('notification_type', models.CharField(choices=[('info', 'Information'), ('success', 'Success'), ('warning', 'Warning'), ('error', 'Error')], default='info', max_length=20)),
+                ('action_type', models.CharField(choices=[('task_assigned', 'Task Assigned'), ('task_status_changed', 'Task Status Changed'), ('task_completed', 'Task Completed'), ('project_created', 'Project Created'), ('project_updated', 'Project Updated'), ('project_completed', 'Project Completed'), ('team_joined', 'Team Joined'), ('team_left', 'Team Left'), ('deadline_approaching', 'Deadline Approaching'), ('mention', 'Mention'), ('other', 'Other')], default='other', max_length=50)),
+                ('read', models.BooleanField(default=False)),
+                ('content_type_id', models.IntegerField(blank=True, null=True)),
+                ('object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='projects_ar_user_id_010fd6_idx')],
+            },
+        ),
+    ]
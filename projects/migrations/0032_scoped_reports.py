@@ -0,0 +1,66 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:10
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def mark_existing_reports_ready(apps, schema_editor):
+    """Project reports written before this migration already have their content"""
+    ProjectReport = apps.get_model('projects', 'ProjectReport')
+    ProjectReport.objects.update(status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0031_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectreport',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectreport',
+            name='data',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectreport',
+            name='data_version',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='projectreport',
+            name='end_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectreport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='projectreport',
+            name='start_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectreport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='projectreport',
+            name='project',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='projects.project'),
+        ),
+        migrations.AddConstraint(
+            model_name='projectreport',
+            constraint=models.UniqueConstraint(condition=models.Q(('project__isnull', True)), fields=('generated_by', 'report_type', 'start_date', 'end_date'), name='unique_scoped_report'),
+        ),
+        migrations.RunPython(mark_existing_reports_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:40
+
+import projects.models
+from django.db import migrations, models
+
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def time_key(moment):
+    """Copy of projects.utils.ranking.time_key, which loads the live models"""
+    value = len(DIGITS) ** 11 - 1 - int(moment.timestamp() * 1_000_000)
+    chars = []
+    for _ in range(11):
+        value, digit = divmod(value, len(DIGITS))
+        chars.append(DIGITS[digit])
+    return ''.join(reversed(chars)) + DIGITS[len(DIGITS) // 2]
+
+
+def rank_existing_tasks(apps, schema_editor):
+    """Give existing tasks the rank of their creation time, keeping columns newest first"""
+    Task = apps.get_model('projects', 'Task')
+    batch = []
+    for task in Task.objects.only('pk', 'created_at').iterator(chunk_size=1000):
+        task.rank = time_key(task.created_at)
+        batch.append(task)
+        if len(batch) >= 1000:
+            Task.objects.bulk_update(batch, ['rank'])
+            batch = []
+    if batch:
+        Task.objects.bulk_update(batch, ['rank'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0032_scoped_reports'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='projects_ta_assigne_a92d47_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(default=projects.models.default_task_rank, editable=False, max_length=64),
+        ),
+        migrations.RunPython(rank_existing_tasks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'status', 'rank'], name='projects_ta_assigne_494040_idx'),
+        ),
+    ]
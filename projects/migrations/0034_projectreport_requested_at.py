@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0033_task_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectreport',
+            name='requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,13 +1,14 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.db import models
 from django.utils import timezone
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.db.models import signals
 from model_utils.tracker import FieldTracker
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.translation import gettext_lazy as _
 from django.db import models, transaction
 from django.db.models import Q
@@ -27,6 +28,8 @@ class User(AbstractUser):
         default=True,  # Default is True for direct registration
         help_text='Designates whether this user can create team member accounts'
     )
+    # Maintained by signals and mark_notifications_read; the header badge reads it
+    unread_notifications_count = models.IntegerField(default=0, editable=False)
     groups = models.ManyToManyField(
         Group,
         related_name='custom_user_groups',
@@ -45,6 +48,7 @@ class User(AbstractUser):
     USERNAME_FIELD = 'username'
     EMAIL_FIELD = 'email'
     REQUIRED_FIELDS = ['email']
+    COUNTER_FIELDS = ('unread_notifications_count',)
 
     class Meta:
         verbose_name = 'user'
@@ -59,6 +63,7 @@ class User(AbstractUser):
         """Override save to handle profile creation and team setup"""
         try:
             creating = not self.pk
+            exclude_counter_fields(self, kwargs)
             super().save(*args, **kwargs)
             
             if creating:
@@ -91,20 +96,26 @@ class User(AbstractUser):
             logger.error(f"Error in user save: {str(e)}")
             raise
 
-    def notify(self, message, notification_type='info', action_type='other', related_object=None):
-        """Create a notification for this user"""
+    def notify(self, message, notification_type='info', action_type='other', related_object=None,
+               event=None, window=None):
+        """
+        Queue a notification for this user; it is written after commit.
+        Notifications for the same event and object within the deduplication
+        window are collapsed (see utils.outbox.idempotency_key); without an
+        event or object nothing is collapsed.
+        """
         try:
-            notification = self.notifications.create(
-                message=message,
+            from .utils.outbox import enqueue_notifications
+            from .utils.constants import NOTIFICATION_DEDUP_WINDOW
+            return enqueue_notifications(
+                [self.pk],
+                message,
                 notification_type=notification_type,
                 action_type=action_type,
-                read=False
+                related_object=related_object,
+                event=event,
+                window=window or NOTIFICATION_DEDUP_WINDOW
             )
-            if related_object:
-                notification.content_type = ContentType.objects.get_for_model(related_object)
-                notification.object_id = related_object.id
-                notification.save()
-            return notification
         except Exception as e:
             logger.error(f"Error creating notification: {str(e)}")
             return None
@@ -135,19 +146,14 @@ class User(AbstractUser):
 
     def get_accessible_projects(self):
         """Get projects user has access to"""
+        from .utils.access import get_accessible_projects
         if self.is_project_manager:
             # Project managers see their owned/managed projects
-            return Project.objects.filter(
-                Q(team__owner=self) |  # Projects in owned teams
-                Q(manager=self) |      # Directly managed projects
-                Q(team__members__user=self)  # Projects in teams where user is member
-            ).distinct()
+            roles = [ProjectAccess.ROLE_OWNER, ProjectAccess.ROLE_MANAGER, ProjectAccess.ROLE_MEMBER]
         else:
             # Regular users only see projects they're assigned to
-            return Project.objects.filter(
-                Q(team__members__user=self) |  # Projects where user is team member
-                Q(tasks__assigned_to=self)     # Projects with assigned tasks
-            ).distinct()
+            roles = [ProjectAccess.ROLE_MEMBER, ProjectAccess.ROLE_ASSIGNEE]
+        return get_accessible_projects(self, roles)
 
     def get_accessible_teams(self):
         """Get teams user has access to"""
@@ -198,7 +204,8 @@ class User(AbstractUser):
                     f"Account created by {self.username}. Welcome to {team.name}!",
                     notification_type='success',
                     action_type='team_joined',
-                    related_object=team
+                    related_object=team,
+                    event='team_joined'
                 )
 
                 if team.owner != self:
@@ -206,7 +213,8 @@ class User(AbstractUser):
                         f"New member {user.username} added to {team.name} by {self.username}",
                         notification_type='info',
                         action_type='team_member_added',
-                        related_object=team
+                        related_object=team,
+                        event=f'member_joined:{user.pk}'
                     )
 
                 return member
@@ -225,11 +233,20 @@ class User(AbstractUser):
         return self.notifications.filter(read=False).order_by('-created_at')
 
     def mark_notifications_read(self, notification_ids=None):
-        """Mark notifications as read"""
+        """
+        Mark notifications as read
+        Returns:
+            Number of notifications that were unread
+        """
+        from .utils.chrome import invalidate_header
+        from .utils.counters import record_unread_changes
+        notifications = self.notifications.filter(read=False)
         if notification_ids:
-            self.notifications.filter(id__in=notification_ids).update(read=True)
-        else:
-            self.notifications.all().update(read=True)
+            notifications = notifications.filter(id__in=notification_ids)
+        updated = notifications.update(read=True)
+        record_unread_changes({self.pk: -updated})
+        invalidate_header(self.pk)
+        return updated
 
     def clean(self):
         super().clean()
@@ -262,6 +279,19 @@ class Profile(models.Model):
 def get_default_owner():
     return User.objects.first()
 
+def exclude_counter_fields(instance, save_kwargs):
+    """
+    Keep a full save() of a loaded instance from writing back its (possibly
+    stale) counter values over concurrent F() updates
+    """
+    if instance._state.adding or save_kwargs.get('force_insert'):
+        return
+    if save_kwargs.get('update_fields') is None:
+        save_kwargs['update_fields'] = [
+            field.name for field in instance._meta.concrete_fields
+            if not field.primary_key and field.name not in instance.COUNTER_FIELDS
+        ]
+
 class Team(models.Model):
     name = models.CharField(max_length=200, unique=True)
     description = models.TextField(blank=True)
@@ -279,6 +309,19 @@ class Team(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized counters, maintained from signals (see utils.counters)
+    members_count = models.IntegerField(default=0, editable=False)
+    projects_count = models.IntegerField(default=0, editable=False)
+    todo_tasks_count = models.IntegerField(default=0, editable=False)
+    inprogress_tasks_count = models.IntegerField(default=0, editable=False)
+    done_tasks_count = models.IntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = (
+        'members_count', 'projects_count',
+        'todo_tasks_count', 'inprogress_tasks_count', 'done_tasks_count'
+    )
+
+    tracker = FieldTracker(fields=['owner'])
 
     class Meta:
         ordering = ['-created_at']
@@ -308,38 +351,26 @@ class Team(models.Model):
             try:
                 old_team = Team.objects.get(pk=self.pk)
                 if old_team.avatar and self.avatar != old_team.avatar:
-                    old_team.avatar.delete(save=False)
+                    from .utils.storage import queue_file_delete
+                    queue_file_delete(old_team.avatar)
             except Team.DoesNotExist:
                 pass
+        exclude_counter_fields(self, kwargs)
         super().save(*args, **kwargs)
 
     def can_create_team_members(self, user):
         """Check if user can create team members"""
         if not user:
             return False
-        return (
-            user == self.owner or
-            user.is_project_manager or
-            TeamMember.objects.filter(
-                team=self,
-                user=user,
-                role__in=['owner', 'manager']
-            ).exists()
-        )
+        from .utils.permissions import get_permission_resolver
+        return get_permission_resolver(user).can_create_team_members(self)
 
     def can_manage_team(self, user):
         """Check if user can manage team"""
         if not user:
             return False
-        return (
-            user == self.owner or
-            user.is_project_manager or
-            TeamMember.objects.filter(
-                team=self,
-                user=user,
-                role__in=['owner', 'manager']
-            ).exists()
-        )
+        from .utils.permissions import get_permission_resolver
+        return get_permission_resolver(user).can_manage_team(self)
 
     def add_member(self, user, role='member', created_by=None):
         """Add a new team member"""
@@ -367,7 +398,8 @@ class Team(models.Model):
                 f"You have been added to team: {self.name}",
                 notification_type='success',
                 action_type='team_joined',
-                related_object=self
+                related_object=self,
+                event='team_joined'
             )
 
             if created_by and created_by != self.owner:
@@ -375,7 +407,8 @@ class Team(models.Model):
                     f"{user.username} was added to {self.name} by {created_by.username}",
                     notification_type='info',
                     action_type='team_member_added',
-                    related_object=self
+                    related_object=self,
+                    event=f'member_joined:{user.pk}'
                 )
 
             return member
@@ -414,12 +447,10 @@ class Team(models.Model):
                 related_object=self
             )
 
-            # Send email notification
+            # Send email notification from a worker, off the request
             if notify:
-                from .utils.email import send_team_removal_email
-                sent = send_team_removal_email(user, self, reason)
-                if not sent:
-                    logger.warning(f"Failed to send removal email to {user.email}")
+                from .utils.email import queue_team_removal_email
+                queue_team_removal_email(user, self, reason)
 
             return True
 
@@ -432,20 +463,22 @@ class Team(models.Model):
     @property
     def active_members(self):
         """Get count of active team members"""
-        return self.members.count()
+        return self.members_count
+
+    @property
+    def total_tasks_count(self):
+        return self.todo_tasks_count + self.inprogress_tasks_count + self.done_tasks_count
+
+    @property
+    def progress(self):
+        return self.calculate_progress()
 
     def calculate_progress(self):
-        """Calculate overall team progress"""
-        try:
-            tasks = Task.objects.filter(project__team=self)
-            total = tasks.count()
-            if total == 0:
-                return 0
-            completed = tasks.filter(status='done').count()
-            return round((completed / total) * 100, 1)
-        except Exception as e:
-            logger.error(f"Error calculating team progress: {str(e)}")
+        """Calculate overall team progress from the task counters"""
+        total = self.total_tasks_count
+        if total <= 0:
             return 0
+        return round((self.done_tasks_count / total) * 100, 1)
 
     def get_managers(self):
         """Get all team managers"""
@@ -616,7 +649,8 @@ class TeamMember(models.Model):
                     f"You have been added to team: {self.team.name}",
                     notification_type='success',
                     action_type='team_joined',
-                    related_object=self.team
+                    related_object=self.team,
+                    event='team_joined'
                 )
 
                 if self.team.owner != self.user:
@@ -624,7 +658,8 @@ class TeamMember(models.Model):
                         f"{self.user.username} has joined the team: {self.team.name}",
                         notification_type='info',
                         action_type='team_member_added',
-                        related_object=self.team
+                        related_object=self.team,
+                        event=f'member_joined:{self.user_id}'
                     )
         except Exception as e:
             raise ValidationError(f"Error saving team member: {str(e)}")
@@ -664,6 +699,14 @@ class Project(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized counters, maintained from signals (see utils.counters)
+    todo_tasks_count = models.IntegerField(default=0, editable=False)
+    inprogress_tasks_count = models.IntegerField(default=0, editable=False)
+    done_tasks_count = models.IntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ('todo_tasks_count', 'inprogress_tasks_count', 'done_tasks_count')
+
+    tracker = FieldTracker(fields=['team', 'manager'])
 
     class Meta:
         ordering = ['-created_at']
@@ -681,6 +724,20 @@ class Project(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        exclude_counter_fields(self, kwargs)
+        super().save(*args, **kwargs)
+
+    @property
+    def total_tasks_count(self):
+        return self.todo_tasks_count + self.inprogress_tasks_count + self.done_tasks_count
+
+    @property
+    def progress(self):
+        """Percentage of done tasks, from the task counters"""
+        total = self.total_tasks_count
+        return round((self.done_tasks_count / total) * 100) if total > 0 else 0
+
     def get_member_role(self, user):
         """Get member's role in the project team"""
         try:
@@ -784,6 +841,10 @@ class Project(models.Model):
             task__project=self
         ).select_related('task', 'uploaded_by')
 
+def default_task_rank():
+    from .utils.ranking import time_key
+    return time_key()
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('todo', 'To Do'),
@@ -831,9 +892,15 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_active = models.DateTimeField(auto_now=True)
+    # Kanban position as a fractional key (see utils.ranking); new tasks sort first
+    rank = models.CharField(max_length=64, default=default_task_rank, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Kanban columns page through a user's tasks per status in rank order
+            models.Index(fields=['assigned_to', 'status', 'rank']),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['project', 'title'],
@@ -858,7 +925,7 @@ class Task(models.Model):
             if not has_project_permission(self.assigned_to, self.project):
                 raise ValidationError("Assigned user does not have access to this project")
 
-    tracker = FieldTracker(fields=['status'])
+    tracker = FieldTracker(fields=['status', 'assigned_to', 'project', 'completed_at'])
 
     def save(self, *args, **kwargs):
         """Save task with proper validation and status handling"""
@@ -927,8 +994,9 @@ class File(models.Model):
             raise ValidationError("File size cannot exceed 10MB")
 
     def delete(self, *args, **kwargs):
-        """Delete file from storage when model is deleted"""
-        self.file.delete(save=False)
+        """Delete file from storage (in a worker, after commit) when model is deleted"""
+        from .utils.storage import queue_file_delete
+        queue_file_delete(self.file)
         super().delete(*args, **kwargs)
 
     def __str__(self):
@@ -965,6 +1033,10 @@ class Notification(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
     object_id = models.PositiveIntegerField(null=True, blank=True)
     content_object = GenericForeignKey('content_type', 'object_id')
+    # Hash of (event, object, recipient, time window); duplicates are dropped on insert
+    idempotency_key = models.CharField(max_length=40, unique=True, null=True, blank=True, editable=False)
+
+    tracker = FieldTracker(fields=['read'])
 
     class Meta:
         ordering = ['-created_at']
@@ -977,6 +1049,31 @@ class Notification(models.Model):
     def __str__(self):
         return f"{self.get_action_type_display()} for {self.user.username}"
 
+class ArchivedNotification(models.Model):
+    """
+    Compact copy of a notification moved out of the live table by the
+    retention job (see utils.retention). Keeps the original id and dates.
+    """
+    notification_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.TextField()
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES, default='info')
+    action_type = models.CharField(max_length=50, choices=Notification.ACTION_TYPES, default='other')
+    read = models.BooleanField(default=False)
+    content_type_id = models.IntegerField(null=True, blank=True)
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Archived {self.get_action_type_display()} for user {self.user_id}"
+
 # Update task notification signal
 @receiver(post_save, sender=Task)
 def task_notification(sender, instance, created, **kwargs):
@@ -1021,11 +1118,14 @@ def check_task_deadline(sender, instance, **kwargs):
         days_until_due = (instance.due_date - today).days
         
         if days_until_due <= 2 and days_until_due >= 0:
+            from .utils.constants import NOTIFICATION_DEADLINE_WINDOW
             instance.assigned_to.notify(
                 f"Task '{instance.title}' is due in {days_until_due} days",
                 notification_type='warning',
                 action_type='deadline_approaching',
-                related_object=instance
+                related_object=instance,
+                event='deadline_approaching',
+                window=NOTIFICATION_DEADLINE_WINDOW
             )
     except Exception as e:
         print(f"Error checking task deadline: {e}")
@@ -1033,22 +1133,24 @@ def check_task_deadline(sender, instance, **kwargs):
 @receiver(post_save, sender=Project)
 def project_notification(sender, instance, created, **kwargs):
     """Send notifications for project events"""
+    from .utils.outbox import enqueue_notifications
+    member_ids = instance.team.members.values_list('user_id', flat=True)
     if created:
-        for member in instance.team.members.all():
-            member.user.notify(
-                f"New project created: {instance.name}",
-                notification_type='info',
-                action_type='project_created',
-                related_object=instance
-            )
+        enqueue_notifications(
+            member_ids,
+            f"New project created: {instance.name}",
+            notification_type='info',
+            action_type='project_created',
+            related_object=instance
+        )
     elif instance.status == 'completed':
-        for member in instance.team.members.all():
-            member.user.notify(
-                f"Project '{instance.name}' has been completed",
-                notification_type='success',
-                action_type='project_completed',
-                related_object=instance
-            )
+        enqueue_notifications(
+            member_ids,
+            f"Project '{instance.name}' has been completed",
+            notification_type='success',
+            action_type='project_completed',
+            related_object=instance
+        )
 
 @receiver(post_save, sender=TeamMember)
 def team_member_notification(sender, instance, created, **kwargs):
@@ -1060,20 +1162,39 @@ def team_member_notification(sender, instance, created, **kwargs):
                 f"You have been added to team: {instance.team.name}",
                 notification_type='success',
                 action_type='team_joined',
-                related_object=instance.team
+                related_object=instance.team,
+                event='team_joined'
             )
             # Notify team owner
-            instance.team.owner.notify(
-                f"{instance.user.username} has joined the team: {instance.team.name}",
-                notification_type='info',
-                action_type='team_joined',
-                related_object=instance.team
-            )
+            if instance.team.owner_id != instance.user_id:
+                instance.team.owner.notify(
+                    f"{instance.user.username} has joined the team: {instance.team.name}",
+                    notification_type='info',
+                    action_type='team_joined',
+                    related_object=instance.team,
+                    event=f'member_joined:{instance.user_id}'
+                )
     except Exception as e:
         print(f"Error sending team member notification: {e}")
 
 class ProjectReport(models.Model):
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='reports')
+    """
+    Report on one project, or (without a project) a user's tasks, projects
+    or team report for a date range. Scoped reports are built by a job and
+    reused while the user's data version is unchanged; see utils.reports.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Generating'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='reports', null=True, blank=True
+    )
     generated_by = models.ForeignKey(
         User, 
         on_delete=models.SET_NULL,  # Allow null if user is deleted
@@ -1084,12 +1205,33 @@ class ProjectReport(models.Model):
     generated_on = models.DateTimeField(auto_now_add=True)
     content = models.TextField(blank=True)
     report_type = models.CharField(max_length=50, default='general')
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    data = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    data_version = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-generated_on']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['generated_by', 'report_type', 'start_date', 'end_date'],
+                condition=models.Q(project__isnull=True),
+                name='unique_scoped_report'
+            ),
+        ]
         
     def __str__(self):
-        return f"Report for {self.project.name}"
+        if self.project_id:
+            return f"Report for {self.project.name}"
+        return f"{self.report_type} report {self.start_date} - {self.end_date}"
+
+    @property
+    def is_ready(self):
+        return self.status == self.STATUS_READY
     
     def generate_report(self):
         """Generate project report content"""
@@ -1103,8 +1245,201 @@ class ProjectReport(models.Model):
         Status: {self.project.get_status_display()}
         Tasks Completed: {completed}/{total} ({completion_rate:.1f}%)
         """
+        self.status = self.STATUS_READY
+        self.completed_at = timezone.now()
         self.save()
 
+    def generate_report_later(self):
+        """Generate the content in a background worker after commit"""
+        from .utils.jobs import enqueue
+        enqueue('projects.utils.reports.generate_project_report', report_id=self.pk)
+
+class ProjectAccess(models.Model):
+    """
+    Maintained access index: one row per (user, project, role) that grants
+    the user access to the project. Kept current by the signals below so
+    access checks are a single indexed lookup instead of a multi-way join.
+    """
+    ROLE_OWNER = 'owner'
+    ROLE_MANAGER = 'manager'
+    ROLE_MEMBER = 'member'
+    ROLE_ASSIGNEE = 'assignee'
+
+    ROLE_CHOICES = [
+        (ROLE_OWNER, 'Team Owner'),
+        (ROLE_MANAGER, 'Project Manager'),
+        (ROLE_MEMBER, 'Team Member'),
+        (ROLE_ASSIGNEE, 'Task Assignee')
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_access')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='access_entries')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='access_entries')
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+
+    class Meta:
+        verbose_name_plural = 'project access'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'project', 'role'],
+                name='unique_project_access_role'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user', 'role', 'project']),
+            models.Index(fields=['team', 'role']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.project_id} ({self.role})"
+
+class DailyTaskStats(models.Model):
+    """
+    Daily task rollup keyed by (date, team, project, user, status).
+    created_count counts tasks created on the date that currently have the
+    given status; completed_count counts tasks completed on the date (status
+    is always 'done' for those). Maintained incrementally from Task signals
+    and repaired by the reconcile_task_stats command.
+    """
+    date = models.DateField()
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='daily_task_stats')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='daily_task_stats')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_task_stats')
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    # Signed so drift from writes that bypass signals never blocks a save
+    created_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'daily task stats'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'team', 'project', 'user', 'status'],
+                name='unique_daily_task_stats'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['team', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.project_id}/{self.user_id} {self.status}"
+
+class Job(models.Model):
+    """
+    Background job queued by utils.jobs.enqueue after the request transaction
+    commits, and run by the run_workers command. func is the dotted path of
+    the handler; kwargs must be JSON-serializable (pass ids, not instances).
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    func = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.func} ({self.status})"
+
+class OutgoingEmail(models.Model):
+    """
+    Email waiting for the dispatcher in utils.email, which sends queued rows
+    in batches over one connection. context must be JSON-serializable.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    template = models.CharField(max_length=200)
+    context = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    send_after = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=100, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['send_after']
+        indexes = [
+            models.Index(fields=['status', 'send_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} ({self.status})"
+
+class SearchDocument(models.Model):
+    """
+    Searchable text for projects, tasks and teams. On SQLite an FTS5 table
+    (projects_search_fts) mirrors this table through triggers; on PostgreSQL
+    a GIN tsvector expression index covers it. See utils.search.
+    """
+    KIND_PROJECT = 'project'
+    KIND_TASK = 'task'
+    KIND_TEAM = 'team'
+    KIND_CHOICES = [
+        (KIND_PROJECT, 'Project'),
+        (KIND_TASK, 'Task'),
+        (KIND_TEAM, 'Team'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, null=True, blank=True, related_name='search_documents'
+    )
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='search_documents')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document')
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'project']),
+            models.Index(fields=['kind', 'team']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
 # Signals
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -1116,4 +1451,193 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     """Save Profile whenever User is saved"""
     if hasattr(instance, 'profile'):
-        instance.profile.save()
\ No newline at end of file
+        instance.profile.save()
+
+# Chrome context cache invalidation
+@receiver([post_save, post_delete], sender=Notification)
+def invalidate_notification_chrome(sender, instance, **kwargs):
+    """Refresh the header notification dropdown of the recipient"""
+    from .utils.chrome import invalidate_header
+    invalidate_header(instance.user_id)
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_chrome(sender, instance, **kwargs):
+    """Refresh sidebar task counters of the current and previous assignee"""
+    from .utils.chrome import invalidate_summary
+    invalidate_summary(instance.assigned_to_id, instance.tracker.previous('assigned_to'))
+
+@receiver([post_save, post_delete], sender=TeamMember)
+def invalidate_team_member_chrome(sender, instance, **kwargs):
+    """Refresh sidebar counters of everyone in the affected team"""
+    from .utils.chrome import invalidate_team_summary
+    invalidate_team_summary(instance.team_id, instance.user_id)
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_project_chrome(sender, instance, **kwargs):
+    """Refresh sidebar project counters of everyone in the project's team"""
+    from .utils.chrome import invalidate_team_summary
+    invalidate_team_summary(instance.team_id)
+
+# Project access index maintenance
+@receiver(post_save, sender=TeamMember)
+def team_member_access(sender, instance, created, **kwargs):
+    """Grant member access to every project of the team"""
+    if created:
+        from .utils.access import grant_member_access
+        grant_member_access(instance.team_id, instance.user_id)
+
+@receiver(post_delete, sender=TeamMember)
+def team_member_access_removed(sender, instance, **kwargs):
+    """Revoke member access to the team's projects"""
+    from .utils.access import revoke_member_access
+    revoke_member_access(instance.team_id, instance.user_id)
+
+@receiver(post_save, sender=Project)
+def project_access(sender, instance, created, **kwargs):
+    """
+    Rebuild the access rows of a created project, or of one whose team or
+    manager changed; other edits leave access as it is
+    """
+    if created or instance.tracker.has_changed('team') or instance.tracker.has_changed('manager'):
+        from .utils.access import sync_project_access
+        sync_project_access(instance)
+
+@receiver(post_save, sender=Team)
+def team_owner_access(sender, instance, created, **kwargs):
+    """Move owner access to the new team owner"""
+    if not created and instance.tracker.has_changed('owner'):
+        from .utils.access import sync_team_owner_access
+        sync_team_owner_access(instance)
+
+@receiver(post_save, sender=Task)
+def task_assignee_access(sender, instance, **kwargs):
+    """
+    Grant assignee access and drop it from the previous assignee, or from the
+    previous project, when no tasks are left there
+    """
+    from .utils.access import grant_assignee_access, refresh_assignee_access
+    grant_assignee_access(instance.project, instance.assigned_to_id)
+    previous_project = instance.tracker.previous('project')
+    previous_assignee = instance.tracker.previous('assigned_to')
+    if previous_project and previous_assignee and (previous_project, previous_assignee) != (
+        instance.project_id, instance.assigned_to_id
+    ):
+        refresh_assignee_access(previous_project, previous_assignee)
+
+@receiver(post_delete, sender=Task)
+def task_assignee_access_removed(sender, instance, **kwargs):
+    """Drop assignee access once the user has no tasks left in the project"""
+    from .utils.access import refresh_assignee_access
+    refresh_assignee_access(instance.project_id, instance.assigned_to_id)
+
+# Daily task rollup maintenance
+@receiver(post_save, sender=Task)
+def task_stats(sender, instance, created, **kwargs):
+    """Move the task's rollup contribution from its old state to its new one"""
+    from .utils.rollups import record_task_change
+    record_task_change(instance, created)
+
+@receiver(post_delete, sender=Task)
+def task_stats_removed(sender, instance, **kwargs):
+    """Remove the task's rollup contribution"""
+    from .utils.rollups import record_task_delete
+    record_task_delete(instance)
+
+@receiver(post_save, sender=Project)
+def project_stats(sender, instance, created, **kwargs):
+    """Move the project's rollup rows along when it changes team"""
+    if not created and instance.tracker.has_changed('team'):
+        from .utils.rollups import record_project_move
+        record_project_move(instance)
+
+# Denormalized counter maintenance
+@receiver(post_save, sender=Task)
+def task_counters(sender, instance, created, **kwargs):
+    """Move the task between the status counters of its project and team"""
+    from .utils.counters import record_task_change
+    record_task_change(instance, created)
+
+@receiver(post_delete, sender=Task)
+def task_counters_removed(sender, instance, **kwargs):
+    from .utils.counters import record_task_delete
+    record_task_delete(instance)
+
+@receiver(post_save, sender=TeamMember)
+def team_member_counters(sender, instance, created, **kwargs):
+    if created:
+        from .utils.counters import record_member_change
+        record_member_change(instance, 1)
+
+@receiver(post_delete, sender=TeamMember)
+def team_member_counters_removed(sender, instance, **kwargs):
+    from .utils.counters import record_member_change
+    record_member_change(instance, -1)
+
+@receiver(post_save, sender=Project)
+def project_counters(sender, instance, created, **kwargs):
+    from .utils.counters import record_project_change
+    record_project_change(instance, created)
+
+@receiver(post_delete, sender=Project)
+def project_counters_removed(sender, instance, **kwargs):
+    from .utils.counters import record_project_delete
+    record_project_delete(instance)
+
+@receiver(post_save, sender=Notification)
+def notification_unread_counter(sender, instance, created, **kwargs):
+    """Keep the recipient's unread count in step with single-row saves"""
+    from .utils.counters import record_notification_change
+    record_notification_change(instance, created)
+
+@receiver(post_delete, sender=Notification)
+def notification_unread_counter_removed(sender, instance, **kwargs):
+    if not instance.read:
+        from .utils.counters import record_unread_changes
+        record_unread_changes({instance.user_id: -1})
+
+# Conditional GET versions
+@receiver([post_save, post_delete], sender=Task)
+def task_versions(sender, instance, **kwargs):
+    """Bump the task's project and everyone who sees it through the team"""
+    from .utils.versions import SCOPE_PROJECT, bump, bump_team_users
+    project_ids = [instance.project_id]
+    user_ids = [instance.assigned_to_id]
+    if kwargs.get('created') is False:
+        project_ids.append(instance.tracker.previous('project'))
+        user_ids.append(instance.tracker.previous('assigned_to'))
+    bump(SCOPE_PROJECT, *project_ids)
+    bump_team_users(instance.project.team_id, *user_ids)
+
+@receiver([post_save, post_delete], sender=Project)
+def project_versions(sender, instance, **kwargs):
+    from .utils.versions import SCOPE_PROJECT, bump, bump_team_users
+    bump(SCOPE_PROJECT, instance.pk)
+    bump_team_users(instance.team_id, instance.manager_id)
+
+@receiver([post_save, post_delete], sender=TeamMember)
+def team_member_versions(sender, instance, **kwargs):
+    from .utils.versions import bump_team
+    bump_team(instance.team_id, instance.user_id)
+
+@receiver([post_save, post_delete], sender=Team)
+def team_versions(sender, instance, **kwargs):
+    from .utils.versions import SCOPE_TEAM, bump, bump_team_users
+    bump(SCOPE_TEAM, instance.pk)
+    bump_team_users(instance.pk, instance.owner_id)
+
+# Search index maintenance
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Team)
+def search_document(sender, instance, **kwargs):
+    """Index the saved object's searchable text"""
+    from .utils.search import index_object
+    index_object(instance)
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Team)
+def search_document_removed(sender, instance, **kwargs):
+    """Drop the deleted object from the search index"""
+    from .utils.search import remove_object
+    remove_object(instance)
@@ -1,7 +1,7 @@
 from django import template
 from django.utils import timezone
-from django.db.models import QuerySet
 from datetime import datetime
+from ..utils.aggregates import count_all, count_matching, percentage
 
 register = template.Library()
 
@@ -72,11 +72,9 @@ def time_since(value):
 
 @register.filter
 def completed_tasks_count(queryset):
-    """Returns count of completed tasks from queryset."""
+    """Returns count of completed tasks, from prefetched tasks or counters when available."""
     try:
-        if not queryset:
-            return 0
-        return queryset.filter(status='done').count()
+        return count_matching(queryset, 'status', {'done'}, 'done_tasks_count')
     except Exception:
         return 0
 
@@ -98,26 +96,14 @@ def progress_color(value):
 @register.filter
 def filter_done_tasks(tasks):
     """Returns count of completed tasks from a task collection."""
-    try:
-        if not tasks:
-            return 0
-        if isinstance(tasks, QuerySet):
-            return tasks.filter(status='done').count()
-        if isinstance(tasks, list):
-            return len([t for t in tasks if getattr(t, 'status', '') == 'done'])
-        return 0
-    except Exception:
-        return 0
+    return completed_tasks_count(tasks)
 
 @register.filter
 def completion_percentage(tasks):
     """Calculates completion percentage for a collection of tasks."""
     try:
-        if not tasks:
-            return 0
-        total = len(tasks)
-        completed = len([t for t in tasks if getattr(t, 'status', '') == 'done'])
-        return round((completed / total) * 100) if total > 0 else 0
+        total = count_all(tasks, 'total_tasks_count')
+        return percentage(completed_tasks_count(tasks), total)
     except Exception:
         return 0
 
@@ -1,11 +1,68 @@
-from django.test import TestCase, Client
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
+from unittest import mock
+from django.conf import settings
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.exceptions import ValidationError
-from .models import Team, TeamMember, User
+from django.template import Template
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from .checks import check_version_cache
+from .models import ArchivedNotification, DailyTaskStats, Job, Notification, OutgoingEmail, Project, ProjectReport, ProjectAccess, Task, Team, TeamMember, User
+from .context_processors import chrome_context
+from .templatetags.custom_filters import completed_tasks_count
+from .utils.access import rebuild_project_access
+from .utils.analytics import (
+    calculate_completion_rate, get_completed_tasks_data, get_completion_trend,
+    get_task_distribution, get_team_performance
+)
+from .utils.batch import apply_task_changes
+from .utils.chrome import SUMMARY_CACHE_KEY, ChromeContext, invalidate_summary
+from .utils.counters import repair_counters, update_read_state
+from .utils import email as email_utils
+from .utils.exports import export_rows, parse_export_filters
+from .utils.imports import import_tasks, read_rows
+from .utils.onboarding import hash_passwords
+from .utils.jobs import _worker_loop, claim_job, enqueue, run_pending_jobs
+from .utils.kanban import rebalance_long_ranks
+from .utils.outbox import NotificationIntent, OutboxWorker, hand_off, replay_spool, worker_mode, write_intents
+from .utils.pagination import CursorPaginator, decode_cursor
+from .utils.permissions import PermissionResolver
+from .utils.projects import active_projects_count, with_card_data
+from .utils.retention import prune_notifications
+from .utils.ranking import key_between, rebalance_keys, time_key
+from .urls import QUERY_BUDGETS
+from .utils.querybudget import QueryBudget, fingerprint, record_queries
+from .utils.benchmarks import benchmark_views, compare_reports
+from .utils.seeding import busiest_user, clear_benchmark_data, seed_benchmark_data
+from .utils import projects as project_filters
+from .utils.rollups import reconcile_task_stats
+from .utils.search import fts_backend, rebuild_search_index, search
+from .utils.streams import broker, event_stream
+from .utils.testing import render_without_queries
+from .utils.timeseries import get_buckets
+from .utils.versions import SCOPE_PROJECT, get_versions
 
 
-class TeamManagementTests(TestCase):
+@override_settings(NOTIFICATION_OUTBOX_WORKER='sync')
+class ProjectTestCase(TestCase):
+    """
+    Base for the tests here: notifications are written right after commit on
+    the test's own connection, never by the background worker's
+    """
+
+
+class TeamManagementTests(ProjectTestCase):
     def setUp(self):
         # Create test users
         self.owner = User.objects.create_user('owner', 'owner@test.com', 'password')
@@ -60,19 +117,23 @@ class TeamManagementTests(TestCase):
         )
 
         self.client.login(username='owner', password='password')
-        response = self.client.post(
-            reverse('remove_team_member', kwargs={
-                'team_id': self.team.id,
-                'member_id': member.id
-            }),
-            {
-                'notify_member': True
-            }
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('remove_team_member', kwargs={
+                    'team_id': self.team.id,
+                    'member_id': member.id
+                }),
+                {
+                    'notify_member': True
+                }
+            )
         self.assertEqual(response.status_code, 200)
         self.assertFalse(
             TeamMember.objects.filter(team=self.team, user=self.member).exists()
         )
+        # The email is sent by a job worker, not the request
+        self.assertEqual(len(mail.outbox), 0)
+        run_pending_jobs()
         self.assertEqual(len(mail.outbox), 1)
 
     def test_update_member_role(self):
@@ -98,7 +159,7 @@ class TeamManagementTests(TestCase):
         self.assertEqual(member.role, 'manager')
 
 
-class TeamIntegrationTests(TestCase):
+class TeamIntegrationTests(ProjectTestCase):
     def test_full_team_workflow(self):
         # Create users
         owner = User.objects.create_user('owner', 'owner@test.com', 'password')
@@ -140,4 +201,1512 @@ class TeamIntegrationTests(TestCase):
         )
 
         # Verify final state
-        self.assertEqual(team.members.count(), 1)  # Only owner remains
\ No newline at end of file
+        self.assertEqual(team.members.count(), 1)  # Only owner remains
+
+class ChromeContextTests(ProjectTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('chrome', 'chrome@test.com', 'password')
+        self.factory = RequestFactory()
+
+    def test_cache_dropped_after_commit(self):
+        ChromeContext(self.user).get('tasks_count')
+        key = SUMMARY_CACHE_KEY.format(user_id=self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_summary(self.user.pk)
+            # A concurrent request still reads the committed data meanwhile
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
+
+    def test_context_is_lazy(self):
+        unread = self.user.notifications.filter(read=False).count()
+        request = self.factory.get('/')
+        request.user = self.user
+        with self.assertNumQueries(0):
+            context = chrome_context(request)
+        # The unread count is a counter on the already loaded user row
+        with self.assertNumQueries(0):
+            self.assertEqual(context['unread_notifications_count'](), unread)
+            self.assertEqual(context['unread_notifications_count'](), unread)
+
+    def test_summary_cached_and_invalidated(self):
+        chrome = ChromeContext(self.user)
+        self.assertEqual(chrome.get('tasks_count'), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(ChromeContext(self.user).get('projects_count'), 0)
+
+        # Each request loads its user afresh
+        def unread():
+            return ChromeContext(User.objects.get(pk=self.user.pk)).unread_notifications_count
+
+        before = unread()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.notify("Ping")
+        self.assertEqual(unread(), before + 1)
+        self.user.mark_notifications_read()
+        self.assertEqual(unread(), 0)
+
+
+class ProjectAccessIndexTests(ProjectTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@test.com', 'password')
+        self.member = User.objects.create_user(
+            'member', 'member@test.com', 'password', is_project_manager=False
+        )
+        self.outsider = User.objects.create_user(
+            'outsider', 'outsider@test.com', 'password', is_project_manager=False
+        )
+        self.team = Team.objects.create(name='Access Team', owner=self.owner)
+        TeamMember.objects.create(team=self.team, user=self.owner, role='owner')
+        self.project = Project.objects.create(
+            name='Indexed', description='', team=self.team, manager=self.owner,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+
+    def roles(self, user):
+        return set(
+            ProjectAccess.objects.filter(user=user, project=self.project).values_list('role', flat=True)
+        )
+
+    def test_project_rows(self):
+        self.assertEqual(self.roles(self.owner), {'owner', 'manager', 'member'})
+        self.assertIn(self.project, self.owner.get_accessible_projects())
+
+    def test_rebuilt_only_when_access_changes(self):
+        with mock.patch('projects.utils.access.sync_project_access') as sync_project, \
+                mock.patch('projects.utils.access.sync_team_owner_access') as sync_owner:
+            self.project.description = 'Renamed'
+            self.project.save()
+            self.team.description = 'Renamed'
+            self.team.save()
+            sync_project.assert_not_called()
+            sync_owner.assert_not_called()
+        self.project.manager = self.member
+        self.project.save()
+        self.assertEqual(self.roles(self.member), {'manager'})
+        self.assertNotIn('manager', self.roles(self.owner))
+        self.team.owner = self.member
+        self.team.save()
+        self.assertEqual(self.roles(self.member), {'manager', 'owner'})
+
+    def test_membership_changes(self):
+        membership = TeamMember.objects.create(team=self.team, user=self.member)
+        self.assertEqual(self.roles(self.member), {'member'})
+        membership.delete()
+        self.assertEqual(self.roles(self.member), set())
+        self.assertNotIn(self.project, self.member.get_accessible_projects())
+
+    def test_assignee_access_follows_task(self):
+        TeamMember.objects.create(team=self.team, user=self.member)
+        task = Task.objects.create(
+            project=self.project, title='Moving', assigned_to=self.member,
+            start_date=date.today(), due_date=date.today() + timedelta(days=1)
+        )
+        self.assertEqual(self.roles(self.member), {'member', 'assignee'})
+        other = Project.objects.create(
+            name='Other', description='', team=self.team, manager=self.owner,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        task.project = other
+        task.save()
+        self.assertEqual(self.roles(self.member), {'member'})
+        self.assertTrue(
+            ProjectAccess.objects.filter(user=self.member, project=other, role='assignee').exists()
+        )
+
+    def test_rebuild_matches_signals(self):
+        TeamMember.objects.create(team=self.team, user=self.member)
+        expected = set(ProjectAccess.objects.values_list('user_id', 'project_id', 'role'))
+        rebuild_project_access()
+        self.assertEqual(
+            set(ProjectAccess.objects.values_list('user_id', 'project_id', 'role')),
+            expected
+        )
+
+
+class PermissionResolverTests(ProjectTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@test.com', 'password')
+        self.member = User.objects.create_user(
+            'member', 'member@test.com', 'password', is_project_manager=False
+        )
+        self.outsider = User.objects.create_user(
+            'outsider', 'outsider@test.com', 'password', is_project_manager=False
+        )
+        self.teams = [
+            Team.objects.create(name=f'Resolver Team {i}', owner=self.owner) for i in range(3)
+        ]
+        for team in self.teams:
+            TeamMember.objects.create(team=team, user=self.member)
+
+    def test_memberships_loaded_once(self):
+        resolver = PermissionResolver(self.member)
+        with self.assertNumQueries(1):
+            for team in self.teams:
+                self.assertTrue(resolver.has_team_permission(team))
+                self.assertFalse(resolver.can_manage_team(team))
+
+    def test_check_many(self):
+        resolver = PermissionResolver(self.outsider)
+        with self.assertNumQueries(1):
+            results = resolver.check_many(self.teams, 'has_team_permission')
+        self.assertEqual(results, {team.pk: False for team in self.teams})
+        self.assertEqual(PermissionResolver(self.owner).filter_permitted(self.teams, 'can_manage_team'), self.teams)
+
+
+class TimeSeriesTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('series', 'series@test.com', 'password')
+        team = self.user.owned_teams.first()
+        project = Project.objects.create(
+            name='Series', description='', team=team, manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        for i in range(3):
+            Task.objects.create(
+                project=project, title=f'Task {i}', assigned_to=self.user,
+                start_date=date.today(), due_date=date.today() + timedelta(days=30),
+                status='done' if i else 'todo'
+            )
+
+    def test_buckets(self):
+        end = date(2024, 3, 6)  # Wednesday
+        self.assertEqual(len(get_buckets(7, 'day', end=end)), 7)
+        self.assertEqual(get_buckets(7, 'week', end=end), [date(2024, 2, 26), date(2024, 3, 4)])
+        self.assertEqual(get_buckets(40, 'month', end=end), [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)])
+
+    def test_query_count_independent_of_range(self):
+        for time_range in (7, 365):
+            with self.assertNumQueries(1):
+                data = get_completed_tasks_data(self.user, time_range)
+            self.assertEqual(len(data), time_range)
+            self.assertEqual(data[-1], 2)
+            with self.assertNumQueries(2):
+                trend = get_completion_trend(self.user, time_range)
+            self.assertEqual(trend[-1], round(2 / 3 * 100, 1))
+
+    def test_monthly_granularity(self):
+        data = get_completed_tasks_data(self.user, 90, 'month')
+        self.assertEqual(len(data), len(get_buckets(90, 'month')))
+        self.assertEqual(sum(data), 2)
+
+
+class DailyTaskStatsTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('rollup', 'rollup@test.com', 'password')
+        self.other = User.objects.create_user('rollup2', 'rollup2@test.com', 'password')
+        self.team = self.user.owned_teams.first()
+        TeamMember.objects.create(team=self.team, user=self.other, role='member')
+        self.project = Project.objects.create(
+            name='Rollup', description='', team=self.team, manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        self.tasks = [
+            Task.objects.create(
+                project=self.project, title=f'Task {i}', assigned_to=self.user,
+                start_date=date.today(), due_date=date.today() + timedelta(days=30)
+            )
+            for i in range(3)
+        ]
+
+    def assertMatchesTasks(self):
+        self.assertEqual(reconcile_task_stats(dry_run=True), {'created': 0, 'updated': 0, 'deleted': 0})
+
+    def test_signals_keep_rollup_in_sync(self):
+        self.assertEqual(get_task_distribution(self.user), [3, 0, 0])
+        self.tasks[0].status = 'done'
+        self.tasks[0].save()
+        self.tasks[1].assigned_to = self.other
+        self.tasks[1].save()
+        self.tasks[2].delete()
+        self.assertEqual(get_task_distribution(self.user), [0, 0, 1])
+        self.assertEqual(get_task_distribution(self.other), [1, 0, 0])
+        self.assertEqual(calculate_completion_rate(self.user), 100)
+        self.assertMatchesTasks()
+
+    def test_reconcile_repairs_bulk_updates(self):
+        Task.objects.filter(pk=self.tasks[0].pk).update(status='inprogress')
+        self.assertEqual(reconcile_task_stats()['created'], 1)
+        self.assertEqual(get_task_distribution(self.user), [2, 1, 0])
+        self.assertMatchesTasks()
+
+    def test_rows_follow_a_project_to_its_new_team(self):
+        self.tasks[0].status = 'done'
+        self.tasks[0].save()
+        new_team = Team.objects.create(name='Rollup Two', owner=self.user)
+        self.project.team = new_team
+        self.project.save()
+        self.assertFalse(DailyTaskStats.objects.filter(team=self.team).exists())
+        self.assertEqual(
+            sum(DailyTaskStats.objects.filter(team=new_team).values_list('created_count', flat=True)), 3
+        )
+        self.assertMatchesTasks()
+
+        # A leftover row under the old team is merged rather than clashing
+        row = DailyTaskStats.objects.filter(team=new_team, status='todo').first()
+        DailyTaskStats.objects.create(
+            date=row.date, team=self.team, project=self.project, user=self.user, status='todo'
+        )
+        self.project.team = self.team
+        self.project.save()
+        self.assertFalse(DailyTaskStats.objects.filter(team=new_team).exists())
+        self.assertMatchesTasks()
+
+    def test_team_performance_query_count(self):
+        self.tasks[0].status = 'done'
+        self.tasks[0].save()
+        with self.assertNumQueries(2):
+            performance = get_team_performance(self.user)
+        self.assertIn(1, performance)
+
+
+class NotificationOutboxTests(ProjectTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('outbox', 'outbox@test.com', 'password')
+        self.team = self.owner.owned_teams.first()
+        for i in range(5):
+            user = User.objects.create_user(f'outbox{i}', f'outbox{i}@test.com', 'password')
+            TeamMember.objects.create(team=self.team, user=user, role='member')
+        self.member_ids = list(self.team.members.values_list('user_id', flat=True))
+
+    def create_project(self):
+        return Project.objects.create(
+            name='Outbox', description='', team=self.team, manager=self.owner,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+
+    def test_nothing_written_until_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            project = self.create_project()
+        notifications = Notification.objects.filter(action_type='project_created', object_id=project.pk)
+        self.assertFalse(notifications.exists())
+        # Key check, one bulk insert and one unread counter update for the
+        # whole team fan-out
+        with self.assertNumQueries(3):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(
+            sorted(notifications.values_list('user_id', flat=True)), sorted(self.member_ids)
+        )
+        self.assertEqual(notifications.first().content_object, project)
+
+    def test_thread_worker_batches_intents(self):
+        intents = [
+            NotificationIntent(user_id, 'Queued', 'info', 'other', None, None, None)
+            for user_id in self.member_ids
+        ]
+        worker = OutboxWorker(batch_size=2)
+        # The worker thread has its own connection, so record batches instead
+        with mock.patch('projects.utils.outbox.write_notifications') as write:
+            worker.submit(intents)
+            worker.flush()
+        batches = [call.args[0] for call in write.call_args_list]
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual([intent for batch in batches for intent in batch], intents)
+
+    @override_settings(NOTIFICATION_OUTBOX_RETRIES=2, NOTIFICATION_OUTBOX_RETRY_DELAY=0)
+    def test_failed_batch_retried_then_queued(self):
+        intents = [NotificationIntent(self.owner.pk, 'Retried', 'info', 'other', None, None, 'retried')]
+        worker = OutboxWorker()
+        error = OperationalError('database table is locked')
+        with mock.patch('projects.utils.outbox.write_notifications', side_effect=error) as write:
+            with mock.patch('projects.utils.outbox.enqueue') as queued, \
+                    self.assertLogs('projects.utils.outbox', 'WARNING'):
+                worker._write(intents)
+        self.assertEqual(write.call_count, 3)
+        queued.assert_called_once_with(write_intents, intents=[list(intents[0])])
+        # The job writes the batch once the database is available again
+        write_intents(queued.call_args.kwargs['intents'])
+        self.assertTrue(Notification.objects.filter(user=self.owner, message='Retried').exists())
+
+    def test_batch_spooled_when_job_queue_unavailable(self):
+        intents = [NotificationIntent(self.owner.pk, 'Spooled', 'info', 'other', None, None, 'spooled')]
+        error = OperationalError('disk I/O error')
+        with tempfile.TemporaryDirectory() as spool_dir, \
+                override_settings(NOTIFICATION_OUTBOX_SPOOL=os.path.join(spool_dir, 'outbox.jsonl')):
+            with mock.patch('projects.utils.outbox.enqueue', side_effect=error):
+                with self.assertLogs('projects.utils.outbox', 'ERROR'):
+                    hand_off(intents, error)
+            spooled = Notification.objects.filter(user=self.owner, message='Spooled')
+            self.assertFalse(spooled.exists())
+            # The next successful write replays the spool
+            with self.captureOnCommitCallbacks(execute=True):
+                self.owner.notify('Back')
+            self.assertEqual(spooled.count(), 1)
+            self.assertEqual(replay_spool(), 0)
+
+    @override_settings(NOTIFICATION_OUTBOX_WORKER=None)
+    def test_sqlite_defaults_to_sync_writes(self):
+        self.assertEqual(worker_mode(), 'sync' if connection.vendor == 'sqlite' else 'thread')
+
+    def test_member_added_once(self):
+        user = User.objects.create_user('joiner', 'joiner@test.com', 'password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team.add_member(user, created_by=self.owner)
+        joined = Notification.objects.filter(user=user, object_id=self.team.pk, action_type='team_joined')
+        self.assertEqual(joined.count(), 1)
+        owner_notes = Notification.objects.filter(user=self.owner, message__contains='joiner')
+        self.assertEqual(owner_notes.count(), 1)
+
+    def test_notifications_without_object_not_collapsed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.notify('Reminder')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.notify('Reminder')
+            self.owner.notify('Keyed', event='keyed')
+            self.owner.notify('Keyed', event='keyed')
+        self.assertEqual(Notification.objects.filter(user=self.owner, message='Reminder').count(), 2)
+        self.assertEqual(Notification.objects.filter(user=self.owner, message='Keyed').count(), 1)
+
+    def test_deadline_notified_once_per_window(self):
+        project = self.create_project()
+        task = Task.objects.create(
+            project=project, title='Due', assigned_to=self.owner,
+            start_date=date.today(), due_date=date.today() + timedelta(days=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            for priority in ('low', 'high', 'medium'):
+                task.priority = priority
+                task.save()
+        self.assertEqual(
+            Notification.objects.filter(action_type='deadline_approaching', object_id=task.pk).count(), 1
+        )
+
+
+class SearchIndexTests(ProjectTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('searcher', 'searcher@test.com', 'password')
+        self.outsider = User.objects.create_user('stranger', 'stranger@test.com', 'password')
+        self.team = self.owner.owned_teams.first()
+        self.project = Project.objects.create(
+            name='Quarterly Roadmap', description='Planning for the launch', team=self.team,
+            manager=self.owner, start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        self.task = Task.objects.create(
+            project=self.project, title='Draft launch checklist', assigned_to=self.owner,
+            description='Roadmap items', start_date=date.today(),
+            due_date=date.today() + timedelta(days=30)
+        )
+
+    def titles(self, user, text, kind):
+        return [document.title for document in search(user, text, kind)]
+
+    def test_uses_fts_backend(self):
+        self.assertEqual(fts_backend(), 'sqlite')
+
+    def test_ranked_prefix_matching(self):
+        self.assertEqual(self.titles(self.owner, 'quart road', 'project'), ['Quarterly Roadmap'])
+        Task.objects.create(
+            project=self.project, title='Roadmap review', assigned_to=self.owner,
+            start_date=date.today(), due_date=date.today() + timedelta(days=30)
+        )
+        # Title matches rank above description matches
+        self.assertEqual(
+            self.titles(self.owner, 'roadm', 'task'), ['Roadmap review', 'Draft launch checklist']
+        )
+
+    def test_permission_filtering(self):
+        self.assertEqual(self.titles(self.outsider, 'launch', 'task'), [])
+        self.assertEqual(self.titles(self.outsider, 'quarterly', 'project'), [])
+
+    def test_signals_and_rebuild(self):
+        self.task.title = 'Publish release notes'
+        self.task.save()
+        self.assertEqual(self.titles(self.owner, 'publ', 'task'), ['Publish release notes'])
+        self.assertEqual(self.titles(self.owner, 'checklist', 'task'), [])
+        self.task.delete()
+        self.assertEqual(self.titles(self.owner, 'publ', 'task'), [])
+        self.assertGreater(rebuild_search_index(), 0)
+        self.assertEqual(self.titles(self.owner, 'quarterly', 'project'), ['Quarterly Roadmap'])
+
+
+class NotificationStreamTests(ProjectTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('streamer', 'streamer@test.com', 'password')
+        self.client.login(username='streamer', password='password')
+
+    async def test_stream_pushes_changes(self):
+        stream = event_stream(self.user, heartbeat=5, max_age=5)
+        self.assertTrue((await anext(stream)).startswith('retry:'))
+        self.assertIn('"unread_count"', await anext(stream))
+        self.assertEqual(broker.subscriber_count(self.user.pk), 1)
+        # Changes published from other threads coalesce into one refresh
+        publishers = [threading.Thread(target=broker.dispatch, args=([self.user.pk],)) for _ in range(3)]
+        for publisher in publishers:
+            publisher.start()
+        for publisher in publishers:
+            publisher.join()
+        event = await asyncio.wait_for(anext(stream), timeout=2)
+        self.assertTrue(event.startswith('event: notifications'))
+        await stream.aclose()
+        self.assertEqual(broker.subscriber_count(self.user.pk), 0)
+
+    def test_wsgi_falls_back_to_polling(self):
+        self.assertEqual(self.client.get(reverse('notification_stream')).status_code, 204)
+
+    def test_polling_is_conditional(self):
+        url = reverse('notifications')
+        headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+        self.assertEqual(response.status_code, 304)
+
+
+class ConditionalGetTests(ProjectTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('etag', 'etag@test.com', 'password')
+        self.team = self.user.owned_teams.first()
+        self.project = Project.objects.create(
+            name='Versions', description='', team=self.team, manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        self.client.login(username='etag', password='password')
+        self.headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+    def get(self, url, etag=None):
+        if etag:
+            return self.client.get(url, HTTP_IF_NONE_MATCH=etag, **self.headers)
+        return self.client.get(url, **self.headers)
+
+    def test_unchanged_data_is_a_query_free_304(self):
+        urls = [
+            reverse('analytics_data') + '?range=7',
+            reverse('api_search') + '?q=vers',
+            reverse('project_team_members', args=[self.project.pk]),
+        ]
+        for url in urls:
+            etag = self.get(url)['ETag']
+            # Only the session and user lookups of the auth middleware remain
+            with self.assertNumQueries(2):
+                self.assertEqual(self.get(url, etag).status_code, 304)
+
+    def test_writes_bump_versions(self):
+        url = reverse('project_team_members', args=[self.project.pk])
+        etag = self.get(url)['ETag']
+        other = User.objects.create_user('etag2', 'etag2@test.com', 'password')
+        with self.captureOnCommitCallbacks(execute=True):
+            TeamMember.objects.create(team=self.team, user=other, role='member')
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(other.pk, [member['id'] for member in response.json()['members']])
+
+        search_url = reverse('api_search') + '?q=vers'
+        etag = self.get(search_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(
+                project=self.project, title='Versioned task', assigned_to=self.user,
+                start_date=date.today(), due_date=date.today() + timedelta(days=30)
+            )
+        response = self.get(search_url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Versioned task', [result['title'] for result in response.json()['results']])
+
+    @override_settings(VERSION_LOCAL_TIMEOUT=30)
+    def test_process_local_versions_expire(self):
+        with mock.patch.object(cache, 'set_many') as set_many:
+            get_versions((SCOPE_PROJECT, self.project.pk))
+        self.assertEqual(set_many.call_args.args[1], 30)
+        self.assertEqual([message.id for message in check_version_cache(None)], ['projects.W001'])
+        shared = {
+            'default': settings.CACHES['default'],
+            'versions': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache'},
+        }
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_version_cache(None), [])
+
+
+class CounterFieldTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('counter', 'counter@test.com', 'password')
+        self.other = User.objects.create_user('counter2', 'counter2@test.com', 'password')
+        self.team = self.user.owned_teams.first()
+        TeamMember.objects.create(team=self.team, user=self.other, role='member')
+        self.project = Project.objects.create(
+            name='Counted', description='', team=self.team, manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        self.tasks = [
+            Task.objects.create(
+                project=self.project, title=f'Task {i}', assigned_to=self.user,
+                start_date=date.today(), due_date=date.today() + timedelta(days=30)
+            )
+            for i in range(4)
+        ]
+
+    def assertCountersMatch(self):
+        self.assertEqual(repair_counters(dry_run=True), {'teams': 0, 'projects': 0, 'users': 0})
+
+    def test_signals_maintain_counters(self):
+        self.tasks[0].status = 'done'
+        self.tasks[0].save()
+        self.tasks[1].status = 'inprogress'
+        self.tasks[1].save()
+        self.tasks[2].delete()
+        self.team.refresh_from_db()
+        self.project.refresh_from_db()
+        self.assertEqual((self.team.members_count, self.team.projects_count), (2, 1))
+        self.assertEqual(
+            (self.project.todo_tasks_count, self.project.inprogress_tasks_count, self.project.done_tasks_count),
+            (1, 1, 1)
+        )
+        self.assertEqual(self.project.progress, 33)
+        self.assertEqual(self.team.calculate_progress(), 33.3)
+        self.assertCountersMatch()
+
+    def test_project_moves_its_counts_between_teams(self):
+        other_team = self.other.owned_teams.first() or Team.objects.create(name='Other team', owner=self.other)
+        self.project.team = other_team
+        self.project.save()
+        self.team.refresh_from_db()
+        other_team.refresh_from_db()
+        self.assertEqual((self.team.projects_count, self.team.todo_tasks_count), (0, 0))
+        self.assertEqual((other_team.projects_count, other_team.todo_tasks_count), (1, 4))
+        self.project.delete()
+        self.assertCountersMatch()
+
+    def test_full_save_keeps_concurrent_counts(self):
+        stale = Team.objects.get(pk=self.team.pk)
+        Task.objects.create(
+            project=self.project, title='Concurrent', assigned_to=self.user,
+            start_date=date.today(), due_date=date.today() + timedelta(days=30)
+        )
+        stale.description = 'Renamed'
+        stale.save()
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.todo_tasks_count, 5)
+
+    def test_repair_fixes_bulk_updates(self):
+        Task.objects.filter(pk=self.tasks[0].pk).update(status='done')
+        self.assertEqual(repair_counters(), {'teams': 1, 'projects': 1, 'users': 0})
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.done_tasks_count, 1)
+        self.assertCountersMatch()
+
+    def test_team_list_query_count_is_independent_of_teams(self):
+        self.client.login(username='counter', password='password')
+        url = reverse('team_list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as one_team:
+            response = self.client.get(url)
+        self.assertContains(response, '2 Members')
+        for i in range(3):
+            Team.objects.create(name=f'Extra team {i}', owner=self.user)
+        with self.assertNumQueries(len(one_team)):
+            self.client.get(url)
+
+
+class UnreadCounterTests(ProjectTestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user('unread', 'unread@test.com', 'password')
+        self.client.login(username='unread', password='password')
+
+    def unread(self):
+        self.user.refresh_from_db()
+        return self.user.unread_notifications_count
+
+    def test_counter_follows_every_write_path(self):
+        # Default team notifications, written by the outbox with bulk_create
+        initial = self.unread()
+        self.assertEqual(initial, Notification.objects.filter(user=self.user).count())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.notify('Once', event='once', window=3600)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.notify('Once', event='once', window=3600)
+        notification = Notification.objects.create(user=self.user, message='Direct')
+        self.assertEqual(self.unread(), initial + 2)
+
+        response = self.client.post(reverse('mark_notification_as_read', args=[notification.pk]))
+        self.assertEqual(response.json()['unread_count'], initial + 1)
+        self.assertEqual(self.unread(), initial + 1)
+        self.assertEqual(self.user.mark_notifications_read(), initial + 1)
+        self.assertEqual(self.unread(), 0)
+
+        Notification.objects.create(user=self.user, message='Again')
+        self.client.post(reverse('clear_notifications'))
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(repair_counters(dry_run=True)['users'], 0)
+
+    def test_clear_all_does_not_grow_with_inbox(self):
+        def clear(count):
+            for i in range(count):
+                Notification.objects.create(user=self.user, message=f'Inbox {i}')
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(reverse('clear_notifications'))
+            return len(queries)
+
+        self.assertEqual(clear(2), clear(20))
+        self.assertFalse(Notification.objects.filter(user=self.user).exists())
+        self.assertEqual(self.unread(), 0)
+
+    def test_badge_needs_no_count_query(self):
+        expected = self.unread()
+        chrome = ChromeContext(User.objects.get(pk=self.user.pk))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(chrome.unread_notifications_count, expected)
+        self.assertEqual(len(queries), 0)
+
+    def test_repair_fixes_drift(self):
+        Notification.objects.filter(user=self.user).update(read=True)
+        self.assertEqual(repair_counters(), {'teams': 0, 'projects': 0, 'users': 1})
+        self.assertEqual(self.unread(), 0)
+
+
+class NotificationRetentionTests(ProjectTestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(f'retain{i}', f'retain{i}@test.com', 'password', is_project_manager=False)
+            for i in range(2)
+        ]
+        now = timezone.now()
+        for user in self.users:
+            for age in (1, 100, 110, 120, 130):
+                notification = Notification.objects.create(user=user, message=f'{age} days old')
+                Notification.objects.filter(pk=notification.pk).update(created_at=now - timedelta(days=age))
+
+    def test_prunes_in_batches_keeping_recent_per_user(self):
+        progress = []
+        result = prune_notifications(days=90, keep_per_user=2, archive=True, batch_size=3, progress=progress.append)
+        self.assertEqual(result['scanned'], 8)
+        self.assertEqual((result['removed'], result['kept'], result['archived']), (6, 2, 6))
+        self.assertEqual(len(progress), 3)
+        for user in self.users:
+            self.assertEqual(
+                list(user.notifications.order_by('-created_at').values_list('message', flat=True)),
+                ['1 days old', '100 days old']
+            )
+        self.assertEqual(ArchivedNotification.objects.count(), 6)
+        self.assertEqual(repair_counters(dry_run=True)['users'], 0)
+
+    def test_rows_read_meanwhile_keep_counts_right(self):
+        def mark_read(user_ids, keep_per_user):
+            # A user reads their notifications after the batch was loaded
+            update_read_state(Notification.objects.filter(user_id__in=user_ids), read=True)
+            return set()
+
+        with mock.patch('projects.utils.retention.protected_ids', side_effect=mark_read):
+            prune_notifications(days=90, keep_per_user=0)
+        self.assertEqual(repair_counters(dry_run=True)['users'], 0)
+
+    def test_dry_run_and_resumable_batches(self):
+        self.assertEqual(prune_notifications(days=90, keep_per_user=0, dry_run=True)['removed'], 8)
+        self.assertEqual(Notification.objects.count(), 10)
+        prune_notifications(days=90, keep_per_user=0, batch_size=4, max_batches=1)
+        self.assertEqual(Notification.objects.count(), 6)
+        prune_notifications(days=90, keep_per_user=0)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertFalse(ArchivedNotification.objects.exists())
+
+
+JOB_CALLS = []
+
+def record_job(value, failures=0):
+    """Job handler for JobQueueTests: fails the first `failures` calls"""
+    JOB_CALLS.append(value)
+    if len(JOB_CALLS) <= failures:
+        raise RuntimeError('temporary failure')
+
+
+class JobQueueTests(ProjectTestCase):
+    def setUp(self):
+        JOB_CALLS.clear()
+
+    def test_enqueued_after_commit_and_run(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(record_job, value='a')
+            self.assertFalse(Job.objects.exists())
+        self.assertEqual(run_pending_jobs(), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, JOB_CALLS), (Job.STATUS_DONE, 1, ['a']))
+
+    def test_retries_with_backoff_then_fails(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(record_job, max_attempts=2, value='b', failures=5)
+        run_pending_jobs()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('temporary failure', job.last_error)
+        # Not due yet, so not picked up again
+        self.assertEqual(run_pending_jobs(), 0)
+        Job.objects.update(run_at=timezone.now())
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_claim_is_exclusive(self):
+        Job.objects.create(func='projects.tests.record_job', kwargs={'value': 'c'})
+        self.assertIsNotNone(claim_job('worker-1'))
+        self.assertIsNone(claim_job('worker-2'))
+
+    def test_running_worker_requeues_stale_jobs(self):
+        Job.objects.create(
+            func='projects.tests.record_job', kwargs={'value': 'd'}, status=Job.STATUS_RUNNING,
+            locked_by='dead-worker', locked_at=timezone.now() - timedelta(hours=1), attempts=1
+        )
+        # Within the release interval the job stays with its dead worker
+        _worker_loop(threading.Event(), 0, burst=True)
+        self.assertEqual(Job.objects.get().status, Job.STATUS_RUNNING)
+        with override_settings(JOB_QUEUE_RELEASE_INTERVAL=0), self.assertLogs('projects.utils.jobs', 'WARNING'):
+            _worker_loop(threading.Event(), 0, burst=True)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, JOB_CALLS), (Job.STATUS_DONE, 2, ['d']))
+
+    @override_settings(JOB_QUEUE_MODE='sync')
+    def test_sync_mode_and_file_delete(self):
+        owner = User.objects.create_user('jobs', 'jobs@test.com', 'password')
+        team = Team.objects.create(name='Jobs Team', owner=owner)
+        with mock.patch('projects.utils.storage.default_storage') as storage:
+            with self.captureOnCommitCallbacks(execute=True):
+                team.avatar = 'team_avatars/old.png'
+                team.save()
+                team.avatar = 'team_avatars/new.png'
+                team.save()
+                storage.delete.assert_not_called()
+        storage.delete.assert_called_once_with('team_avatars/old.png')
+        self.assertFalse(Job.objects.exists())
+
+
+class EmailDispatchTests(ProjectTestCase):
+    def setUp(self):
+        self.team = Team.objects.create(
+            name='Mail Team', owner=User.objects.create_user('mailer', 'mailer@test.com', 'password')
+        )
+
+    def queue(self, count):
+        users = [User(username=f'mail{i}', email=f'mail{i}@test.com') for i in range(count)]
+        with self.captureOnCommitCallbacks(execute=False):
+            return email_utils.queue_emails(
+                (user.email, 'Removed', email_utils.TEAM_REMOVAL_TEMPLATE,
+                 email_utils.team_removal_context(user, self.team, 'Reorganised'))
+                for user in users
+            )
+
+    def test_batches_share_one_connection(self):
+        self.assertEqual(self.queue(5), 5)
+        email_utils._templates.clear()
+        with mock.patch.object(email_utils, 'get_connection', wraps=email_utils.get_connection) as connections, \
+                mock.patch.object(email_utils, 'get_template', wraps=email_utils.get_template) as loads:
+            result = email_utils.dispatch_emails(batch_size=2)
+        self.assertEqual((result['sent'], result['batches']), (5, 3))
+        self.assertIn('emails_per_second', result)
+        self.assertEqual(connections.call_count, 3)
+        self.assertEqual(loads.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertIn('Reorganised', mail.outbox[0].alternatives[0][0])
+        self.assertIn('Mail Team', mail.outbox[0].body)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.STATUS_SENT).exists())
+
+    def test_failed_message_is_retried_alone(self):
+        self.queue(3)
+        backend = email_utils.get_connection().__class__
+        original = backend.send_messages
+
+        def refuse_second(connection, messages):
+            if messages[0].to == ['mail1@test.com']:
+                raise OSError('recipient refused')
+            return original(connection, messages)
+
+        with mock.patch.object(backend, 'send_messages', refuse_second):
+            result = email_utils.dispatch_emails()
+        self.assertEqual((result['sent'], result['retried']), (2, 1))
+        refused = OutgoingEmail.objects.get(to_email='mail1@test.com')
+        self.assertEqual(refused.status, OutgoingEmail.STATUS_QUEUED)
+        self.assertGreater(refused.send_after, timezone.now())
+        self.assertIn('recipient refused', refused.last_error)
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        self.assertEqual(email_utils.dispatch_emails()['sent'], 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_transient_failure_redelivered_by_a_scheduled_dispatch(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            email_utils.queue_team_removal_email(User(username='later', email='later@test.com'), self.team)
+        with mock.patch.object(email_utils, 'send_batch', side_effect=lambda emails: ([], list(emails))):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(run_pending_jobs(), 1)
+        email = OutgoingEmail.objects.get()
+        follow_up = Job.objects.get(status=Job.STATUS_QUEUED)
+        self.assertEqual(follow_up.run_at, email.send_after)
+
+        # Once the retry is due the queued dispatch sends it, and nothing else is scheduled
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        Job.objects.update(run_at=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Job.objects.filter(status=Job.STATUS_QUEUED).exists())
+
+
+class ReportJobTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reporter', 'reporter@test.com', 'password')
+        self.project = Project.objects.create(
+            name='Reported', description='', team=self.user.owned_teams.first(), manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        self.add_task('Write report')
+        self.client.force_login(self.user)
+        today = timezone.localdate()
+        self.form = {'report_type': 'tasks', 'start_date': today - timedelta(days=7), 'end_date': today}
+
+    def add_task(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(
+                project=self.project, title=title, assigned_to=self.user,
+                start_date=date.today(), due_date=date.today() + timedelta(days=3)
+            )
+
+    def request_report(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('reports'), self.form)
+        report = ProjectReport.objects.get(generated_by=self.user)
+        self.assertRedirects(response, reverse('report_detail', args=[report.pk]))
+        return report
+
+    def test_generated_by_job_and_reused(self):
+        report = self.request_report()
+        self.assertEqual(report.status, ProjectReport.STATUS_PENDING)
+        self.assertContains(self.client.get(reverse('report_detail', args=[report.pk])), 'Generating')
+        self.assertEqual(run_pending_jobs(), 1)
+
+        data = self.client.get(reverse('report_detail', args=[report.pk]), {'format': 'json'}).json()
+        self.assertEqual(data['status'], ProjectReport.STATUS_READY)
+        self.assertEqual(data['data']['total_tasks'], 1)
+        self.assertEqual(data['data']['tasks'][0]['title'], 'Write report')
+
+        # Unchanged data: the stored result is served without a new job
+        self.request_report()
+        self.assertEqual(run_pending_jobs(), 0)
+
+        self.add_task('Review report')
+        self.assertEqual(self.request_report().status, ProjectReport.STATUS_PENDING)
+        run_pending_jobs()
+        self.assertEqual(ProjectReport.objects.get().data['total_tasks'], 2)
+
+    def test_stalled_report_queued_again(self):
+        report = self.request_report()
+        # The job failed for good, so nothing will ever finish the report
+        Job.objects.update(status=Job.STATUS_FAILED)
+        url = reverse('report_detail', args=[report.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(url)
+        self.assertFalse(Job.objects.filter(status=Job.STATUS_QUEUED).exists())
+
+        ProjectReport.objects.update(requested_at=timezone.now() - timedelta(hours=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(url)
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(self.client.get(url, {'format': 'json'}).json()['status'], ProjectReport.STATUS_READY)
+
+    def test_streamed_downloads(self):
+        report = self.request_report()
+        run_pending_jobs()
+        response = self.client.get(reverse('report_download', args=[report.pk, 'csv']))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'ID,Task,Project,Status,Priority,Due Date')
+        self.assertIn('Write report,Reported,To Do', lines[1])
+
+        response = self.client.get(reverse('report_download', args=[report.pk, 'json']))
+        document = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(document['report_type'], 'tasks')
+        self.assertEqual([row['title'] for row in document['results']], ['Write report'])
+
+        # Unknown formats and other users' reports fall through to handle_view_errors
+        for url, user in [
+            (reverse('report_download', args=[report.pk, 'xml']), self.user),
+            (reverse('report_download', args=[report.pk, 'csv']), User.objects.create_user('snoop', 'snoop@test.com', 'password')),
+        ]:
+            self.client.force_login(user)
+            self.assertRedirects(self.client.get(url), reverse('homepage'), fetch_redirect_response=False)
+
+    def test_projects_report_generated_and_downloaded(self):
+        self.form['report_type'] = 'projects'
+        report = self.request_report()
+        run_pending_jobs()
+        report.refresh_from_db()
+        self.assertEqual(report.status, ProjectReport.STATUS_READY)
+        self.assertEqual(report.data['projects'][0]['progress'], 0)
+
+        response = self.client.get(reverse('report_download', args=[report.pk, 'csv']))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'ID,Project,Team,Status,Progress (%)')
+        self.assertEqual(lines[1], f'{self.project.pk},Reported,{self.project.team.name},{self.project.get_status_display()},0')
+
+
+class StreamingExportTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('exporter', 'exporter@test.com', 'password')
+        self.other = User.objects.create_user('outsider', 'outsider@test.com', 'password')
+        for owner, count in ((self.user, 3), (self.other, 2)):
+            project = Project.objects.create(
+                name=f'{owner.username} project', description='', team=owner.owned_teams.first(),
+                manager=owner, start_date=date.today(), end_date=date.today() + timedelta(days=7)
+            )
+            for i in range(count):
+                Task.objects.create(
+                    project=project, title=f'{owner.username} task {i}', assigned_to=owner,
+                    start_date=date.today(), due_date=date.today() + timedelta(days=3)
+                )
+        self.client.force_login(self.user)
+
+    def download(self, name, export_format, **headers):
+        response = self.client.get(reverse('export_data', args=[name, export_format]), **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_only_contains_visible_rows(self):
+        response, content = self.download('tasks', 'csv')
+        lines = content.decode().splitlines()
+        self.assertTrue(lines[0].startswith('ID,Project ID,Project,Team,Title'))
+        self.assertEqual(len(lines), 4)
+        self.assertFalse(any('outsider' in line for line in lines))
+        self.assertIn('attachment; filename="tasks-', response['Content-Disposition'])
+
+    def test_gzip_on_the_fly(self):
+        _, plain = self.download('tasks', 'csv')
+        response, compressed = self.download('tasks', 'csv', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed), plain)
+
+    def test_json_notification_history_includes_archive(self):
+        Notification.objects.filter(user=self.user).delete()
+        Notification.objects.create(user=self.user, message='Archived')
+        Notification.objects.create(user=self.user, message='Still here')
+        prune_notifications(days=-1, keep_per_user=1, archive=True)
+        _, content = self.download('notifications', 'json')
+        document = json.loads(content)
+        self.assertEqual(document['export'], 'notifications')
+        live = [row for row in document['results'] if not row['archived']]
+        self.assertEqual([row['message'] for row in live], ['Still here'])
+        self.assertEqual([row['message'] for row in document['results'] if row['archived']], ['Archived'])
+
+    def test_projects_carry_task_totals(self):
+        _, content = self.download('projects', 'csv')
+        lines = content.decode().splitlines()
+        self.assertTrue(lines[0].endswith('Total Tasks,Done Tasks,Created'))
+        self.assertEqual(len(lines), 2)
+        self.assertIn('exporter project', lines[1])
+        self.assertEqual(lines[1].split(',')[8:10], ['3', '0'])
+        self.assertEqual(sorted(row[8] for row in export_rows('projects')), [2, 3])
+
+    def test_filters_and_full_export(self):
+        team = self.user.owned_teams.first()
+        rows = list(export_rows('team_members', team=team.pk))
+        self.assertEqual([row[3] for row in rows], ['exporter'])
+        self.assertEqual(len(list(export_rows('tasks', chunk_size=2))), 5)
+        with self.assertRaises(ValueError):
+            parse_export_filters({'start': 'not-a-date'})
+
+
+class TaskImportTests(ProjectTestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('importer', 'importer@test.com', 'password', is_project_manager=False)
+        self.member = User.objects.create_user('assignee', 'assignee@test.com', 'password', is_project_manager=False)
+        self.outsider = User.objects.create_user('stranger', 'stranger@test.com', 'password', is_project_manager=False)
+        self.team = Team.objects.create(name='Import Team', owner=self.manager)
+        TeamMember.objects.create(team=self.team, user=self.member, role='member')
+        self.project = Project.objects.create(
+            name='Imported', description='', team=self.team, manager=self.manager,
+            start_date=date.today(), end_date=date.today() + timedelta(days=30)
+        )
+        self.client.force_login(self.manager)
+
+    def rows(self, count, start=0, **overrides):
+        return [
+            {
+                'project': self.project.pk, 'title': f'Imported task {i}', 'assigned_to': 'assignee',
+                'start_date': '2026-01-01', 'due_date': '2026-02-01',
+                'status': 'done' if i % 2 else 'todo', **overrides
+            }
+            for i in range(start, start + count)
+        ]
+
+    def post(self, rows, **params):
+        url = reverse('import_tasks')
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, json.dumps(rows), content_type='application/json')
+
+    def test_import_keeps_derived_data_in_sync(self):
+        response = self.post(self.rows(4))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 4)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.total_tasks_count, self.project.done_tasks_count), (4, 2))
+        self.assertEqual(repair_counters(dry_run=True), {'teams': 0, 'projects': 0, 'users': 0})
+        self.assertEqual(reconcile_task_stats(dry_run=True), {'created': 0, 'updated': 0, 'deleted': 0})
+        self.assertEqual(len(search(self.member, 'Imported task', 'task', limit=10)), 4)
+        # One batched notification for the assignee, not one per task
+        self.assertEqual(
+            list(self.member.notifications.filter(action_type='task_assigned').values_list('message', flat=True)),
+            ['4 imported tasks were assigned to you']
+        )
+        # A second run with the same count is notified too
+        self.post(self.rows(4, start=4))
+        self.assertEqual(self.member.notifications.filter(action_type='task_assigned').count(), 2)
+
+    def test_queries_do_not_grow_with_rows(self):
+        # The first import creates the rollup rows; later ones update them
+        import_tasks(self.rows(2), importer=self.manager)
+        with CaptureQueriesContext(connection) as small:
+            import_tasks(self.rows(5, start=2), importer=self.manager)
+        with CaptureQueriesContext(connection) as large:
+            import_tasks(self.rows(50, start=7), importer=self.manager)
+        self.assertEqual(len(small), len(large))
+
+    def test_invalid_rows_roll_back_unless_skipped(self):
+        rows = self.rows(2) + self.rows(1, start=2, assigned_to='stranger') + self.rows(1, title='Imported task 0')
+        response = self.post(rows)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['row'] for error in errors], [3, 4])
+        self.assertIn('does not have access', errors[0]['errors'][0])
+        self.assertIn('already exists', errors[1]['errors'][0])
+        self.assertFalse(Task.objects.exists())
+
+        response = self.post(rows, skip_invalid=1)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_csv_upload_needs_permission(self):
+        self.client.force_login(self.member)
+        upload = SimpleUploadedFile(
+            'tasks.csv', b'project,title,assigned_to,start_date,due_date\n'
+            + f'{self.project.pk},From CSV,assignee,2026-01-01,2026-01-05\n'.encode()
+        )
+        response = self.client.post(reverse('import_tasks'), {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('permission', response.json()['errors'][0]['errors'][0])
+        self.assertEqual(read_rows(b'title\nA\n', 'csv').__next__(), {'title': 'A'})
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TeamOnboardingTests(ProjectTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('lead', 'lead@test.com', 'password')
+        self.team = self.owner.owned_teams.first()
+        self.project = Project.objects.create(
+            name='Onboarding', description='', team=self.team, manager=self.owner,
+            start_date=date.today(), end_date=date.today() + timedelta(days=30)
+        )
+        self.client.force_login(self.owner)
+
+    def roster(self, count, start=0):
+        return [
+            {'username': f'Hire{i}', 'email': f'hire{i}@test.com', 'password': f'Onboard-{i}-pass'}
+            for i in range(start, start + count)
+        ]
+
+    def post(self, rows, **params):
+        url = reverse('import_team_members', args=[self.team.pk])
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, json.dumps({'members': rows}), content_type='application/json')
+
+    def test_roster_creates_members_with_derived_data(self):
+        response = self.post(self.roster(3) + [{'username': 'nopass', 'email': 'No.Pass@Test.COM'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 4)
+        # Usernames keep their case; only the email domain is normalized
+        hire = User.objects.get(username='Hire1')
+        self.assertEqual(User.objects.get(username='nopass').email, 'No.Pass@test.com')
+        self.assertTrue(hire.check_password('Onboard-1-pass'))
+        self.assertFalse(hire.is_project_manager)
+        self.assertFalse(User.objects.get(username='nopass').has_usable_password())
+        self.assertTrue(hasattr(hire, 'profile'))
+        self.assertTrue(ProjectAccess.objects.filter(user=hire, project=self.project).exists())
+        self.assertEqual(repair_counters(dry_run=True), {'teams': 0, 'projects': 0, 'users': 0})
+        self.assertEqual(hire.notifications.filter(action_type='team_joined').count(), 1)
+        # The owner gets one digest instead of a notification per member
+        digest = self.owner.notifications.filter(action_type='team_member_added')
+        self.assertEqual(digest.count(), 1)
+        self.assertTrue(digest.get().message.startswith('4 new members added to'))
+
+    def test_invalid_rows_roll_back_unless_skipped(self):
+        rows = self.roster(2) + [
+            {'username': 'LEAD', 'email': 'other@test.com'},
+            {'username': 'dup', 'email': 'HIRE0@test.com'},
+            {'username': 'weak', 'email': 'weak@test.com', 'password': '123'},
+        ]
+        response = self.post(rows)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['row'] for error in errors], [3, 4, 5])
+        self.assertIn('already taken', errors[0]['errors'][0])
+        self.assertIn('already registered', errors[1]['errors'][0])
+        self.assertFalse(User.objects.filter(username__iexact='hire0').exists())
+
+        response = self.post(rows, skip_invalid=1)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(self.team.members.count(), 3)
+
+    def test_passwords_hash_across_processes(self):
+        encoded = hash_passwords(['first-pass', 'second-pass', 'third-pass'], workers=2)
+        self.assertEqual(len(encoded), 3)
+        self.assertTrue(all(value.startswith('md5$') for value in encoded))
+
+    def test_needs_permission(self):
+        outsider = User.objects.create_user('outsider', 'outsider@test.com', 'password', is_project_manager=False)
+        self.client.force_login(outsider)
+        response = self.post(self.roster(1))
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(username__iexact='hire0').exists())
+
+
+class BatchTaskUpdateTests(ProjectTestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user('batcher', 'batcher@test.com', 'password')
+        self.member = User.objects.create_user('worker', 'worker@test.com', 'password', is_project_manager=False)
+        self.team = self.manager.owned_teams.first()
+        TeamMember.objects.create(team=self.team, user=self.member, role='member')
+        self.project = Project.objects.create(
+            name='Batch', description='', team=self.team, manager=self.manager,
+            start_date=date.today(), end_date=date.today() + timedelta(days=30)
+        )
+        self.tasks = [
+            Task.objects.create(
+                project=self.project, title=f'Batch task {i}', assigned_to=self.manager,
+                status='done' if i == 0 else 'todo',
+                start_date=date.today(), due_date=date.today() + timedelta(days=10)
+            )
+            for i in range(4)
+        ]
+        Notification.objects.all().delete()
+        self.client.force_login(self.manager)
+
+    def post(self, task_ids, changes):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('batch_update_tasks'), json.dumps({'tasks': task_ids, 'changes': changes}),
+                content_type='application/json'
+            )
+
+    def test_batch_keeps_derived_data_in_sync(self):
+        completed_at = Task.objects.get(pk=self.tasks[0].pk).completed_at
+        response = self.post([task.pk for task in self.tasks], {'status': 'done', 'assigned_to': self.member.pk})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['updated'], 4)
+        self.assertEqual(data['projects'][str(self.project.pk)]['done_tasks_count'], 4)
+        self.assertIn('completion_rate', data)
+        # Already finished tasks keep their completion time
+        self.assertEqual(Task.objects.get(pk=self.tasks[0].pk).completed_at, completed_at)
+        self.assertEqual(repair_counters(dry_run=True), {'teams': 0, 'projects': 0, 'users': 0})
+        self.assertEqual(reconcile_task_stats(dry_run=True), {'created': 0, 'updated': 0, 'deleted': 0})
+        self.assertFalse(
+            ProjectAccess.objects.filter(user=self.manager, role=ProjectAccess.ROLE_ASSIGNEE).exists()
+        )
+        self.assertTrue(
+            ProjectAccess.objects.filter(user=self.member, role=ProjectAccess.ROLE_ASSIGNEE).exists()
+        )
+        # One coalesced notification per recipient and kind, not one per task
+        self.assertEqual(
+            sorted(self.member.notifications.values_list('message', flat=True)),
+            ['3 of your tasks moved to Done by batcher', '4 tasks were assigned to you by batcher']
+        )
+        self.assertEqual(
+            list(self.manager.notifications.values_list('message', flat=True)), ['3 tasks have been completed']
+        )
+
+    def test_separate_batches_each_notify(self):
+        self.post([self.tasks[1].pk], {'status': 'done'})
+        self.post([self.tasks[2].pk], {'status': 'done'})
+        messages = list(self.manager.notifications.values_list('message', flat=True))
+        self.assertEqual(messages.count('1 of your tasks moved to Done by batcher'), 2)
+        self.assertEqual(messages.count('1 task has been completed'), 2)
+
+    def test_queries_do_not_grow_with_tasks(self):
+        with CaptureQueriesContext(connection) as small:
+            apply_task_changes(self.manager, [self.tasks[1].pk], {'priority': 'high'})
+        with CaptureQueriesContext(connection) as large:
+            apply_task_changes(self.manager, [task.pk for task in self.tasks], {'priority': 'low'})
+        self.assertEqual(len(small), len(large))
+
+    def test_rejects_whole_batch(self):
+        response = self.post([task.pk for task in self.tasks], {'due_date': str(date.today() - timedelta(days=1))})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.json()['errors']), 4)
+        response = self.post([self.tasks[0].pk, 999999], {'status': 'todo'})
+        self.assertEqual(response.status_code, 404)
+
+        self.client.force_login(self.member)
+        response = self.post([self.tasks[1].pk], {'assigned_to': self.member.pk})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Task.objects.filter(status='todo').count(), 3)
+
+
+class PrefetchAwareFilterTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cards', 'cards@test.com', 'password')
+        self.team = self.user.owned_teams.first()
+        for i, status in enumerate(['active', 'completed', 'planned']):
+            project = Project.objects.create(
+                name=f'Card {i}', description='', team=self.team, manager=self.user, status=status,
+                start_date=date.today(), end_date=date.today() + timedelta(days=7)
+            )
+            for done in (True, False):
+                Task.objects.create(
+                    project=project, title=f'Task {i} {done}', assigned_to=self.user,
+                    status='done' if done else 'todo',
+                    start_date=date.today(), due_date=date.today() + timedelta(days=30)
+                )
+
+    def test_filters_use_prefetched_objects(self):
+        teams = list(Team.objects.filter(pk=self.team.pk).prefetch_related('projects__tasks'))
+        with self.assertNumQueries(0):
+            self.assertEqual(active_projects_count(teams[0].projects), 2)
+            self.assertEqual(project_filters.calculate_completion_rate(teams[0].projects), 33)
+            self.assertEqual(completed_tasks_count(teams[0].projects.all()[0].tasks), 1)
+
+    def test_filters_use_annotations_and_counters(self):
+        team = Team.objects.get(pk=self.team.pk)
+        project = Project.objects.filter(team=team).first()
+        team.active_projects_count = 2
+        with self.assertNumQueries(0):
+            self.assertEqual(active_projects_count(team.projects), 2)
+            self.assertEqual(completed_tasks_count(project.tasks), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(active_projects_count(Project.objects.filter(team=team)), 2)
+
+    def test_project_cards_render_without_queries(self):
+        projects = list(with_card_data(Project.objects.filter(team=self.team)))
+        for project in projects:
+            rendered = render_without_queries(
+                'projects/includes/project_card.html', {'project': project, 'show_actions': True}
+            )
+            self.assertIn('2 Tasks', rendered)
+        with self.assertRaises(AssertionError):
+            render_without_queries(Template('{{ team.members.count }}'), {'team': self.team})
+
+
+class QueryBudgetTests(ProjectTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('budget', 'budget@test.com', 'password')
+        self.team = self.user.owned_teams.first()
+        self.project = Project.objects.create(
+            name='Budgeted', description='', team=self.team, manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        for i, status in enumerate(['todo', 'inprogress', 'done'] * 2):
+            Task.objects.create(
+                project=self.project, title=f'Task {i}', assigned_to=self.user, status=status,
+                start_date=date.today(), due_date=date.today() + timedelta(days=30)
+            )
+        self.client.login(username='budget', password='password')
+
+    @QueryBudget()
+    def test_views_stay_within_budgets(self):
+        task = self.project.tasks.first()
+        report = ProjectReport.objects.create(
+            generated_by=self.user, report_type='tasks', status=ProjectReport.STATUS_READY,
+            start_date=date.today(), end_date=date.today(), data={'total_tasks': 0, 'tasks': []},
+            requested_at=timezone.now(), completed_at=timezone.now()
+        )
+        args = {
+            'project_detail': [self.project.pk],
+            'project_team_members': [self.project.pk],
+            'task_detail': [self.project.pk, task.pk],
+            'team_detail': [self.team.pk],
+            'report_detail': [report.pk],
+        }
+        params = {'api_search': {'q': 'Task'}, 'analytics_data': {'range': 7}}
+        # Every declared budget is exercised, so a new entry cannot go unchecked
+        for name in QUERY_BUDGETS:
+            with self.subTest(name):
+                # Budgets assume a cold header cache
+                cache.clear()
+                response = self.client.get(reverse(name, args=args.get(name)), params.get(name))
+                self.assertEqual(response.status_code, 200)
+
+    def test_exceeding_a_budget_fails(self):
+        with self.assertRaisesMessage(AssertionError, 'team_list'):
+            with QueryBudget(team_list=1):
+                with mock.patch.dict('projects.urls.QUERY_BUDGETS', {'team_list': 1}):
+                    with self.assertLogs('projects.middleware', 'WARNING') as logs:
+                        self.client.get(reverse('team_list'))
+        self.assertEqual(logs.records[0].query_stats['budget'], 1)
+
+    @override_settings(QUERY_BUDGET_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('team_list'))
+        self.assertRegex(response['Server-Timing'], r'^sql;dur=[\d.]+;desc="\d+ queries", sqldup;desc="\d+ repeated"$')
+
+    def test_repeated_query_shapes_share_a_fingerprint(self):
+        with record_queries() as stats:
+            for task in Task.objects.all():
+                Project.objects.get(pk=task.project_id)
+            list(Task.objects.filter(pk__in=[1, 2, 3]))
+            list(Task.objects.filter(pk__in=[4, 5]))
+        self.assertEqual(stats.count, 9)
+        self.assertEqual(stats.duplicate_count, 6)
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s)'),
+            fingerprint('SELECT 1 FROM t\n WHERE id IN (%s)')
+        )
+
+
+class CursorPaginationTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('pager', 'pager@test.com', 'password')
+        self.team = self.user.owned_teams.first()
+        self.project = Project.objects.create(
+            name='Paged', description='', team=self.team, manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=7)
+        )
+        # Shared timestamps make the id tie-breaker matter
+        moment = timezone.now()
+        for i in range(25):
+            notification = Notification.objects.create(user=self.user, message=f'Note {i}')
+            Notification.objects.filter(pk=notification.pk).update(created_at=moment - timedelta(minutes=i // 3))
+        self.client.login(username='pager', password='password')
+
+    def test_pages_cover_every_row_once_without_count_or_offset(self):
+        paginator = CursorPaginator(Notification.objects.filter(user=self.user), per_page=10)
+        seen, cursor = [], None
+        with CaptureQueriesContext(connection) as queries:
+            while True:
+                page = paginator.page(cursor)
+                seen.extend(n.pk for n in page)
+                if not page.has_next:
+                    break
+                cursor = page.next_cursor
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(set(seen), set(Notification.objects.filter(user=self.user).values_list('pk', flat=True)))
+        self.assertEqual(len(queries), 3)
+        self.assertFalse(any('COUNT(' in q['sql'] or 'OFFSET' in q['sql'] for q in queries))
+
+    def test_malformed_cursor_starts_over(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page = CursorPaginator(Notification.objects.filter(user=self.user)).page('%%%')
+        self.assertEqual(page.object_list[0].message, 'Note 2')
+
+    def test_notification_pages_as_json(self):
+        response = self.client.get(reverse('notifications'))
+        next_url = response.context['next_url']
+        self.assertIn('cursor=', next_url)
+        data = self.client.get(next_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+        self.assertEqual(len(data['results']), 10)
+        self.assertIn('Note 10', data['html'])
+        # Without a cursor XHR requests still get the header payload
+        header = self.client.get(reverse('notifications'), HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+        self.assertNotIn('results', header)
+
+    def test_task_and_project_json_variants(self):
+        for i in range(3):
+            Task.objects.create(
+                project=self.project, title=f'Task {i}', assigned_to=self.user,
+                start_date=date.today(), due_date=date.today() + timedelta(days=30)
+            )
+        data = self.client.get(reverse('task_list'), {'status': 'todo', 'format': 'json'}).json()
+        self.assertEqual([task['title'] for task in data['results']], ['Task 2', 'Task 1', 'Task 0'])
+        self.assertIsNone(data['next_url'])
+        self.assertEqual(self.client.get(reverse('task_list'), {'status': 'bad', 'format': 'json'}).status_code, 400)
+
+        data = self.client.get(reverse('project_list'), {'section': 'managed', 'format': 'json'}).json()
+        self.assertEqual([project['name'] for project in data['results']], ['Paged'])
+        self.assertIn('project-card', data['html'])
+
+
+class KanbanRankTests(ProjectTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('kanban', 'kanban@test.com', 'password')
+        project = Project.objects.create(
+            name='Board', description='', team=self.user.owned_teams.first(), manager=self.user,
+            start_date=date.today(), end_date=date.today() + timedelta(days=30)
+        )
+        self.tasks = [
+            Task.objects.create(
+                project=project, title=f'Card {i}', assigned_to=self.user,
+                start_date=date.today(), due_date=date.today() + timedelta(days=30)
+            )
+            for i in range(4)
+        ]
+        self.client.force_login(self.user)
+
+    def column(self):
+        data = self.client.get(reverse('task_list'), {'status': 'todo', 'format': 'json'}).json()
+        return [task['title'] for task in data['results']]
+
+    def reorder(self, task, **body):
+        return self.client.post(
+            reverse('reorder_task', args=[task.pk]), json.dumps(body), content_type='application/json'
+        )
+
+    def test_keys_stay_ordered(self):
+        keys = []
+        for i in range(200):
+            # Keep splitting the same spot, the worst case for key length
+            keys.insert(1, key_between(keys[0] if keys else None, keys[1] if len(keys) > 1 else None))
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), 200)
+        self.assertLess(time_key(), time_key(timezone.now() - timedelta(seconds=1)))
+        balanced = rebalance_keys(100)
+        self.assertEqual(balanced, sorted(balanced))
+        self.assertEqual(max(map(len, balanced)), 2)
+
+    def test_move_writes_only_the_moved_row(self):
+        self.assertEqual(self.column(), ['Card 3', 'Card 2', 'Card 1', 'Card 0'])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.reorder(self.tasks[0], previous_id=self.tasks[3].pk, next_id=self.tasks[2].pk)
+        self.assertEqual(response.status_code, 200)
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('UPDATE', 'INSERT', 'DELETE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"rank"', writes[0])
+        self.assertEqual(self.column(), ['Card 3', 'Card 0', 'Card 2', 'Card 1'])
+
+        # Index-only clients: drop Card 3 at the bottom of the column
+        response = self.reorder(self.tasks[3], position=3, list_id='todo')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.column(), ['Card 0', 'Card 2', 'Card 1', 'Card 3'])
+        self.assertEqual(self.reorder(self.tasks[3], position='x').status_code, 400)
+
+    def test_ties_and_long_ranks_are_rebalanced(self):
+        Task.objects.filter(pk__in=[self.tasks[1].pk, self.tasks[2].pk]).update(rank='m')
+        response = self.reorder(self.tasks[0], previous_id=self.tasks[1].pk, next_id=self.tasks[2].pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.column(), ['Card 1', 'Card 0', 'Card 2', 'Card 3'])
+
+        Task.objects.filter(pk=self.tasks[3].pk).update(rank='a' * 40)
+        self.assertEqual(rebalance_long_ranks(), {'columns': 1, 'tasks': 4})
+        self.assertTrue(all(len(rank) <= 5 for rank in Task.objects.values_list('rank', flat=True)))
+        # New tasks still open the column after a rebalance
+        Task.objects.create(
+            project=self.tasks[0].project, title='Card new', assigned_to=self.user,
+            start_date=date.today(), due_date=date.today() + timedelta(days=30)
+        )
+        self.assertEqual(self.column()[0], 'Card new')
+
+
+class BenchmarkDataTests(ProjectTestCase):
+    def test_seeded_data_is_consistent(self):
+        volumes = seed_benchmark_data(
+            users=20, teams=3, projects_per_team=2, tasks_per_project=5, notifications_per_user=3, seed=7
+        )
+        self.assertEqual(volumes['users'], 20)
+        self.assertEqual(Task.objects.count(), volumes['tasks'])
+        self.assertEqual(Notification.objects.count(), volumes['notifications'])
+        # Tasks are spread over past months rather than all created now
+        self.assertTrue(Task.objects.filter(created_at__lt=timezone.now() - timedelta(days=30)).exists())
+        # Derived tables were rebuilt after bulk_create
+        self.assertEqual(reconcile_task_stats(dry_run=True), {'created': 0, 'updated': 0, 'deleted': 0})
+        self.assertEqual(repair_counters(dry_run=True), {'teams': 0, 'projects': 0, 'users': 0})
+
+        views = benchmark_views(busiest_user(), repeat=1)
+        self.assertEqual(
+            set(views), {'homepage', 'project_list', 'team_detail', 'analytics_data', 'api_search', 'notification_list'}
+        )
+        self.assertEqual({figures['status'] for figures in views.values()}, {200})
+
+        report = {'scales': {'small': {'views': views}}}
+        self.assertEqual(len(compare_reports(report, report)), len(views))
+        self.assertGreater(clear_benchmark_data(), 0)
+        self.assertFalse(Task.objects.exists())
+
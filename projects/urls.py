@@ -45,10 +45,12 @@ urlpatterns = [
     path('teams/<int:team_id>/members/<int:member_id>/', views.member_detail, name='member_detail'),
     path('teams/<int:team_id>/members/<int:member_id>/tasks/', views.member_tasks, name='member_tasks'),
     path('teams/<int:team_id>/create-member/', views.create_team_member, name='create_team_member'),
+    path('teams/<int:team_id>/members/import/', views.import_team_members, name='import_team_members'),
     
     # Notification URLs
     path('notifications/', views.notification_list, name='notifications'),
     path('notifications/clear/', views.clear_all_notifications, name='clear_notifications'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
     path('notifications/mark-read/<int:notification_id>/', views.mark_notification_as_read, name='mark_notification_as_read'),
     
     # User & Profile URLs
@@ -70,6 +72,9 @@ urlpatterns = [
     path('search/', views.search_view, name='search'),
     path('api/search/', views.api_search, name='api_search'),
     path('api/tasks/<int:task_id>/update-status/', views.update_task_status, name='update_task_status'),
+    path('api/tasks/import/', views.import_tasks_api, name='import_tasks'),
+    path('api/tasks/batch/', views.batch_update_tasks, name='batch_update_tasks'),
+    path('api/tasks/<int:task_id>/reorder/', views.reorder_task, name='reorder_task'),
     path('api/analytics/data/', views.analytics_data, name='analytics_data'),
     
     # Analytics & Reports URLs
@@ -77,6 +82,9 @@ urlpatterns = [
     path('progress/members/', views.member_progress, name='member_progress'),
     path('analytics/', views.analytics_view, name='analytics'),
     path('reports/', views.reports_view, name='reports'),
+    path('reports/<int:report_id>/', views.report_detail, name='report_detail'),
+    path('reports/<int:report_id>/download/<str:export_format>/', views.report_download, name='report_download'),
+    path('exports/<str:export_name>/<str:export_format>/', views.export_data, name='export_data'),
     
     # Settings URLs
     path('settings/', views.settings_view, name='settings'),
@@ -92,4 +100,27 @@ urlpatterns = [
 # Error Handlers
 handler404 = 'projects.views.handler404'
 handler500 = 'projects.views.handler500'
-handler403 = 'projects.views.handler403'
\ No newline at end of file
+handler403 = 'projects.views.handler403'
+
+# Maximum queries per request, including session, authentication and a cold
+# header cache. Checked by QueryBudgetMiddleware (logged) and the QueryBudget
+# test decorator (enforced); lower a budget when a view gets cheaper.
+QUERY_BUDGETS = {
+    'homepage': 25,
+    'project_list': 20,
+    'project_detail': 26,
+    'project_team_members': 5,
+    'task_list': 14,
+    'task_detail': 10,
+    'team_list': 11,
+    'team_detail': 23,
+    'all_team_members': 15,
+    'notifications': 12,
+    'analytics': 20,
+    'analytics_data': 10,
+    'reports': 9,
+    'report_detail': 10,
+    'api_search': 8,
+    'view_profile': 13,
+    'settings': 9,
+}
@@ -9,12 +9,8 @@ logger = logging.getLogger(__name__)
 
 def get_user_projects(user):
     """Get all projects accessible to user"""
-    return Project.objects.filter(
-        Q(team__members__user=user) |  # Projects where user is team member
-        Q(team__owner=user) |          # Projects owned by user
-        Q(manager=user) |              # Projects managed by user
-        Q(tasks__assigned_to=user)     # Projects with tasks assigned to user
-    ).distinct().select_related(
+    from .access import get_accessible_projects
+    return get_accessible_projects(user).select_related(
         'team',
         'manager'
     ).prefetch_related(
@@ -34,10 +30,6 @@ def get_common_context(user):
         return {}
         
     try:
-        notifications = (Notification.objects.filter(user=user)
-                      .select_related('user')
-                      .order_by('-created_at'))
-        
         return {
             'projects_count': Project.objects.filter(
                 team__members__user=user
@@ -46,8 +38,6 @@ def get_common_context(user):
                 assigned_to=user,
                 status__in=['todo', 'inprogress']
             ).count(),
-            'notifications': notifications[:5],
-            'unread_notifications_count': notifications.filter(read=False).count(),
         }
     except Exception as e:
         logger.error(f"Context error: {str(e)}")
@@ -0,0 +1,172 @@
+from django.db import transaction
+from django.db.models import Q, Subquery
+import logging
+from ..models import Project, ProjectAccess, Task, Team, TeamMember
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+ALL_ROLES = [choice[0] for choice in ProjectAccess.ROLE_CHOICES]
+MANAGING_ROLES = [ProjectAccess.ROLE_OWNER, ProjectAccess.ROLE_MANAGER]
+
+def accessible_project_ids(user, roles=None):
+    """
+    Subquery of project ids the user can access through any (or the given)
+    roles. Use with ``pk__in`` so no join or DISTINCT is needed.
+    """
+    entries = ProjectAccess.objects.filter(user=user)
+    if roles is not None:
+        entries = entries.filter(role__in=roles)
+    return Subquery(entries.values('project_id'))
+
+def get_accessible_projects(user, roles=None, queryset=None):
+    """Filter projects down to those accessible to the user"""
+    if queryset is None:
+        queryset = Project.objects.all()
+    return queryset.filter(pk__in=accessible_project_ids(user, roles))
+
+def _project_rows(project):
+    """Build the access rows a project should currently have"""
+    team_id = project.team_id
+    rows = {}
+
+    def add(user_id, role):
+        if user_id:
+            rows[(user_id, role)] = ProjectAccess(
+                user_id=user_id, project_id=project.pk, team_id=team_id, role=role
+            )
+
+    add(Team.objects.filter(pk=team_id).values_list('owner_id', flat=True).first(), ProjectAccess.ROLE_OWNER)
+    add(project.manager_id, ProjectAccess.ROLE_MANAGER)
+    for user_id in TeamMember.objects.filter(team_id=team_id).values_list('user_id', flat=True):
+        add(user_id, ProjectAccess.ROLE_MEMBER)
+    assignees = Task.objects.filter(project_id=project.pk).values_list('assigned_to_id', flat=True).distinct()
+    for user_id in assignees:
+        add(user_id, ProjectAccess.ROLE_ASSIGNEE)
+    return list(rows.values())
+
+def sync_project_access(project):
+    """Replace all access rows for a project"""
+    with transaction.atomic():
+        ProjectAccess.objects.filter(project_id=project.pk).delete()
+        ProjectAccess.objects.bulk_create(_project_rows(project))
+
+def sync_team_owner_access(team):
+    """Point owner rows of a team's projects at the current owner"""
+    with transaction.atomic():
+        ProjectAccess.objects.filter(
+            team_id=team.pk,
+            role=ProjectAccess.ROLE_OWNER
+        ).exclude(user_id=team.owner_id).delete()
+        if team.owner_id:
+            ProjectAccess.objects.bulk_create([
+                ProjectAccess(
+                    user_id=team.owner_id,
+                    project_id=project_id,
+                    team_id=team.pk,
+                    role=ProjectAccess.ROLE_OWNER
+                )
+                for project_id in Project.objects.filter(team_id=team.pk).values_list('id', flat=True)
+            ], ignore_conflicts=True)
+
+def grant_member_access(team_id, *user_ids):
+    """Give new team members access to every project in the team"""
+    project_ids = list(Project.objects.filter(team_id=team_id).values_list('id', flat=True))
+    ProjectAccess.objects.bulk_create([
+        ProjectAccess(
+            user_id=user_id,
+            project_id=project_id,
+            team_id=team_id,
+            role=ProjectAccess.ROLE_MEMBER
+        )
+        for user_id in user_ids
+        for project_id in project_ids
+    ], ignore_conflicts=True)
+
+def revoke_member_access(team_id, user_id):
+    """Remove team-membership access for a user leaving a team"""
+    ProjectAccess.objects.filter(
+        team_id=team_id,
+        user_id=user_id,
+        role=ProjectAccess.ROLE_MEMBER
+    ).delete()
+
+def grant_assignee_access(project, user_id):
+    """Give a task assignee access to the task's project"""
+    if not user_id:
+        return
+    ProjectAccess.objects.bulk_create([
+        ProjectAccess(
+            user_id=user_id,
+            project_id=project.pk,
+            team_id=project.team_id,
+            role=ProjectAccess.ROLE_ASSIGNEE
+        )
+    ], ignore_conflicts=True)
+
+def refresh_assignee_access(project_id, user_id):
+    """Drop assignee access when the user has no tasks left in the project"""
+    if not user_id:
+        return
+    if not Task.objects.filter(project_id=project_id, assigned_to_id=user_id).exists():
+        ProjectAccess.objects.filter(
+            project_id=project_id,
+            user_id=user_id,
+            role=ProjectAccess.ROLE_ASSIGNEE
+        ).delete()
+
+def refresh_assignees_access(pairs):
+    """refresh_assignee_access for many (project_id, user_id) pairs with two queries"""
+    pairs = {(project_id, user_id) for project_id, user_id in pairs if user_id}
+    if not pairs:
+        return
+    remaining = set(
+        Task.objects.filter(
+            project_id__in={project_id for project_id, _ in pairs},
+            assigned_to_id__in={user_id for _, user_id in pairs}
+        ).values_list('project_id', 'assigned_to_id').distinct()
+    )
+    stale = Q()
+    for project_id, user_id in pairs - remaining:
+        stale |= Q(project_id=project_id, user_id=user_id)
+    if stale:
+        ProjectAccess.objects.filter(stale, role=ProjectAccess.ROLE_ASSIGNEE).delete()
+
+def iter_access_rows(project_model, task_model, team_member_model, access_model):
+    """
+    Yield every access row derivable from the source tables using four
+    set-based queries
+    """
+    members_by_team = {}
+    for team_id, user_id in team_member_model.objects.values_list('team_id', 'user_id'):
+        members_by_team.setdefault(team_id, []).append(user_id)
+
+    projects = project_model.objects.values_list('id', 'team_id', 'team__owner_id', 'manager_id')
+    for project_id, team_id, owner_id, manager_id in projects.iterator():
+        if owner_id:
+            yield access_model(user_id=owner_id, project_id=project_id, team_id=team_id, role='owner')
+        if manager_id:
+            yield access_model(user_id=manager_id, project_id=project_id, team_id=team_id, role='manager')
+        for user_id in members_by_team.get(team_id, []):
+            yield access_model(user_id=user_id, project_id=project_id, team_id=team_id, role='member')
+
+    assignees = task_model.objects.values_list(
+        'project_id', 'project__team_id', 'assigned_to_id'
+    ).distinct()
+    for project_id, team_id, user_id in assignees.iterator():
+        if user_id:
+            yield access_model(user_id=user_id, project_id=project_id, team_id=team_id, role='assignee')
+
+def rebuild_project_access(batch_size=1000):
+    """
+    Rebuild the whole access index from source tables
+    Returns:
+        Number of access rows written
+    """
+    with transaction.atomic():
+        ProjectAccess.objects.all().delete()
+        rows = iter_access_rows(Project, Task, TeamMember, ProjectAccess)
+        ProjectAccess.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+        written = ProjectAccess.objects.count()
+    logger.info(f"Rebuilt project access index: {written} rows")
+    return written
@@ -0,0 +1,56 @@
+from django.db.models import Manager, QuerySet
+
+# Counting helpers for template filters that avoid per-card queries.
+#
+# A collection is counted, in order of preference, from:
+# 1. objects already in memory: lists, evaluated querysets and related
+#    managers filled by prefetch_related() (including Prefetch(to_attr=...))
+# 2. an annotation or counter field on the owner of a related manager,
+#    e.g. Team.objects.annotate(completed_projects_count=...) for
+#    team.projects|completed_projects_count, or Project.done_tasks_count
+#    for project.tasks|completed_tasks_count
+# 3. a COUNT query, as a last resort
+
+def loaded_objects(collection):
+    """
+    Objects of a collection that are already in memory
+    Returns:
+        List of objects, or None when counting them would need a query
+    """
+    if isinstance(collection, Manager):
+        # Prefetched related managers hand back their cached queryset
+        collection = collection.all()
+    if isinstance(collection, QuerySet):
+        return collection._result_cache
+    # Lists from Prefetch(to_attr=...), or an empty template variable
+    return list(collection or [])
+
+def owner_value(collection, name):
+    """Numeric annotation or counter on the object a related manager belongs to"""
+    if not name:
+        return None
+    value = getattr(getattr(collection, 'instance', None), name, None)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def count_all(collection, annotation=None):
+    """Number of objects in a collection"""
+    objects = loaded_objects(collection)
+    if objects is not None:
+        return len(objects)
+    value = owner_value(collection, annotation)
+    if value is not None:
+        return value
+    return collection.count()
+
+def count_matching(collection, field, values, annotation=None):
+    """Number of objects in a collection whose field is one of values"""
+    objects = loaded_objects(collection)
+    if objects is not None:
+        return sum(1 for obj in objects if getattr(obj, field, None) in values)
+    value = owner_value(collection, annotation)
+    if value is not None:
+        return value
+    return collection.filter(**{f'{field}__in': values}).count()
+
+def percentage(part, total):
+    return round((part / total) * 100) if total > 0 else 0
@@ -1,48 +1,37 @@
 from django.utils import timezone
-from django.db.models import Count, Q
-from datetime import timedelta
+from django.db.models import Q, Sum
 import logging
-from ..models import Task, Team
+from ..models import DailyTaskStats, Team
 from .constants import TASK_STATUS_TODO, TASK_STATUS_IN_PROGRESS, TASK_STATUS_DONE
+from .timeseries import GRANULARITY_DAY, get_buckets, get_bucket_labels, sum_by_bucket
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-def get_timeline_labels(time_range=7):
+def get_timeline_labels(time_range=7, granularity=GRANULARITY_DAY):
     """Get timeline labels for last N days"""
     try:
-        today = timezone.now()
-        return [(today - timedelta(days=x)).strftime('%b %d') 
-                for x in range(time_range-1, -1, -1)]
+        return get_bucket_labels(get_buckets(time_range, granularity), granularity)
     except Exception as e:
         logger.error(f"Error getting timeline labels: {e}")
         return []
 
-def get_completed_tasks_data(user, time_range=7):
-    """Get completed tasks data with time range parameter"""
+def get_completed_tasks_data(user, time_range=7, granularity=GRANULARITY_DAY):
+    """Get completed tasks per bucket from the daily rollup"""
     try:
-        tasks = Task.objects.filter(
-            assigned_to=user,
-            status=TASK_STATUS_DONE
-        ).select_related('project')
-        
-        data = []
-        for x in range(time_range-1, -1, -1):
-            date = timezone.now() - timedelta(days=x)
-            count = tasks.filter(completed_at__date=date.date()).count()
-            data.append(count)
-            
-        return data
+        stats = DailyTaskStats.objects.filter(user=user, completed_count__gt=0)
+        return sum_by_bucket(
+            stats, 'date', 'completed_count', get_buckets(time_range, granularity), granularity
+        )
     except Exception as e:
         logger.error(f"Error getting completed tasks data: {e}")
-        return [0] * time_range
+        return [0] * len(get_buckets(time_range, granularity))
 
 def get_task_distribution(user):
     """Get task counts by status"""
     try:
-        tasks = Task.objects.filter(assigned_to=user)
-        distribution = tasks.values('status').annotate(
-            count=Count('id')
+        distribution = DailyTaskStats.objects.filter(user=user).values('status').annotate(
+            count=Sum('created_count')
         ).order_by('status')
         
         status_counts = {
@@ -52,7 +41,7 @@ def get_task_distribution(user):
         }
         
         for item in distribution:
-            status_counts[item['status']] = item['count']
+            status_counts[item['status']] = item['count'] or 0
         
         return [
             status_counts[TASK_STATUS_TODO],
@@ -64,19 +53,18 @@ def get_task_distribution(user):
         return [0, 0, 0]
 
 def get_team_performance(user):
-    """Get completed tasks count per team"""
+    """Get completed tasks count per team (two queries for any number of teams)"""
     try:
-        teams = Team.objects.filter(
-            members__user=user
-        ).prefetch_related('projects__tasks')
-        
-        return [
-            Task.objects.filter(
-                project__team=team,
+        team_ids = list(Team.objects.filter(members__user=user).values_list('id', flat=True))
+        done = dict(
+            DailyTaskStats.objects.filter(
+                team_id__in=team_ids,
                 status=TASK_STATUS_DONE
-            ).count()
-            for team in teams
-        ]
+            ).values('team_id').annotate(
+                count=Sum('created_count')
+            ).order_by().values_list('team_id', 'count')
+        )
+        return [done.get(team_id) or 0 for team_id in team_ids]
     except Exception as e:
         logger.error(f"Error getting team performance: {e}")
         return []
@@ -84,38 +72,32 @@ def get_team_performance(user):
 def calculate_completion_rate(user):
     """Calculate task completion rate for user"""
     try:
-        total_tasks = Task.objects.filter(assigned_to=user).count()
+        stats = DailyTaskStats.objects.filter(user=user).aggregate(
+            total=Sum('created_count'),
+            completed=Sum('created_count', filter=Q(status=TASK_STATUS_DONE))
+        )
+        total_tasks = stats['total'] or 0
         if not total_tasks:
             return 0
-            
-        completed_tasks = Task.objects.filter(
-            assigned_to=user,
-            status=TASK_STATUS_DONE
-        ).count()
-        
-        return round((completed_tasks / total_tasks) * 100)
+
+        return round(((stats['completed'] or 0) / total_tasks) * 100)
     except Exception as e:
         logger.error(f"Error calculating completion rate: {e}")
         return 0
 
-def get_completion_trend(user, time_range=7):
+def get_completion_trend(user, time_range=7, granularity=GRANULARITY_DAY):
     """Get task completion trend for the specified time range"""
     try:
-        tasks = Task.objects.filter(assigned_to=user)
-        trend_data = []
-        
-        for x in range(time_range-1, -1, -1):
-            date = timezone.now() - timedelta(days=x)
-            total = tasks.filter(created_at__date=date.date()).count()
-            completed = tasks.filter(
-                status=TASK_STATUS_DONE,
-                completed_at__date=date.date()
-            ).count()
-            
-            percentage = (completed / total * 100) if total > 0 else 0
-            trend_data.append(round(percentage, 1))
-            
-        return trend_data
+        stats = DailyTaskStats.objects.filter(user=user)
+        buckets = get_buckets(time_range, granularity)
+        created = sum_by_bucket(stats, 'date', 'created_count', buckets, granularity)
+        completed = sum_by_bucket(
+            stats.filter(completed_count__gt=0), 'date', 'completed_count', buckets, granularity
+        )
+        return [
+            round((done / total * 100) if total > 0 else 0, 1)
+            for done, total in zip(completed, created)
+        ]
     except Exception as e:
         logger.error(f"Error getting completion trend: {e}")
-        return [0] * time_range
\ No newline at end of file
+        return [0] * len(get_buckets(time_range, granularity))
@@ -0,0 +1,262 @@
+from collections import Counter
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+import logging
+import uuid
+from ..models import Project, ProjectAccess, Task, User
+from .access import refresh_assignees_access
+from .analytics import calculate_completion_rate
+from .chrome import invalidate_summary
+from .constants import TASK_STATUS_DONE
+from . import counters, rollups
+from .outbox import enqueue_notifications
+from .permissions import get_permission_resolver
+from .versions import SCOPE_PROJECT, bump, bump_team_users
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+BATCH_FIELDS = ('status', 'assigned_to', 'priority', 'start_date', 'due_date')
+STATUS_LABELS = dict(Task.STATUS_CHOICES)
+PRIORITIES = {priority for priority, _ in Task.PRIORITY_CHOICES}
+
+
+def clean_changes(changes):
+    """
+    Validate a change set for apply_task_changes
+    Returns:
+        Dict of field -> value with dates parsed and the assignee loaded
+    Raises:
+        ValidationError: Unknown fields or invalid values
+    """
+    if not isinstance(changes, dict) or not changes:
+        raise ValidationError('No changes given')
+    unknown = set(changes) - set(BATCH_FIELDS)
+    if unknown:
+        raise ValidationError(f"Unsupported fields: {', '.join(sorted(unknown))}")
+
+    cleaned = {}
+    if 'status' in changes:
+        if changes['status'] not in STATUS_LABELS:
+            raise ValidationError('Invalid status value')
+        cleaned['status'] = changes['status']
+    if 'priority' in changes:
+        if changes['priority'] not in PRIORITIES:
+            raise ValidationError('Invalid priority value')
+        cleaned['priority'] = changes['priority']
+    for field in ('start_date', 'due_date'):
+        if field in changes:
+            try:
+                cleaned[field] = parse_date(str(changes[field]))
+            except ValueError:
+                cleaned[field] = None
+            if cleaned[field] is None:
+                raise ValidationError(f"{field} must be a date (YYYY-MM-DD)")
+    if 'assigned_to' in changes:
+        try:
+            cleaned['assigned_to'] = User.objects.get(pk=changes['assigned_to'])
+        except (User.DoesNotExist, TypeError, ValueError):
+            raise ValidationError(f"Unknown user: {changes['assigned_to']!r}")
+    return cleaned
+
+def _check(user, tasks, changes):
+    """
+    One permission and validation pass over the loaded tasks, answered from
+    the resolvers' preloaded memberships instead of a query per task
+    Raises:
+        PermissionDenied: The user may not change one of the tasks
+        ValidationError: A task would end up invalid, as Task.clean() would say
+    """
+    resolver = get_permission_resolver(user)
+    assignee = changes.get('assigned_to')
+    assignee_resolver = get_permission_resolver(assignee) if assignee else None
+    denied, errors = [], {}
+    for task in tasks:
+        if not resolver.has_task_permission(task) or (
+            assignee is not None and not resolver.can_assign_tasks(task.project)
+        ):
+            denied.append(task.pk)
+            continue
+        start_date = changes.get('start_date', task.start_date)
+        due_date = changes.get('due_date', task.due_date)
+        if start_date > due_date:
+            errors[task.pk] = 'Due date must be after start date'
+        elif assignee_resolver and not assignee_resolver.has_project_permission(task.project):
+            errors[task.pk] = 'Assigned user does not have access to this project'
+    if denied:
+        raise PermissionDenied(f"You don't have permission to change tasks {denied}")
+    if errors:
+        raise ValidationError({str(pk): [message] for pk, message in errors.items()})
+
+def _update_values(changes, now):
+    """Column values for the single UPDATE, computing completed_at in SQL"""
+    values = dict(changes)
+    if 'status' in changes:
+        if changes['status'] == TASK_STATUS_DONE:
+            # Tasks already done keep their completion time
+            values['completed_at'] = Case(
+                When(status=TASK_STATUS_DONE, completed_at__isnull=False, then=F('completed_at')),
+                default=Value(now)
+            )
+        else:
+            values['completed_at'] = None
+    values['updated_at'] = values['last_active'] = now
+    return values
+
+def _apply_in_memory(tasks, changes, now):
+    """
+    Mirror the UPDATE on the loaded instances. Their trackers still hold the
+    loaded values, so the rollup and counter helpers see before and after.
+    """
+    for task in tasks:
+        was_done = task.status == TASK_STATUS_DONE
+        for field, value in changes.items():
+            setattr(task, field, value)
+        if 'status' in changes:
+            if task.status != TASK_STATUS_DONE:
+                task.completed_at = None
+            elif not (was_done and task.completed_at):
+                task.completed_at = now
+
+def record_updated_tasks(tasks):
+    """
+    Apply what the Task signals would have done for the updated tasks:
+    counters, daily rollups, assignee access, versions and cached sidebar
+    counters, each in set-based writes
+    """
+    counters.record_tasks_updated(tasks)
+    rollups.record_tasks_updated(tasks)
+
+    previous = {(task.project_id, task.tracker.previous('assigned_to')) for task in tasks}
+    current = {(task.project_id, task.assigned_to_id): task.project.team_id for task in tasks}
+    ProjectAccess.objects.bulk_create([
+        ProjectAccess(
+            user_id=user_id, project_id=project_id, team_id=team_id, role=ProjectAccess.ROLE_ASSIGNEE
+        )
+        for (project_id, user_id), team_id in current.items() if (project_id, user_id) not in previous
+    ], ignore_conflicts=True)
+    refresh_assignees_access(previous - set(current))
+
+    team_users = {}
+    for task in tasks:
+        team_users.setdefault(task.project.team_id, set()).update(
+            {task.assigned_to_id, task.tracker.previous('assigned_to')}
+        )
+    bump(SCOPE_PROJECT, *{task.project_id for task in tasks})
+    for team_id, user_ids in team_users.items():
+        bump_team_users(team_id, *user_ids)
+    invalidate_summary(*{user_id for _, user_id in previous | set(current)})
+
+def _fan_out(counts, message, batch_id, action_type, **kwargs):
+    """One notification per user; users with the same count share one fan-out"""
+    by_count = {}
+    for user_id, count in counts.items():
+        by_count.setdefault(count, []).append(user_id)
+    for count, user_ids in by_count.items():
+        enqueue_notifications(
+            user_ids, message(count), action_type=action_type, event=f"{action_type}:{batch_id}", **kwargs
+        )
+
+def notify_task_changes(tasks, changes, user):
+    """
+    Coalesced notifications: each assignee and project manager gets one
+    message for the whole batch instead of one per task. Each batch is its
+    own event, so equal messages from separate batches are all delivered.
+    """
+    batch_id = uuid.uuid4().hex
+    if 'status' in changes:
+        label = STATUS_LABELS[changes['status']]
+        moved = Counter(
+            task.assigned_to_id for task in tasks if task.tracker.previous('status') != task.status
+        )
+        _fan_out(
+            moved, lambda count: f"{count} of your tasks moved to {label} by {user.username}",
+            batch_id, 'task_status_changed'
+        )
+        if changes['status'] == TASK_STATUS_DONE:
+            completed = Counter(
+                task.project.manager_id for task in tasks
+                if task.tracker.previous('status') != TASK_STATUS_DONE
+            )
+            _fan_out(
+                completed,
+                lambda count: f"{count} {'task has' if count == 1 else 'tasks have'} been completed",
+                batch_id, 'task_completed', notification_type='success'
+            )
+    if 'assigned_to' in changes:
+        count = sum(1 for task in tasks if task.tracker.previous('assigned_to') != task.assigned_to_id)
+        if count:
+            noun = 'task was' if count == 1 else 'tasks were'
+            enqueue_notifications(
+                [changes['assigned_to'].pk], f"{count} {noun} assigned to you by {user.username}",
+                action_type='task_assigned', event=f"task_assigned:{batch_id}"
+            )
+
+def apply_task_changes(user, task_ids, changes):
+    """
+    Apply one change set to many tasks in one transaction: the tasks are
+    locked and loaded with one query, checked in one permission pass and
+    written with one UPDATE, instead of a locked save() per task
+    Args:
+        task_ids: Ids of the tasks to change
+        changes: Dict with any of status, assigned_to (user id), priority,
+            start_date and due_date
+    Returns:
+        Dict of updated count, the tasks' new state, the task counters of
+        every affected project and the user's completion rate
+    Raises:
+        ValidationError: Invalid changes, too many tasks, or a task that
+            would become invalid
+        PermissionDenied: The user may not change one of the tasks
+        Task.DoesNotExist: Some of the ids do not exist
+    """
+    try:
+        task_ids = {int(pk) for pk in task_ids}
+    except (TypeError, ValueError):
+        raise ValidationError('Task ids must be integers')
+    max_size = getattr(settings, 'TASK_BATCH_MAX_SIZE', 500)
+    if not task_ids:
+        raise ValidationError('No tasks given')
+    if len(task_ids) > max_size:
+        raise ValidationError(f"At most {max_size} tasks can be changed at once")
+    changes = clean_changes(changes)
+
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_related('project').select_for_update().filter(pk__in=task_ids).order_by('pk')
+        )
+        missing = task_ids - {task.pk for task in tasks}
+        if missing:
+            raise Task.DoesNotExist(f"Tasks not found: {sorted(missing)}")
+        _check(user, tasks, changes)
+
+        now = timezone.now()
+        updated = Task.objects.filter(pk__in=task_ids).update(**_update_values(changes, now))
+        _apply_in_memory(tasks, changes, now)
+        record_updated_tasks(tasks)
+        notify_task_changes(tasks, changes, user)
+
+        projects = {}
+        for pk, *counts in Project.objects.filter(pk__in={task.project_id for task in tasks}).values_list(
+            'pk', *counters.TASK_COUNTER_FIELDS.values()
+        ):
+            projects[pk] = dict(zip(counters.TASK_COUNTER_FIELDS.values(), counts), total_tasks_count=sum(counts))
+        result = {
+            'updated': updated,
+            'tasks': [
+                {
+                    'id': task.pk, 'status': task.status, 'priority': task.priority,
+                    'assigned_to': task.assigned_to_id, 'start_date': task.start_date,
+                    'due_date': task.due_date, 'completed_at': task.completed_at,
+                }
+                for task in tasks
+            ],
+            'projects': projects,
+            'completion_rate': calculate_completion_rate(user),
+        }
+    logger.info(f"{user} changed {sorted(changes)} on {updated} tasks")
+    return result
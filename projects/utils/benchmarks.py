@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+import logging
+import statistics
+import time
+from ..models import Team
+from .querybudget import record_queries
+from .seeding import SCALES, busiest_user, seed_benchmark_data
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+SEARCH_TEXT = 'rep'
+
+def benchmark_targets(user):
+    """(name, url, headers) of the key views, pointed at the user's largest team"""
+    team = Team.objects.filter(members__user=user).order_by('-members_count', 'pk').first()
+    targets = [
+        ('homepage', reverse('homepage'), {}),
+        ('project_list', reverse('project_list'), {}),
+        ('analytics_data', reverse('analytics_data') + '?range=30', AJAX),
+        ('api_search', f"{reverse('api_search')}?q={SEARCH_TEXT}", AJAX),
+        ('notification_list', reverse('notifications'), {}),
+    ]
+    if team is not None:
+        targets.insert(2, ('team_detail', reverse('team_detail', args=[team.pk]), {}))
+    return targets
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def time_view(client, url, headers=None, repeat=10, cold=False):
+    """
+    Time repeated GETs of a URL after one warm-up request
+    Args:
+        cold: Clear the cache before every request
+    Returns:
+        Dict of latency (ms), query and response figures
+    """
+    headers = headers or {}
+    client.get(url, **headers)
+    timings, queries, sql_ms = [], [], []
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+        with record_queries() as stats:
+            start = time.perf_counter()
+            response = client.get(url, **headers)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(stats.count)
+        sql_ms.append(stats.duration_ms)
+    return {
+        'status': response.status_code,
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(_percentile(timings, 0.95), 2),
+        'min_ms': round(min(timings), 2),
+        'queries': int(statistics.median(queries)),
+        'sql_ms': round(statistics.median(sql_ms), 2),
+        'repeated_queries': stats.duplicate_count,
+        'bytes': len(response.content),
+    }
+
+def benchmark_views(user, repeat=10, cold=False):
+    client = Client()
+    client.force_login(user)
+    return {
+        name: time_view(client, url, headers, repeat, cold)
+        for name, url, headers in benchmark_targets(user)
+    }
+
+def run_benchmarks(scales=('small', 'medium'), repeat=10, cold=False, seed=42):
+    """
+    Seed a scratch test database per scale and time the key views against it.
+    The configured database is never written to.
+    Returns:
+        JSON-serializable report; same seed and scales give comparable reports
+    """
+    report = {
+        'generated_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'seed': seed,
+        'repeat': repeat,
+        'cold_cache': cold,
+        'scales': {},
+    }
+    setup_test_environment()
+    try:
+        # Notifications are written inline so no thread outlives a scratch database
+        with override_settings(NOTIFICATION_OUTBOX_WORKER='sync'):
+            for scale in scales:
+                report['scales'][scale] = _run_scale(scale, repeat, cold, seed)
+    finally:
+        teardown_test_environment()
+    return report
+
+def _run_scale(scale, repeat, cold, seed):
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        cache.clear()
+        volumes = seed_benchmark_data(**SCALES[scale], seed=seed)
+        user = busiest_user()
+        logger.info(f"Benchmarking {scale} scale as {user.username}")
+        return {'volumes': volumes, 'views': benchmark_views(user, repeat, cold)}
+    finally:
+        cache.clear()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+def compare_reports(previous, current):
+    """
+    Median latency and query changes per scale and view
+    Returns:
+        List of (scale, view, previous_ms, current_ms, change_pct, previous_queries, current_queries)
+    """
+    rows = []
+    for scale, result in current['scales'].items():
+        before = previous.get('scales', {}).get(scale, {}).get('views', {})
+        for view, figures in result['views'].items():
+            if view not in before:
+                continue
+            old_ms, new_ms = before[view]['median_ms'], figures['median_ms']
+            change = round((new_ms - old_ms) / old_ms * 100, 1) if old_ms else 0.0
+            rows.append((scale, view, old_ms, new_ms, change, before[view]['queries'], figures['queries']))
+    return rows
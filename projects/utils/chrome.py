@@ -0,0 +1,183 @@
+from functools import partial
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
+import logging
+from ..models import Notification, Project, Task, TeamMember, User
+from .constants import CACHE_TIMEOUT_SHORT, TASK_STATUS_DONE, PROJECT_STATUS_ACTIVE
+from .streams import publish_change
+from .versions import SCOPE_NOTIFICATIONS, bump
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_KEY = 'chrome:summary:{user_id}'
+HEADER_CACHE_KEY = 'chrome:header:{user_id}'
+HEADER_NOTIFICATION_LIMIT = 5
+
+SUMMARY_KEYS = [
+    'user_teams',
+    'team_members_count',
+    'tasks_count',
+    'completed_tasks_count',
+    'pending_tasks_count',
+    'completion_rate',
+    'projects_count',
+    'active_projects_count',
+]
+
+def build_summary(user):
+    """Compute the sidebar counters for a user (4 queries)"""
+    team_ids = list(
+        TeamMember.objects.filter(user=user).values_list('team_id', flat=True).distinct()
+    )
+    task_stats = Task.objects.filter(assigned_to=user).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status=TASK_STATUS_DONE)),
+        pending=Count('id', filter=Q(status__in=['todo', 'inprogress']))
+    )
+    project_stats = Project.objects.filter(team_id__in=team_ids).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status=PROJECT_STATUS_ACTIVE))
+    )
+    total_tasks = task_stats['total']
+
+    return {
+        'user_teams': team_ids,
+        'team_members_count': TeamMember.objects.filter(team_id__in=team_ids).count(),
+        'tasks_count': total_tasks,
+        'completed_tasks_count': task_stats['completed'],
+        'pending_tasks_count': task_stats['pending'],
+        'completion_rate': (
+            round((task_stats['completed'] / total_tasks) * 100) if total_tasks else 0
+        ),
+        'projects_count': project_stats['total'],
+        'active_projects_count': project_stats['active'],
+    }
+
+def build_header(user):
+    """Load the notification dropdown data for a user (2 queries)"""
+    notifications = Notification.objects.filter(user=user).select_related(
+        'content_type'
+    ).order_by('-created_at')
+    return {
+        'notifications': list(notifications[:HEADER_NOTIFICATION_LIMIT]),
+        # Re-read by primary key: a stream's user instance outlives many changes
+        'unread_notifications_count': (
+            User.objects.filter(pk=user.pk).values_list('unread_notifications_count', flat=True).first() or 0
+        ),
+    }
+
+def _get_cached(key, builder, user):
+    data = cache.get(key)
+    if data is None:
+        data = builder(user)
+        cache.set(key, data, CACHE_TIMEOUT_SHORT)
+    return data
+
+def _delete_after_commit(keys):
+    """
+    Drop cache keys once the surrounding transaction commits; deleting
+    earlier lets a concurrent request cache pre-commit data again for the
+    full timeout
+    """
+    transaction.on_commit(partial(cache.delete_many, keys))
+
+def invalidate_summary(*user_ids):
+    """Drop cached sidebar counters for the given users after commit"""
+    keys = [SUMMARY_CACHE_KEY.format(user_id=user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        _delete_after_commit(keys)
+
+def invalidate_header(*user_ids):
+    """
+    Drop cached notification dropdown data, move the users' notification
+    watermarks forward and refresh their open notification streams, all
+    after commit
+    """
+    keys = [HEADER_CACHE_KEY.format(user_id=user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        _delete_after_commit(keys)
+        bump(SCOPE_NOTIFICATIONS, *user_ids)
+        publish_change(*user_ids)
+
+def invalidate_team_summary(team_id, *extra_user_ids):
+    """Drop cached sidebar counters for every member of a team"""
+    member_ids = TeamMember.objects.filter(team_id=team_id).values_list('user_id', flat=True)
+    invalidate_summary(*member_ids, *extra_user_ids)
+
+
+class ChromeContext:
+    """
+    Request-scoped header/sidebar data.
+    Nothing is computed until a value is read, each value is computed at most
+    once per request, and results are shared across requests via the per-user
+    cache until a Task/Notification/TeamMember/Project write invalidates them.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def summary(self):
+        return _get_cached(
+            SUMMARY_CACHE_KEY.format(user_id=self.user.pk), build_summary, self.user
+        )
+
+    @cached_property
+    def header(self):
+        return _get_cached(
+            HEADER_CACHE_KEY.format(user_id=self.user.pk), build_header, self.user
+        )
+
+    @property
+    def notifications(self):
+        return self.header['notifications']
+
+    @property
+    def unread_notifications_count(self):
+        # The counter is on the request's user row, already loaded by auth
+        return self.user.unread_notifications_count
+
+    def get(self, key):
+        """Return a single summary value, loading the summary on first use"""
+        try:
+            return self.summary[key]
+        except Exception as e:
+            logger.error(f"Chrome context error: {str(e)}")
+            return 0
+
+    def as_context(self):
+        """
+        Template context of callables; the template engine only calls the ones
+        a template actually renders.
+        """
+        context = {key: partial(self.get, key) for key in SUMMARY_KEYS}
+        context.update({
+            'notifications': lambda: self.notifications,
+            'unread_notifications_count': lambda: self.unread_notifications_count,
+        })
+        return context
+
+def header_payload(user):
+    """Latest notifications and unread count as sent to the notification dropdown"""
+    chrome = ChromeContext(user)
+    return {
+        'notifications': [
+            {
+                'id': n.id,
+                'message': n.message,
+                'created_at': n.created_at.isoformat(),
+                'read': n.read
+            } for n in chrome.notifications
+        ],
+        'unread_count': chrome.header['unread_notifications_count']
+    }
+
+def get_chrome(request):
+    """Return the request's ChromeContext, creating it if middleware did not"""
+    chrome = getattr(request, 'chrome', None)
+    if chrome is None:
+        chrome = request.chrome = ChromeContext(request.user)
+    return chrome
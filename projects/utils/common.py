@@ -4,6 +4,7 @@ from datetime import timedelta
 import logging
 from ..models import Project, Task, Notification, TeamMember  # Add TeamMember here
 from .projects import get_user_projects
+from .access import get_accessible_projects
 from .tasks import get_user_tasks
 from .constants import TASK_STATUS_TODO, TASK_STATUS_IN_PROGRESS
 
@@ -13,12 +14,7 @@ logger = logging.getLogger(__name__)
 def get_common_context(request):
     """Get common context data for all views"""
     if request.user.is_authenticated:
-        projects = Project.objects.filter(
-            Q(team__members__user=request.user) |  # Projects where user is team member
-            Q(team__owner=request.user) |          # Projects owned by user 
-            Q(manager=request.user) |              # Projects managed by user
-            Q(tasks__assigned_to=request.user)     # Projects with tasks assigned
-        ).distinct().select_related(
+        projects = get_accessible_projects(request.user).select_related(
             'team',
             'manager'
         ).prefetch_related(
@@ -30,11 +26,6 @@ def get_common_context(request):
             'user_projects': projects,
             'projects_count': projects.count(),
             'active_projects': projects.filter(status='active'),
-            'active_projects_count': projects.filter(status='active').count(),
-            'notifications': Notification.objects.filter(user=request.user)[:5],
-            'unread_notifications_count': Notification.objects.filter(
-                user=request.user, 
-                read=False
-            ).count()
+            'active_projects_count': projects.filter(status='active').count()
         }
     return {}
\ No newline at end of file
@@ -14,6 +14,7 @@ TASK_STATUS_CHOICES = [
     (TASK_STATUS_IN_PROGRESS, 'In Progress'),
     (TASK_STATUS_DONE, 'Done'),
 ]
+TASK_STATUSES = tuple(status for status, _ in TASK_STATUS_CHOICES)
 
 # Notification types
 NOTIFICATION_INFO = 'info'
@@ -21,6 +22,10 @@ NOTIFICATION_SUCCESS = 'success'
 NOTIFICATION_WARNING = 'warning'
 NOTIFICATION_ERROR = 'error'
 
+# Notification deduplication windows (in seconds)
+NOTIFICATION_DEDUP_WINDOW = 3600  # 1 hour
+NOTIFICATION_DEADLINE_WINDOW = 86400  # 24 hours
+
 # Message strings
 MSG_PERMISSION_DENIED = "You don't have permission to perform this action."
 MSG_TASK_STATUS_UPDATED = "Task status updated successfully."
@@ -43,8 +48,13 @@ PROJECT_STATUS_ON_HOLD = 'on_hold'
 
 # Pagination settings
 ITEMS_PER_PAGE = 10
+TASKS_PER_COLUMN = 20  # per kanban column, further tasks load on scroll
+PROJECTS_PER_SECTION = 12
 MAX_PAGE_DISPLAY = 5
 
+# Analytics
+ANALYTICS_MAX_RANGE = 730  # days
+
 # Cache timeouts (in seconds)
 CACHE_TIMEOUT_SHORT = 300  # 5 minutes
 CACHE_TIMEOUT_MEDIUM = 3600  # 1 hour
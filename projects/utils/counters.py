@@ -0,0 +1,248 @@
+from collections import Counter
+from django.db import connection, transaction
+from django.db.models import Count, F
+import logging
+from ..models import Notification, Project, Task, Team, TeamMember, User
+from .constants import TASK_STATUS_DONE, TASK_STATUS_IN_PROGRESS, TASK_STATUS_TODO
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Task status -> counter field, shared by Team and Project
+TASK_COUNTER_FIELDS = {
+    TASK_STATUS_TODO: 'todo_tasks_count',
+    TASK_STATUS_IN_PROGRESS: 'inprogress_tasks_count',
+    TASK_STATUS_DONE: 'done_tasks_count',
+}
+
+def total_tasks_count():
+    """Expression adding up the task counters of a Team or Project row"""
+    todo, inprogress, done = (F(field) for field in TASK_COUNTER_FIELDS.values())
+    return todo + inprogress + done
+
+def apply_counter_deltas(deltas):
+    """
+    Apply (model, pk, field) -> delta changes with one F() update per row
+    """
+    by_row = {}
+    for (model, pk, field), delta in deltas.items():
+        if delta and pk:
+            by_row.setdefault((model, pk), {})[field] = F(field) + delta
+    for (model, pk), updates in by_row.items():
+        model.objects.filter(pk=pk).update(**updates)
+
+def _task_contribution(project_id, team_id, status):
+    counts = Counter()
+    field = TASK_COUNTER_FIELDS.get(status)
+    if field:
+        counts[(Project, project_id, field)] += 1
+        counts[(Team, team_id, field)] += 1
+    return counts
+
+def record_task_change(task, created):
+    """Move a saved task from its previous project/status counters to its current ones"""
+    deltas = _task_contribution(task.project_id, task.project.team_id, task.status)
+    if not created:
+        tracker = task.tracker
+        project_id = tracker.previous('project')
+        if project_id == task.project_id:
+            team_id = task.project.team_id
+        else:
+            team_id = Project.objects.filter(pk=project_id).values_list('team_id', flat=True).first()
+        deltas.subtract(_task_contribution(project_id, team_id, tracker.previous('status')))
+    apply_counter_deltas(deltas)
+
+def record_task_delete(task):
+    deltas = Counter()
+    deltas.subtract(_task_contribution(task.project_id, task.project.team_id, task.status))
+    apply_counter_deltas(deltas)
+
+def record_tasks_created(tasks):
+    """Count bulk-created tasks, which skip post_save, with one update per project and team"""
+    deltas = Counter()
+    for task in tasks:
+        deltas.update(_task_contribution(task.project_id, task.project.team_id, task.status))
+    apply_counter_deltas(deltas)
+
+def record_tasks_updated(tasks):
+    """
+    Move bulk-updated tasks, which skip post_save, between status counters.
+    The tasks carry their new state and their trackers the loaded one;
+    their project must not have changed.
+    """
+    deltas = Counter()
+    for task in tasks:
+        deltas.update(_task_contribution(task.project_id, task.project.team_id, task.status))
+        deltas.subtract(_task_contribution(task.project_id, task.project.team_id, task.tracker.previous('status')))
+    apply_counter_deltas(deltas)
+
+def record_member_change(member, delta):
+    apply_counter_deltas({(Team, member.team_id, 'members_count'): delta})
+
+def record_members_created(team_id, count):
+    """Count bulk-created members, which skip post_save, with one update"""
+    apply_counter_deltas({(Team, team_id, 'members_count'): count})
+
+def record_project_change(project, created):
+    """Count a new project, or move a project's tasks along with it to another team"""
+    if created:
+        apply_counter_deltas({(Team, project.team_id, 'projects_count'): 1})
+        return
+    previous_team_id = project.tracker.previous('team')
+    if previous_team_id == project.team_id:
+        return
+    task_counts = Project.objects.filter(pk=project.pk).values(*TASK_COUNTER_FIELDS.values()).first() or {}
+    deltas = Counter()
+    for field, count in [('projects_count', 1), *task_counts.items()]:
+        deltas[(Team, project.team_id, field)] += count
+        deltas[(Team, previous_team_id, field)] -= count
+    apply_counter_deltas(deltas)
+
+def record_project_delete(project):
+    # The project's tasks are deleted first and decrement the team themselves
+    apply_counter_deltas({(Team, project.team_id, 'projects_count'): -1})
+
+def record_unread_changes(deltas):
+    """
+    Apply user_id -> change in unread notifications. Users sharing a change
+    are updated together, so a fan-out to a whole team is one UPDATE.
+    """
+    by_delta = {}
+    for user_id, delta in deltas.items():
+        if delta and user_id:
+            by_delta.setdefault(delta, []).append(user_id)
+    for delta, user_ids in by_delta.items():
+        User.objects.filter(pk__in=user_ids).update(
+            unread_notifications_count=F('unread_notifications_count') + delta
+        )
+
+def record_notification_change(notification, created):
+    if created:
+        delta = 0 if notification.read else 1
+    elif notification.tracker.has_changed('read'):
+        delta = -1 if notification.read else 1
+    else:
+        return
+    record_unread_changes({notification.user_id: delta})
+
+def update_read_state(notifications, read):
+    """
+    Mark a queryset of notifications (of any users) read or unread, moving
+    the unread counts of their recipients with it
+    Returns:
+        Number of notifications changed
+    """
+    changing = notifications.exclude(read=read)
+    per_user = changing.values_list('user_id').annotate(count=Count('pk')).order_by()
+    sign = -1 if read else 1
+    deltas = {user_id: sign * count for user_id, count in per_user}
+    updated = changing.update(read=read)
+    record_unread_changes(deltas)
+    return updated
+
+def delete_notifications(notifications, batch_size=500):
+    """
+    Delete a queryset of notifications with plain DELETE statements and
+    settle the unread counts once. QuerySet.delete() would send post_delete
+    for every row, each updating a counter and refreshing the header. The
+    rows are locked while counted, so one marked read meanwhile cannot skew
+    the counts. Callers refresh the headers of the returned users.
+    Returns:
+        Tuple of (number of notifications deleted, set of recipient ids)
+    """
+    with transaction.atomic():
+        rows = list(notifications.select_for_update().values_list('pk', 'user_id', 'read'))
+        table = connection.ops.quote_name(Notification._meta.db_table)
+        pk_column = connection.ops.quote_name(Notification._meta.pk.column)
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                pks = [pk for pk, _, _ in rows[start:start + batch_size]]
+                placeholders = ', '.join(['%s'] * len(pks))
+                cursor.execute(f"DELETE FROM {table} WHERE {pk_column} IN ({placeholders})", pks)
+        unread = Counter(user_id for _, user_id, read in rows if not read)
+        record_unread_changes({user_id: -count for user_id, count in unread.items()})
+    return len(rows), {user_id for _, user_id, _ in rows}
+
+def compute_counters(team_model=Team, project_model=Project, task_model=Task, member_model=TeamMember):
+    """
+    Compute the expected counters with four grouped queries
+    Returns:
+        (team_counters, project_counters) dicts mapping pk -> {field: count}
+    """
+    team_fields = Team.COUNTER_FIELDS
+    project_fields = Project.COUNTER_FIELDS
+    teams = {pk: dict.fromkeys(team_fields, 0) for pk in team_model.objects.values_list('pk', flat=True)}
+    projects = {pk: dict.fromkeys(project_fields, 0) for pk in project_model.objects.values_list('pk', flat=True)}
+
+    members = member_model.objects.values_list('team_id').annotate(count=Count('pk')).order_by()
+    for team_id, count in members:
+        teams[team_id]['members_count'] = count
+    team_projects = project_model.objects.values_list('team_id').annotate(count=Count('pk')).order_by()
+    for team_id, count in team_projects:
+        teams[team_id]['projects_count'] = count
+    tasks = (
+        task_model.objects
+        .filter(status__in=TASK_COUNTER_FIELDS)
+        .values_list('project_id', 'project__team_id', 'status')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    for project_id, team_id, status, count in tasks:
+        field = TASK_COUNTER_FIELDS[status]
+        projects[project_id][field] += count
+        teams[team_id][field] += count
+    return teams, projects
+
+def compute_unread_counts(user_model=User, notification_model=Notification):
+    """
+    Expected unread notification count per user, with one grouped query
+    Returns:
+        Dict mapping user pk -> {'unread_notifications_count': count}
+    """
+    users = {
+        pk: {'unread_notifications_count': 0}
+        for pk in user_model.objects.values_list('pk', flat=True)
+    }
+    unread = notification_model.objects.filter(read=False).values_list('user_id').annotate(count=Count('pk')).order_by()
+    for user_id, count in unread:
+        users[user_id]['unread_notifications_count'] = count
+    return users
+
+def stale_counter_rows(queryset, fields, expected):
+    """
+    Rows whose counters differ from expected (pk -> {field: count}), with the
+    expected values set. Rows are loaded with only() rather than built with
+    model(pk=...), which would evaluate callable defaults such as Team.owner's.
+    Fields watched by the model's FieldTracker are loaded too, since the
+    tracker reads them as each row is built.
+    """
+    tracked = getattr(getattr(queryset.model, 'tracker', None), 'fields', ())
+    stale = []
+    for obj in queryset.only(*fields, *tracked).iterator():
+        counts = expected.get(obj.pk)
+        if counts is not None and any(getattr(obj, field) != counts[field] for field in fields):
+            for field, count in counts.items():
+                setattr(obj, field, count)
+            stale.append(obj)
+    return stale
+
+def repair_counters(dry_run=False, batch_size=1000):
+    """
+    Recompute every Team, Project and User counter and fix the rows that
+    drifted, e.g. after queryset.update() or bulk_create() calls that bypass
+    signals. Run it periodically (e.g. nightly from cron) to bound drift.
+    Returns:
+        Dict with the number of teams, projects and users repaired
+    """
+    with transaction.atomic():
+        expected_teams, expected_projects = compute_counters()
+        result = {}
+        for model, expected in (
+            (Team, expected_teams), (Project, expected_projects), (User, compute_unread_counts())
+        ):
+            stale = stale_counter_rows(model.objects.all(), model.COUNTER_FIELDS, expected)
+            if not dry_run:
+                model.objects.bulk_update(stale, model.COUNTER_FIELDS, batch_size=batch_size)
+            result[model._meta.model_name + 's'] = len(stale)
+    logger.info(f"Repaired counters: {result}")
+    return result
@@ -1,26 +1,63 @@
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from datetime import timedelta
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.template.loader import get_template
+from django.utils import timezone
 from django.utils.html import strip_tags
 from django.conf import settings
+from django.db.models import F, Min, Q
 import logging
+import threading
+import time
+import traceback
+import uuid
+from ..models import OutgoingEmail
+from .jobs import MODE_QUEUE, MODE_SYNC, enqueue, is_queued, job_setting, retry_delay
 
 logger = logging.getLogger(__name__)
 
+TEAM_REMOVAL_TEMPLATE = 'emails/team_removal.html'
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+def email_setting(name, default):
+    return getattr(settings, f'EMAIL_DISPATCH_{name}', default)
+
+def compiled_template(name):
+    """
+    Compiled email template from a process cache, so bulk sends load and
+    parse each template once instead of once per message
+    """
+    template = _templates.get(name)
+    if template is None:
+        with _templates_lock:
+            template = _templates.setdefault(name, get_template(name))
+    return template
+
+def render_email(template, context):
+    """
+    Returns:
+        Tuple of (html, plain text) bodies
+    """
+    html_message = compiled_template(template).render(context)
+    return html_message, strip_tags(html_message)
+
+def team_removal_context(user, team, reason=None):
+    """JSON-safe context for the team removal template, with the names it reads"""
+    return {
+        'user': {'get_full_name': user.get_full_name(), 'username': user.username},
+        'team': {'name': team.name},
+        'reason': reason
+    }
+
 def send_team_removal_email(user, team, reason=None):
     """Send email notification when user is removed from team"""
     try:
-        subject = f"You have been removed from {team.name}"
-        context = {
-            'user': user,
-            'team': team,
-            'reason': reason
-        }
-        
-        html_message = render_to_string('emails/team_removal.html', context)
-        plain_message = strip_tags(html_message)
-        
+        html_message, plain_message = render_email(
+            TEAM_REMOVAL_TEMPLATE, team_removal_context(user, team, reason)
+        )
         send_mail(
-            subject=subject,
+            subject=f"You have been removed from {team.name}",
             message=plain_message,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[user.email],
@@ -30,4 +67,179 @@ def send_team_removal_email(user, team, reason=None):
         return True
     except Exception as e:
         logger.error(f"Failed to send team removal email: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def queue_team_removal_email(user, team, reason=None):
+    """Queue the team removal email for the dispatcher"""
+    return queue_email(
+        user.email, f"You have been removed from {team.name}",
+        TEAM_REMOVAL_TEMPLATE, team_removal_context(user, team, reason)
+    )
+
+def queue_email(to_email, subject, template, context=None):
+    return queue_emails([(to_email, subject, template, context or {})])
+
+def queue_emails(messages):
+    """
+    Queue emails in the current transaction and schedule one dispatch job
+    for after the commit; a rollback discards both
+    Args:
+        messages: Iterable of (to_email, subject, template, context)
+    Returns:
+        Number of emails queued
+    """
+    emails = OutgoingEmail.objects.bulk_create([
+        OutgoingEmail(to_email=to_email, subject=subject, template=template, context=context)
+        for to_email, subject, template, context in messages if to_email
+    ])
+    if emails:
+        enqueue(dispatch_emails)
+    return len(emails)
+
+def claim_emails(batch_size, token):
+    """
+    Claim up to batch_size due emails. The conditional UPDATE only matches
+    rows no other dispatcher has claimed, so concurrent jobs never send the
+    same email twice.
+    """
+    now = timezone.now()
+    ids = list(
+        OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_QUEUED, send_after__lte=now)
+        .order_by('send_after', 'pk').values_list('pk', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    OutgoingEmail.objects.filter(pk__in=ids, status=OutgoingEmail.STATUS_QUEUED).update(
+        status=OutgoingEmail.STATUS_SENDING, claimed_by=token, claimed_at=now,
+        attempts=F('attempts') + 1
+    )
+    return list(OutgoingEmail.objects.filter(claimed_by=token, status=OutgoingEmail.STATUS_SENDING))
+
+def build_message(email, connection):
+    html_message, plain_message = render_email(email.template, email.context)
+    message = EmailMultiAlternatives(
+        subject=email.subject, body=plain_message, from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email.to_email], connection=connection
+    )
+    message.attach_alternative(html_message, 'text/html')
+    return message
+
+def _error_text(e):
+    return ''.join(traceback.format_exception_only(type(e), e)).strip()
+
+def send_batch(emails):
+    """
+    Send claimed emails over a single connection. Messages go to
+    send_messages one at a time on the open connection, so a refused
+    recipient fails only its own email and nothing is sent twice on retry.
+    Returns:
+        Tuple of (sent, failed) lists of emails; failed ones carry last_error
+    """
+    sent, failed = [], []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            email.last_error = _error_text(e)
+        return sent, list(emails)
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([build_message(email, connection)])
+                sent.append(email)
+            except Exception as e:
+                email.last_error = _error_text(e)
+                failed.append(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+def _record_results(sent, failed, max_attempts):
+    now = timezone.now()
+    if sent:
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in sent]).update(
+            status=OutgoingEmail.STATUS_SENT, sent_at=now, claimed_by='', last_error=''
+        )
+    gave_up = 0
+    for email in failed:
+        email.claimed_by = ''
+        if email.attempts >= max_attempts:
+            email.status = OutgoingEmail.STATUS_FAILED
+            gave_up += 1
+            logger.error(f"Giving up on email {email.pk} to {email.to_email}: {email.last_error}")
+        else:
+            email.status = OutgoingEmail.STATUS_QUEUED
+            email.send_after = now + retry_delay(email.attempts)
+    if failed:
+        OutgoingEmail.objects.bulk_update(failed, ['status', 'send_after', 'claimed_by', 'last_error'])
+    return gave_up
+
+def release_stale_emails():
+    """Requeue emails claimed by a dispatcher that died mid-batch"""
+    cutoff = timezone.now() - timedelta(seconds=email_setting('LOCK_TIMEOUT', 600))
+    return OutgoingEmail.objects.filter(
+        status=OutgoingEmail.STATUS_SENDING, claimed_at__lt=cutoff
+    ).update(status=OutgoingEmail.STATUS_QUEUED, claimed_by='')
+
+def schedule_next_dispatch():
+    """
+    Queue a dispatch for when the next waiting email is due: the earliest
+    retry, or a claimed batch becoming stale. Without it retries would wait
+    for an unrelated queue_emails. Sync mode cannot delay a job, so nothing
+    is scheduled there.
+    Returns:
+        Time of the scheduled dispatch, or None
+    """
+    if job_setting('MODE', MODE_QUEUE) == MODE_SYNC:
+        return None
+    pending = OutgoingEmail.objects.aggregate(
+        next_retry=Min('send_after', filter=Q(status=OutgoingEmail.STATUS_QUEUED)),
+        oldest_claim=Min('claimed_at', filter=Q(status=OutgoingEmail.STATUS_SENDING)),
+    )
+    due = []
+    if pending['next_retry']:
+        due.append(pending['next_retry'])
+    if pending['oldest_claim']:
+        due.append(pending['oldest_claim'] + timedelta(seconds=email_setting('LOCK_TIMEOUT', 600)))
+    if not due:
+        return None
+    run_at = min(due)
+    if not is_queued(dispatch_emails, run_at):
+        enqueue(dispatch_emails, run_at=run_at)
+    return run_at
+
+def dispatch_emails(batch_size=None, max_batches=None):
+    """
+    Send due queued emails in batches, one connection per batch, until none
+    are left. Runs as a job after queue_emails and from send_queued_emails,
+    and schedules itself again while emails wait for a retry.
+    Returns:
+        Dict of sent, retried and failed emails, batches, seconds and
+        emails sent per second
+    """
+    batch_size = batch_size or email_setting('BATCH_SIZE', 100)
+    max_attempts = email_setting('MAX_ATTEMPTS', 5)
+    token = uuid.uuid4().hex
+    release_stale_emails()
+
+    started = time.perf_counter()
+    totals = {'sent': 0, 'retried': 0, 'failed': 0, 'batches': 0}
+    while max_batches is None or totals['batches'] < max_batches:
+        emails = claim_emails(batch_size, token)
+        if not emails:
+            break
+        sent, failed = send_batch(emails)
+        gave_up = _record_results(sent, failed, max_attempts)
+        totals['sent'] += len(sent)
+        totals['failed'] += gave_up
+        totals['retried'] += len(failed) - gave_up
+        totals['batches'] += 1
+
+    schedule_next_dispatch()
+    elapsed = time.perf_counter() - started
+    totals['seconds'] = round(elapsed, 2)
+    totals['emails_per_second'] = round(totals['sent'] / elapsed, 1) if elapsed else 0
+    if totals['batches']:
+        logger.info(f"Dispatched emails: {totals}")
+    return totals
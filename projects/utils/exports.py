@@ -0,0 +1,206 @@
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BooleanField, Subquery, Value
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_date
+from django.utils.text import compress_sequence
+import csv
+import re
+from ..models import ArchivedNotification, Notification, Project, Task, TeamMember
+from .access import accessible_project_ids
+from .counters import total_tasks_count
+
+CSV_CONTENT_TYPE = 'text/csv'
+JSON_CONTENT_TYPE = 'application/json'
+EXPORT_FORMATS = ('csv', 'json')
+DEFAULT_CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+def csv_lines(header, rows):
+    """Yield a CSV header line, then one line per row"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+def json_lines(rows, **meta):
+    """
+    Yield a JSON document {**meta, "results": [...]} one row at a time, so
+    the whole array is never built in memory
+    """
+    encoder = DjangoJSONEncoder()
+    head = encoder.encode(meta)[:-1]
+    yield f'{head}, "results": [' if meta else '{"results": ['
+    for index, row in enumerate(rows):
+        yield (',\n' if index else '\n') + encoder.encode(row)
+    yield '\n]}\n'
+
+def buffered(pieces, size=BUFFER_SIZE):
+    """Join small pieces into chunks of about size characters"""
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+def gzip_chunks(chunks):
+    """Compress text chunks into a gzip stream as they are produced"""
+    return compress_sequence(chunk.encode('utf-8') for chunk in chunks)
+
+def streaming_download(chunks, filename, content_type, request=None):
+    """
+    Attachment response streaming chunks; gzip-encoded on the fly when the
+    request accepts it, so large exports cross the network compressed
+    """
+    chunks = buffered(chunks)
+    compress = request is not None and ACCEPTS_GZIP.search(request.headers.get('Accept-Encoding', ''))
+    response = StreamingHttpResponse(gzip_chunks(chunks) if compress else chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    if request is not None:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    return response
+
+# Exports: each source is (queryset, lookups) producing rows in the order of
+# the export's columns; columns are (key, header) pairs
+Export = namedtuple('Export', ['columns', 'sources'])
+
+def _created_between(queryset, start=None, end=None, field='created_at'):
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': timezone.make_aware(datetime.combine(start, time.min))})
+    if end:
+        next_day = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        queryset = queryset.filter(**{f'{field}__lt': next_day})
+    return queryset
+
+def _task_sources(user, team=None, project=None, start=None, end=None):
+    tasks = Task.objects.all()
+    if user is not None:
+        tasks = tasks.filter(project_id__in=accessible_project_ids(user))
+    if team:
+        tasks = tasks.filter(project__team_id=team)
+    if project:
+        tasks = tasks.filter(project_id=project)
+    return [(_created_between(tasks, start, end), (
+        'id', 'project_id', 'project__name', 'project__team__name', 'title', 'status', 'priority',
+        'assigned_to__username', 'start_date', 'due_date', 'created_at', 'updated_at', 'completed_at',
+    ))]
+
+def _project_sources(user, team=None, project=None, start=None, end=None):
+    projects = Project.objects.all()
+    if user is not None:
+        projects = projects.filter(pk__in=accessible_project_ids(user))
+    if team:
+        projects = projects.filter(team_id=team)
+    if project:
+        projects = projects.filter(pk=project)
+    projects = projects.annotate(total_tasks=total_tasks_count())
+    return [(_created_between(projects, start, end), (
+        'id', 'name', 'team__name', 'manager__username', 'status', 'priority', 'start_date', 'end_date',
+        'total_tasks', 'done_tasks_count', 'created_at',
+    ))]
+
+def _team_member_sources(user, team=None, project=None, start=None, end=None):
+    members = TeamMember.objects.all()
+    if user is not None:
+        members = members.filter(team_id__in=Subquery(TeamMember.objects.filter(user=user).values('team_id')))
+    if team:
+        members = members.filter(team_id=team)
+    return [(_created_between(members, start, end, field='date_joined'), (
+        'team_id', 'team__name', 'user_id', 'user__username', 'user__email', 'role', 'date_joined',
+    ))]
+
+def _notification_sources(user, team=None, project=None, start=None, end=None):
+    """The user's live notifications followed by their archived ones"""
+    live, archived = Notification.objects.all(), ArchivedNotification.objects.all()
+    if user is not None:
+        live, archived = live.filter(user=user), archived.filter(user=user)
+    live = live.annotate(archived=Value(False, output_field=BooleanField()))
+    archived = archived.annotate(archived=Value(True, output_field=BooleanField()))
+    fields = ('user__username', 'notification_type', 'action_type', 'message', 'read', 'created_at', 'archived')
+    return [
+        (_created_between(live, start, end), ('id', *fields)),
+        (_created_between(archived, start, end), ('notification_id', *fields)),
+    ]
+
+EXPORTS = {
+    'tasks': Export([
+        ('id', 'ID'), ('project_id', 'Project ID'), ('project', 'Project'), ('team', 'Team'),
+        ('title', 'Title'), ('status', 'Status'), ('priority', 'Priority'), ('assigned_to', 'Assigned To'),
+        ('start_date', 'Start Date'), ('due_date', 'Due Date'), ('created_at', 'Created'),
+        ('updated_at', 'Updated'), ('completed_at', 'Completed'),
+    ], _task_sources),
+    'projects': Export([
+        ('id', 'ID'), ('name', 'Project'), ('team', 'Team'), ('manager', 'Manager'), ('status', 'Status'),
+        ('priority', 'Priority'), ('start_date', 'Start Date'), ('end_date', 'End Date'),
+        ('total_tasks', 'Total Tasks'), ('done_tasks', 'Done Tasks'), ('created_at', 'Created'),
+    ], _project_sources),
+    'team_members': Export([
+        ('team_id', 'Team ID'), ('team', 'Team'), ('user_id', 'User ID'), ('username', 'Username'),
+        ('email', 'Email'), ('role', 'Role'), ('date_joined', 'Joined'),
+    ], _team_member_sources),
+    'notifications': Export([
+        ('id', 'ID'), ('user', 'User'), ('notification_type', 'Type'), ('action_type', 'Action'),
+        ('message', 'Message'), ('read', 'Read'), ('created_at', 'Created'), ('archived', 'Archived'),
+    ], _notification_sources),
+}
+
+def parse_export_filters(params):
+    """
+    team, project, start and end filters from query parameters or options
+    Raises:
+        ValueError: For ids or dates that do not parse
+    """
+    filters = {}
+    for key in ('team', 'project'):
+        if params.get(key):
+            filters[key] = int(params[key])
+    for key in ('start', 'end'):
+        if params.get(key):
+            value = params[key]
+            filters[key] = value if hasattr(value, 'year') else parse_date(value)
+            if filters[key] is None:
+                raise ValueError(f"Invalid {key} date: {value}")
+    return filters
+
+def export_rows(name, user=None, chunk_size=None, **filters):
+    """
+    Rows of an export as value tuples, read with iterator(chunk_size) so
+    memory stays flat however many rows there are
+    Args:
+        user: Restrict to what the user can see; None exports everything
+    Yields:
+        Tuples in the order of EXPORTS[name].columns
+    """
+    chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    for queryset, lookups in EXPORTS[name].sources(user, **filters):
+        yield from queryset.order_by(lookups[0], 'pk').values_list(*lookups).iterator(chunk_size=chunk_size)
+
+def export_chunks(name, export_format, user=None, **filters):
+    """Text chunks of an export as CSV or a JSON document"""
+    columns = EXPORTS[name].columns
+    rows = export_rows(name, user, **filters)
+    if export_format == 'json':
+        keys = [key for key, _ in columns]
+        return json_lines(
+            (dict(zip(keys, row)) for row in rows),
+            export=name, filters=filters, generated_at=timezone.now()
+        )
+    return csv_lines([header for _, header in columns], rows)
@@ -0,0 +1,263 @@
+from collections import Counter
+from itertools import islice
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+import csv
+import io
+import json
+import logging
+import time
+import uuid
+from ..models import Project, ProjectAccess, SearchDocument, Task, User
+from .chrome import invalidate_summary
+from .constants import TASK_STATUS_DONE, TASK_STATUS_TODO
+from . import counters, rollups
+from .outbox import enqueue_notifications
+from .permissions import get_permission_resolver
+from .versions import SCOPE_PROJECT, bump, bump_team_users
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+STATUSES = {status for status, _ in Task.STATUS_CHOICES}
+PRIORITIES = {priority for priority, _ in Task.PRIORITY_CHOICES}
+
+
+class ImportFormatError(ValueError):
+    """The file could not be read as CSV or JSON rows"""
+
+def read_rows(data, import_format, key='tasks'):
+    """
+    Rows of an import file as dicts. CSV needs a header row; JSON is either
+    a list of objects or {key: [...]}
+    Args:
+        data: Text, bytes or a file object
+        import_format: 'csv' or 'json'
+        key: Name of the list in a JSON object
+    """
+    if hasattr(data, 'read'):
+        data = data.read()
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+    if import_format == 'json':
+        try:
+            rows = json.loads(data)
+        except ValueError as e:
+            raise ImportFormatError(f"Invalid JSON: {e}")
+        if isinstance(rows, dict):
+            rows = rows.get(key)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ImportFormatError('Expected a list of objects')
+        return iter(rows)
+    if import_format == 'csv':
+        return csv.DictReader(io.StringIO(data))
+    raise ImportFormatError(f"Unknown import format: {import_format}")
+
+
+class TaskBatchValidator:
+    """
+    Validates one batch of rows against maps preloaded with a fixed number
+    of queries per batch, instead of Task.clean()'s permission query per
+    row. Mirrors Task.clean: the assignee needs access to the project.
+    """
+
+    def __init__(self, rows, importer=None, seen_titles=None):
+        self.resolver = get_permission_resolver(importer) if importer is not None else None
+        self.seen_titles = seen_titles if seen_titles is not None else set()
+        project_ids = {self._int(row.get('project')) for row in rows} - {None}
+        self.projects = Project.objects.in_bulk(project_ids) if project_ids else {}
+        keys = {str(row.get('assigned_to') or '').strip() for row in rows} - {''}
+        self.users = {}
+        for user in User.objects.filter(Q(username__in=keys) | Q(email__in=keys)).only(
+            'id', 'username', 'email', 'is_project_manager'
+        ):
+            self.users[user.username] = self.users[user.email] = user
+        self.access = set(
+            ProjectAccess.objects.filter(
+                project_id__in=self.projects, user_id__in={user.pk for user in self.users.values()}
+            ).values_list('user_id', 'project_id')
+        ) if self.projects and self.users else set()
+        titles = {str(row.get('title') or '').strip() for row in rows}
+        self.existing_titles = set(
+            Task.objects.filter(project_id__in=self.projects, title__in=titles).values_list('project_id', 'title')
+        ) if self.projects else set()
+
+    @staticmethod
+    def _int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _date(value):
+        if not value:
+            return None
+        try:
+            return parse_date(str(value).strip())
+        except ValueError:
+            return None
+
+    def validate(self, row):
+        """
+        Returns:
+            Tuple of (unsaved Task or None, list of error messages)
+        """
+        errors = []
+        project = self.projects.get(self._int(row.get('project')))
+        if project is None:
+            errors.append(f"Unknown project: {row.get('project')!r}")
+        elif self.resolver is not None and not self.resolver.can_assign_tasks(project):
+            errors.append("You don't have permission to create tasks in this project")
+
+        title = str(row.get('title') or '').strip()
+        if not title:
+            errors.append('Task title is required')
+        elif len(title) > TITLE_MAX_LENGTH:
+            errors.append(f"Title is longer than {TITLE_MAX_LENGTH} characters")
+        elif project is not None:
+            key = (project.pk, title)
+            if key in self.existing_titles or key in self.seen_titles:
+                errors.append(f"A task named {title!r} already exists in this project")
+
+        assignee = self.users.get(str(row.get('assigned_to') or '').strip())
+        if assignee is None:
+            errors.append(f"Unknown user: {row.get('assigned_to')!r}")
+        elif project is not None and not (
+            assignee.is_project_manager or (assignee.pk, project.pk) in self.access
+        ):
+            errors.append('Assigned user does not have access to this project')
+
+        status = str(row.get('status') or TASK_STATUS_TODO).strip()
+        if status not in STATUSES:
+            errors.append(f"Invalid status: {status!r}")
+        priority = str(row.get('priority') or 'medium').strip()
+        if priority not in PRIORITIES:
+            errors.append(f"Invalid priority: {priority!r}")
+
+        start_date, due_date = self._date(row.get('start_date')), self._date(row.get('due_date'))
+        if start_date is None or due_date is None:
+            errors.append('start_date and due_date must be dates (YYYY-MM-DD)')
+        elif start_date > due_date:
+            errors.append('Due date must be after start date')
+
+        if errors:
+            return None, errors
+        self.seen_titles.add((project.pk, title))
+        task = Task(
+            project=project, title=title, description=str(row.get('description') or ''),
+            assigned_to=assignee, status=status, priority=priority,
+            start_date=start_date, due_date=due_date,
+            completed_at=timezone.now() if status == TASK_STATUS_DONE else None,
+        )
+        return task, []
+
+def record_imported_tasks(tasks):
+    """
+    Apply what the Task signals would have done for bulk-created tasks:
+    counters, daily rollups, assignee access, search documents, versions and
+    cached sidebar counters, each in set-based writes
+    """
+    access, documents, team_users = {}, [], {}
+    for task in tasks:
+        team_id = task.project.team_id
+        access[(task.assigned_to_id, task.project_id)] = ProjectAccess(
+            user_id=task.assigned_to_id, project_id=task.project_id, team_id=team_id,
+            role=ProjectAccess.ROLE_ASSIGNEE
+        )
+        documents.append(SearchDocument(
+            kind=SearchDocument.KIND_TASK, object_id=task.pk, title=task.title,
+            body=task.description, project_id=task.project_id, team_id=team_id
+        ))
+        team_users.setdefault(team_id, set()).add(task.assigned_to_id)
+
+    counters.record_tasks_created(tasks)
+    rollups.record_tasks_created(tasks)
+    ProjectAccess.objects.bulk_create(access.values(), ignore_conflicts=True)
+    SearchDocument.objects.bulk_create(documents, ignore_conflicts=True)
+    bump(SCOPE_PROJECT, *{task.project_id for task in tasks})
+    for team_id, user_ids in team_users.items():
+        bump_team_users(team_id, *user_ids)
+    invalidate_summary(*{task.assigned_to_id for task in tasks})
+
+def notify_assignees(assigned):
+    """
+    One notification per assignee; assignees with the same count share one
+    fan-out. Each import run is its own event, so equal counts from separate
+    runs are all delivered.
+    """
+    event = f"task_import:{uuid.uuid4().hex}"
+    by_count = {}
+    for user_id, count in assigned.items():
+        by_count.setdefault(count, []).append(user_id)
+    for count, user_ids in by_count.items():
+        noun = 'task was' if count == 1 else 'tasks were'
+        enqueue_notifications(
+            user_ids, f"{count} imported {noun} assigned to you",
+            action_type='task_assigned', event=event
+        )
+
+def import_tasks(rows, importer=None, batch_size=None, skip_invalid=False, dry_run=False):
+    """
+    Validate and insert task rows in batches inside one transaction
+    Args:
+        rows: Iterable of dicts with project (id), title, assigned_to
+            (username or email), start_date, due_date and optionally
+            description, status and priority
+        importer: User whose permissions apply; None skips the check
+        skip_invalid: Insert the valid rows even if some rows fail;
+            otherwise any error rolls the whole import back
+        dry_run: Validate only
+    Returns:
+        Dict of rows, created and failed counts, errors (row number and
+        messages, first MAX_REPORTED_ERRORS), seconds and rows per second
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    started = time.perf_counter()
+    result = {'rows': 0, 'created': 0, 'failed': 0, 'errors': []}
+    assigned = Counter()
+    seen_titles = set()
+    rows = iter(rows)
+
+    with transaction.atomic():
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            validator = TaskBatchValidator(batch, importer, seen_titles)
+            tasks = []
+            for number, row in enumerate(batch, start=result['rows'] + 1):
+                task, errors = validator.validate(row)
+                if errors:
+                    result['failed'] += 1
+                    if len(result['errors']) < MAX_REPORTED_ERRORS:
+                        result['errors'].append({'row': number, 'errors': errors})
+                else:
+                    tasks.append(task)
+            result['rows'] += len(batch)
+
+            if tasks and not dry_run and (skip_invalid or not result['failed']):
+                Task.objects.bulk_create(tasks, batch_size=batch_size)
+                record_imported_tasks(tasks)
+                assigned.update(task.assigned_to_id for task in tasks)
+                result['created'] += len(tasks)
+
+        if dry_run or (result['failed'] and not skip_invalid):
+            transaction.set_rollback(True)
+            result['created'] = 0
+        elif assigned:
+            notify_assignees(assigned)
+
+    elapsed = time.perf_counter() - started
+    result['seconds'] = round(elapsed, 2)
+    result['rows_per_second'] = round(result['rows'] / elapsed) if elapsed else 0
+    logger.info(
+        f"Imported {result['created']} of {result['rows']} tasks "
+        f"({result['failed']} invalid) in {result['seconds']}s"
+    )
+    return result
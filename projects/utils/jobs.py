@@ -0,0 +1,223 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from ..models import Job
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+MODE_QUEUE = 'queue'
+MODE_SYNC = 'sync'
+
+
+def job_setting(name, default):
+    return getattr(settings, f'JOB_QUEUE_{name}', default)
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. the object is gone)"""
+
+
+def _path(func):
+    return func if isinstance(func, str) else f"{func.__module__}.{func.__qualname__}"
+
+def enqueue(func, run_at=None, max_attempts=None, **kwargs):
+    """
+    Queue func(**kwargs) to run in a worker once the current transaction
+    commits; nothing is queued if it rolls back. In 'sync' mode the handler
+    runs right after the commit instead, which keeps tests and small
+    deployments free of a worker process.
+    Args:
+        func: Handler or its dotted path
+        run_at: Earliest time to run (default: now)
+        max_attempts: Tries before the job is marked failed
+    """
+    path = _path(func)
+    max_attempts = max_attempts or job_setting('MAX_ATTEMPTS', 5)
+
+    def submit():
+        if job_setting('MODE', MODE_QUEUE) == MODE_SYNC:
+            try:
+                import_string(path)(**kwargs)
+            except Exception as e:
+                logger.error(f"Job {path} failed: {str(e)}")
+        else:
+            Job.objects.create(
+                func=path, kwargs=kwargs, max_attempts=max_attempts,
+                run_at=run_at or timezone.now()
+            )
+    transaction.on_commit(submit)
+
+def is_queued(func, run_at=None):
+    """Whether func already has a queued job due by run_at (default: any time)"""
+    jobs = Job.objects.filter(func=_path(func), status=Job.STATUS_QUEUED)
+    if run_at is not None:
+        jobs = jobs.filter(run_at__lte=run_at)
+    return jobs.exists()
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: base, 2x base, 4x base ... capped"""
+    base = job_setting('RETRY_BASE', 30)
+    delay = min(base * 2 ** max(attempts - 1, 0), job_setting('RETRY_MAX', 3600))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+def claim_job(worker):
+    """
+    Take the next due job. The conditional UPDATE only succeeds for one
+    worker, so claiming needs no row locks and works the same on SQLite and
+    PostgreSQL.
+    Returns:
+        Claimed Job, or None when nothing is due
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.STATUS_QUEUED, run_at__lte=now
+    ).order_by('run_at', 'pk').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+def run_job(job):
+    """Run a claimed job and record the outcome; failures are retried with backoff"""
+    try:
+        import_string(job.func)(**job.kwargs)
+    except Exception as e:
+        permanent = isinstance(e, (PermanentJobError, ImportError))
+        job.last_error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        if permanent or job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+            logger.error(f"Job {job.pk} ({job.func}) failed for good: {job.last_error}")
+        else:
+            job.status = Job.STATUS_QUEUED
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+            logger.warning(f"Job {job.pk} ({job.func}) failed, retrying at {job.run_at}: {job.last_error}")
+    else:
+        job.status = Job.STATUS_DONE
+        job.finished_at = timezone.now()
+        job.last_error = ''
+    job.locked_by = ''
+    job.save(update_fields=['status', 'run_at', 'finished_at', 'last_error', 'locked_by'])
+    return job.status
+
+def release_stale_jobs():
+    """Requeue jobs left running by workers that died mid-job"""
+    cutoff = timezone.now() - timedelta(seconds=job_setting('LOCK_TIMEOUT', 600))
+    return Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=cutoff).update(
+        status=Job.STATUS_QUEUED, locked_by=''
+    )
+
+def run_pending_jobs(limit=None, worker=None):
+    """
+    Run due jobs in this thread until none are left (or limit is reached)
+    Returns:
+        Number of jobs run
+    """
+    worker = worker or worker_name()
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job(worker)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+def purge_finished_jobs(days=None):
+    """Delete jobs that finished more than days ago"""
+    days = job_setting('KEEP_DAYS', 7) if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Job.objects.filter(
+        status__in=[Job.STATUS_DONE, Job.STATUS_FAILED], finished_at__lt=cutoff
+    ).delete()[0]
+
+def _release_stale(worker):
+    try:
+        released = release_stale_jobs()
+    except Exception as e:
+        logger.error(f"Job worker {worker} could not requeue stale jobs: {str(e)}")
+        return
+    if released:
+        logger.warning(f"Requeued {released} stale jobs")
+
+def _worker_loop(stop, poll_interval, burst):
+    """
+    Claim and run jobs until stopped; sleep poll_interval when idle. Every
+    RELEASE_INTERVAL seconds stale jobs are requeued, so a job whose worker
+    died is picked up without restarting the pool.
+    """
+    worker = worker_name()
+    release_interval = job_setting('RELEASE_INTERVAL', 60)
+    last_release = time.monotonic()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            if time.monotonic() - last_release >= release_interval:
+                _release_stale(worker)
+                last_release = time.monotonic()
+            try:
+                ran = run_pending_jobs(worker=worker)
+            except Exception as e:
+                logger.error(f"Job worker {worker} error: {str(e)}")
+                ran = 0
+            if burst:
+                break
+            if not ran:
+                stop.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+def run_workers(workers=None, processes=False, poll_interval=None, burst=False, stop=None):
+    """
+    Run a pool of job workers until stop is set (or, with burst, until the
+    queue is empty). Threads suit I/O-bound jobs like SMTP; processes give
+    CPU-bound jobs like reports their own interpreter.
+    """
+    workers = workers or job_setting('WORKERS', 4)
+    poll_interval = job_setting('POLL_INTERVAL', 1) if poll_interval is None else poll_interval
+    released = release_stale_jobs()
+    if released:
+        logger.warning(f"Requeued {released} stale jobs")
+
+    if processes:
+        # Forked children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = stop or context.Event()
+        pool = [
+            context.Process(target=_worker_loop, args=(stop, poll_interval, burst), daemon=True)
+            for _ in range(workers)
+        ]
+    else:
+        stop = stop or threading.Event()
+        pool = [
+            threading.Thread(target=_worker_loop, args=(stop, poll_interval, burst), daemon=True)
+            for _ in range(workers)
+        ]
+    for worker in pool:
+        worker.start()
+    try:
+        for worker in pool:
+            worker.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for worker in pool:
+            worker.join()
@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Length
+import logging
+from ..models import Task
+from .jobs import enqueue
+from .ranking import RankError, key_between, rebalance_keys
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Rebalanced keys sort after every time_key() handed out since 1973, so new
+# tasks still land at the top of a rebalanced column
+REBALANCED_PREFIX = 'zz'
+
+
+def column_tasks(user_id, status):
+    """One Kanban column: a user's tasks of one status"""
+    return Task.objects.filter(assigned_to_id=user_id, status=status)
+
+def neighbours_at(task, position, status=None):
+    """
+    Ids of the cards that will sit above and below task when it is dropped
+    at position (0-based) in a column, for clients that only know the index
+    Returns:
+        Tuple of (previous id or None, next id or None)
+    """
+    position = max(int(position), 0)
+    column = column_tasks(task.assigned_to_id, status or task.status).exclude(pk=task.pk)
+    ids = list(
+        column.order_by('rank', 'pk').values_list('pk', flat=True)[max(position - 1, 0):position + 1]
+    )
+    if position == 0:
+        return None, (ids[0] if ids else None)
+    return (ids[0] if ids else None), (ids[1] if len(ids) > 1 else None)
+
+def _neighbour_ranks(previous_id, next_id):
+    ids = [pk for pk in (previous_id, next_id) if pk]
+    ranks = dict(Task.objects.filter(pk__in=ids).values_list('pk', 'rank')) if ids else {}
+    missing = set(ids) - set(ranks)
+    if missing:
+        raise Task.DoesNotExist(f"Tasks not found: {sorted(missing)}")
+    return ranks.get(previous_id), ranks.get(next_id)
+
+def move_task(task, previous_id=None, next_id=None):
+    """
+    Place a task between two cards by giving it a rank between theirs; only
+    the moved row is written, with one UPDATE on its primary key. Ties and
+    over-long keys are handed to rebalance_column.
+    Args:
+        previous_id: Card above the drop point, or None at the top
+        next_id: Card below the drop point, or None at the bottom
+    Returns:
+        The task's new rank
+    Raises:
+        Task.DoesNotExist: A neighbour does not exist
+        RankError: The neighbours are out of order even after rebalancing
+    """
+    before, after = _neighbour_ranks(previous_id, next_id)
+    try:
+        rank = key_between(before, after)
+    except RankError:
+        # Neighbours share a rank (e.g. created in the same microsecond):
+        # respace the column they are in, then try once more
+        neighbour = Task.objects.filter(pk=previous_id or next_id).values('assigned_to_id', 'status').first()
+        rebalance_column(neighbour['assigned_to_id'], neighbour['status'])
+        before, after = _neighbour_ranks(previous_id, next_id)
+        rank = key_between(before, after)
+
+    Task.objects.filter(pk=task.pk).update(rank=rank)
+    task.rank = rank
+    if len(rank) > getattr(settings, 'TASK_RANK_MAX_LENGTH', 32):
+        enqueue(rebalance_column, user_id=task.assigned_to_id, status=task.status)
+    return rank
+
+def rebalance_column(user_id, status):
+    """
+    Rewrite the ranks of one column as short, evenly spaced keys in the
+    current order. Runs as a job when a move produces an over-long key.
+    Returns:
+        Number of tasks re-ranked
+    """
+    with transaction.atomic():
+        # Ids only: deferred loading of tracked fields would query per row
+        ids = list(
+            column_tasks(user_id, status).select_for_update().order_by('rank', 'pk').values_list('pk', flat=True)
+        )
+        tasks = [Task(pk=pk, rank=REBALANCED_PREFIX + key) for pk, key in zip(ids, rebalance_keys(len(ids)))]
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+    logger.info(f"Rebalanced {len(tasks)} {status} task ranks of user {user_id}")
+    return len(tasks)
+
+def rebalance_long_ranks(max_length=None):
+    """
+    Rebalance every column holding a rank longer than max_length
+    Returns:
+        Dict of columns and tasks re-ranked
+    """
+    max_length = max_length or getattr(settings, 'TASK_RANK_MAX_LENGTH', 32)
+    columns = (
+        Task.objects.annotate(rank_length=Length('rank')).filter(rank_length__gt=max_length)
+        .values_list('assigned_to_id', 'status').distinct().order_by()
+    )
+    totals = {'columns': 0, 'tasks': 0}
+    for user_id, status in list(columns):
+        totals['tasks'] += rebalance_column(user_id, status)
+        totals['columns'] += 1
+    return totals
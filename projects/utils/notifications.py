@@ -81,15 +81,16 @@ def send_bulk_notifications(users, message, notification_type=NOTIFICATION_INFO)
 
 def cleanup_old_notifications(days=30):
     """
-    Remove notifications older than specified days
+    Remove notifications older than specified days, in batches
+    (see utils.retention.prune_notifications for archiving and per-user minimums)
     Args:
         days: Number of days to keep notifications
     Returns:
         Number of notifications deleted
     """
+    from .retention import prune_notifications
     try:
-        cutoff_date = timezone.now() - timezone.timedelta(days=days)
-        return Notification.objects.filter(created_at__lt=cutoff_date).delete()[0]
+        return prune_notifications(days=days, keep_per_user=0, archive=False)['removed']
     except Exception as e:
         logger.error(f"Error cleaning up notifications: {str(e)}")
         return 0
@@ -104,10 +105,7 @@ def mark_notifications_as_read(user, notification_ids=None):
         Number of notifications updated
     """
     try:
-        notifications = Notification.objects.filter(user=user)
-        if notification_ids:
-            notifications = notifications.filter(id__in=notification_ids)
-        return notifications.update(read=True)
+        return user.mark_notifications_read(notification_ids)
     except Exception as e:
         logger.error(f"Error marking notifications as read: {str(e)}")
         return 0
@@ -123,6 +121,7 @@ def notify_team_changes(user, team, action_type, message):
     
     if action_type == 'team_member_removed':
         # Send email notification
-        send_team_removal_email(user, team)
+        from .email import queue_team_removal_email
+        queue_team_removal_email(user, team)
         
     return notification
\ No newline at end of file
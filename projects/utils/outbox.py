@@ -0,0 +1,307 @@
+from collections import Counter, namedtuple
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from ..models import Notification
+from .chrome import invalidate_header
+from .constants import NOTIFICATION_DEDUP_WINDOW
+from .counters import record_unread_changes
+from .jobs import enqueue
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+WORKER_THREAD = 'thread'
+WORKER_SYNC = 'sync'
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY = 0.5
+
+NotificationIntent = namedtuple('NotificationIntent', [
+    'user_id', 'message', 'notification_type', 'action_type', 'content_type_id', 'object_id',
+    'idempotency_key'
+])
+
+_content_type_ids = {}
+_spool_lock = threading.Lock()
+
+def worker_mode():
+    """
+    Configured outbox worker. Without one SQLite writes in sync mode, since
+    a second connection writing from the thread worker would be locked out
+    by open request transactions; other databases use the thread worker.
+    """
+    mode = getattr(settings, 'NOTIFICATION_OUTBOX_WORKER', None)
+    if mode is None:
+        mode = WORKER_SYNC if connection.vendor == 'sqlite' else WORKER_THREAD
+    return mode
+
+def content_type_id_for(obj):
+    """Resolve the content type id of a model instance from a process cache"""
+    model = obj._meta.concrete_model
+    if model not in _content_type_ids:
+        _content_type_ids[model] = ContentType.objects.get_for_model(model).pk
+    return _content_type_ids[model]
+
+def idempotency_key(user_id, event, content_type_id=None, object_id=None, window=NOTIFICATION_DEDUP_WINDOW, now=None):
+    """
+    Build the key that identifies one notification event for one recipient.
+    Events with the same type, object and recipient inside the same time
+    window share a key, so only the first of them is written. Windows are
+    fixed buckets, so duplicates straddling a boundary are both kept.
+    """
+    now = now or timezone.now()
+    bucket = int(now.timestamp() // window) if window else 0
+    raw = f"{event}|{content_type_id}|{object_id}|{user_id}|{bucket}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def enqueue_notifications(user_ids, message, notification_type='info', action_type='other',
+                          related_object=None, event=None, window=NOTIFICATION_DEDUP_WINDOW):
+    """
+    Record notification intents for users. Nothing is written in the request
+    path: the intents are handed to the outbox worker once the surrounding
+    transaction commits, and dropped if it rolls back.
+    Args:
+        user_ids: Iterable of recipient user ids
+        message: Notification message
+        notification_type: Type of notification (info/success/warning/error)
+        action_type: Notification action type
+        related_object: Optional model instance the notification points to
+        event: Event type used for deduplication. Without an event or a
+            related object every call is its own event and nothing is
+            collapsed; with only an object, identical notifications about
+            it collapse
+        window: Deduplication window in seconds
+    Returns:
+        Number of intents recorded
+    """
+    content_type_id = object_id = None
+    if related_object is not None:
+        content_type_id = content_type_id_for(related_object)
+        object_id = related_object.pk
+    if event is None:
+        event = f"{action_type}:{message}" if related_object is not None else uuid.uuid4().hex
+    now = timezone.now()
+    intents = [
+        NotificationIntent(
+            user_id, message, notification_type, action_type, content_type_id, object_id,
+            idempotency_key(user_id, event, content_type_id, object_id, window, now)
+        )
+        for user_id in dict.fromkeys(user_ids) if user_id
+    ]
+    if intents:
+        transaction.on_commit(lambda: deliver(intents))
+    return len(intents)
+
+def write_notifications(intents, batch_size=None):
+    """
+    Insert notifications for intents with bulk_create
+    Returns:
+        Number of notifications submitted; keys already written are skipped
+    """
+    batch_size = batch_size or getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    # Collapse duplicates within the batch; the unique key drops the ones
+    # already written by earlier batches
+    seen, unique_intents = set(), []
+    for intent in intents:
+        if intent.idempotency_key:
+            if intent.idempotency_key in seen:
+                continue
+            seen.add(intent.idempotency_key)
+        unique_intents.append(intent)
+    # bulk_create(ignore_conflicts=True) cannot tell which rows it skipped,
+    # so keys already written are filtered out first to count unread rows;
+    # a concurrent duplicate can still slip through, repair_counters fixes it
+    keys = [intent.idempotency_key for intent in unique_intents if intent.idempotency_key]
+    if keys:
+        existing = set(
+            Notification.objects.filter(idempotency_key__in=keys).values_list('idempotency_key', flat=True)
+        )
+        unique_intents = [intent for intent in unique_intents if intent.idempotency_key not in existing]
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=intent.user_id,
+            message=intent.message,
+            notification_type=intent.notification_type,
+            action_type=intent.action_type,
+            content_type_id=intent.content_type_id,
+            object_id=intent.object_id,
+            idempotency_key=intent.idempotency_key,
+            read=False
+        )
+        for intent in unique_intents
+    ], batch_size=batch_size, ignore_conflicts=True)
+    # bulk_create skips post_save, so update the unread counts and refresh
+    # the header caches here
+    record_unread_changes(Counter(intent.user_id for intent in unique_intents))
+    invalidate_header(*(intent.user_id for intent in unique_intents))
+    return len(unique_intents)
+
+def write_intents(intents):
+    """Job handler: write a batch the outbox could not write itself"""
+    write_notifications([NotificationIntent(*intent) for intent in intents])
+
+def spool_path():
+    return getattr(settings, 'NOTIFICATION_OUTBOX_SPOOL', None) or os.path.join(
+        settings.BASE_DIR, 'notification_outbox.jsonl'
+    )
+
+def spool(intents):
+    """
+    Append a batch to the spool file, the last resort when neither the
+    notifications nor the job queue can be written; replay_spool writes it
+    once the database is back
+    """
+    with _spool_lock, open(spool_path(), 'a', encoding='utf-8') as spool_file:
+        for intent in intents:
+            spool_file.write(json.dumps(list(intent)) + '\n')
+
+def replay_spool():
+    """
+    Write the spooled batches and remove the spool file. Idempotency keys
+    skip intents a concurrent replay already wrote.
+    Returns:
+        Number of intents read from the spool
+    """
+    path = spool_path()
+    if not os.path.exists(path):
+        return 0
+    with _spool_lock:
+        try:
+            with open(path, encoding='utf-8') as spool_file:
+                intents = [NotificationIntent(*json.loads(line)) for line in spool_file if line.strip()]
+        except FileNotFoundError:
+            return 0
+        write_notifications(intents)
+        os.remove(path)
+    logger.info(f"Replayed {len(intents)} spooled notifications")
+    return len(intents)
+
+def hand_off(intents, error):
+    """
+    Queue a batch that failed to write as a job, which is retried with
+    backoff by the job workers. When the job queue cannot be written either
+    the batch is spooled to disk instead of being dropped.
+    """
+    logger.warning(f"Handing {len(intents)} notifications to the job queue: {str(error)}")
+    try:
+        enqueue(write_intents, intents=[list(intent) for intent in intents])
+    except Exception as e:
+        logger.error(f"Spooling {len(intents)} notifications, the job queue is unavailable: {str(e)}")
+        spool(intents)
+
+def _replay_after_write():
+    try:
+        replay_spool()
+    except Exception as e:
+        logger.warning(f"Spooled notifications not replayed yet: {str(e)}")
+
+def deliver(intents):
+    """Hand committed intents to the configured worker"""
+    if worker_mode() == WORKER_SYNC:
+        try:
+            write_notifications(intents)
+        except Exception as e:
+            hand_off(intents, e)
+        else:
+            _replay_after_write()
+    else:
+        get_worker().submit(intents)
+
+
+class OutboxWorker:
+    """
+    In-process background writer for notification intents.
+    Intents submitted while a batch is being written are coalesced into the
+    next bulk insert. A batch that fails to write is retried with backoff,
+    then handed to the job queue (or the spool file). The queue lives in
+    memory, so intents still queued when the process is killed are lost; a
+    clean exit drains it.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.retries = getattr(settings, 'NOTIFICATION_OUTBOX_RETRIES', DEFAULT_RETRIES)
+        self.retry_delay = getattr(settings, 'NOTIFICATION_OUTBOX_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+        self.queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, intents):
+        self._ensure_started()
+        for intent in intents:
+            self.queue.put(intent)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='notification-outbox', daemon=True
+                )
+                self._thread.start()
+
+    def _take_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """
+        Write a batch, retrying with exponential backoff (e.g. while SQLite
+        is locked); once the retries are used up the batch goes to the job
+        queue, which keeps retrying it from the database
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                close_old_connections()
+                write_notifications(batch, self.batch_size)
+            except Exception as e:
+                error = e
+                if attempt < self.retries:
+                    logger.warning(f"Error delivering {len(batch)} notifications, retrying: {str(e)}")
+                    time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                _replay_after_write()
+                return
+        hand_off(batch, error)
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                self._write(batch)
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self):
+        """Block until every submitted intent has been written"""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def get_worker():
+    """Get the process-wide outbox worker"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = OutboxWorker()
+            atexit.register(_worker.flush)
+    return _worker
@@ -0,0 +1,141 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.db.models import Q
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.utils.dateparse import parse_datetime
+from .constants import ITEMS_PER_PAGE
+
+CURSOR_PARAM = 'cursor'
+
+def _pack(value, pk):
+    raw = f"{value}|{pk}"
+    return urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _unpack(cursor):
+    raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    value, pk = raw.split('|')
+    return value, int(pk)
+
+def encode_cursor(obj):
+    """Opaque cursor pointing just past obj in (created_at, id) order"""
+    return _pack(obj.created_at.isoformat(), obj.pk)
+
+def decode_cursor(cursor):
+    """
+    (created_at, pk) a cursor points at
+    Returns:
+        Tuple, or None when the cursor is missing or malformed (first page)
+    """
+    if not cursor:
+        return None
+    try:
+        created, pk = _unpack(cursor)
+        created_at = parse_datetime(created)
+        return (created_at, pk) if created_at else None
+    except ValueError:
+        # Bad base64, separators, dates and ids all raise ValueError subclasses
+        return None
+
+def encode_rank_cursor(obj):
+    """Opaque cursor pointing just past obj in (rank, id) order"""
+    return _pack(obj.rank, obj.pk)
+
+def decode_rank_cursor(cursor):
+    """(rank, pk) a cursor points at, or None when missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        return _unpack(cursor)
+    except ValueError:
+        return None
+
+
+class CursorPage:
+    """One page of a CursorPaginator; iterable and falsy when empty, like Page"""
+
+    def __init__(self, items, has_next, encode=encode_cursor):
+        self.object_list = items
+        self.has_next = has_next
+        self.encode = encode
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def next_cursor(self):
+        return self.encode(self.object_list[-1]) if self.has_next else None
+
+    def next_url(self, request, **params):
+        """Current URL with the cursor of the next page and any extra params"""
+        if not self.has_next:
+            return None
+        query = request.GET.copy()
+        for key, value in {**params, CURSOR_PARAM: self.next_cursor}.items():
+            query[key] = value
+        return f"{request.path}?{query.urlencode()}"
+
+
+class CursorPaginator:
+    """
+    Keyset pagination over (created_at, id), newest first. Unlike Paginator
+    there is no COUNT(*) and no OFFSET: each page seeks past the last row of
+    the previous one, so a deep page costs the same as the first and rows
+    created while scrolling never shift items between pages.
+    """
+    ordering = ('-created_at', '-pk')
+
+    def __init__(self, queryset, per_page=ITEMS_PER_PAGE):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        position = decode_cursor(cursor)
+        if position is not None:
+            created_at, pk = position
+            # The redundant lte bound gives the database a plain range on
+            # the (..., created_at) index; the Q breaks ties on id
+            queryset = queryset.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+        # One extra row tells whether a next page exists
+        rows = list(queryset[:self.per_page + 1])
+        return CursorPage(rows[:self.per_page], has_next=len(rows) > self.per_page)
+
+class RankCursorPaginator(CursorPaginator):
+    """
+    Keyset pagination over (rank, id): Kanban columns in the order cards
+    were dragged into (see utils.ranking)
+    """
+    ordering = ('rank', 'pk')
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        position = decode_rank_cursor(cursor)
+        if position is not None:
+            rank, pk = position
+            queryset = queryset.filter(rank__gte=rank).filter(
+                Q(rank__gt=rank) | Q(rank=rank, pk__gt=pk)
+            )
+        rows = list(queryset[:self.per_page + 1])
+        return CursorPage(rows[:self.per_page], has_next=len(rows) > self.per_page, encode=encode_rank_cursor)
+
+def page_response(request, page, template, serialize, params=None, **context):
+    """
+    JSON variant of a paginated list: serialized results plus the rendered
+    items fragment that infinite scroll appends as-is
+    """
+    params = params or {}
+    return JsonResponse({
+        'results': [serialize(obj) for obj in page],
+        'html': render_to_string(template, {'page': page, **context}, request=request),
+        'has_next': page.has_next,
+        'next_cursor': page.next_cursor,
+        'next_url': page.next_url(request, **params),
+    })
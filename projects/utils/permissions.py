@@ -1,119 +1,186 @@
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import PermissionDenied
-from ..models import TeamMember, Team, Project, Task
+from django.utils.functional import cached_property
+from ..models import TeamMember, Team, Project, Task, ProjectAccess
+
+MANAGER_ROLES = ('owner', 'manager')
+
+class PermissionResolver:
+    """
+    Answers permission checks for one user from memory.
+    The user's memberships are loaded with a single query the first time a
+    check needs them; owned teams and assigned projects are loaded the same
+    way. A resolver is a snapshot, so attach one per request (see
+    PermissionResolverMiddleware) rather than keeping it around.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def memberships(self):
+        """Map of team id -> role for every team the user belongs to"""
+        return dict(
+            TeamMember.objects.filter(user=self.user).values_list('team_id', 'role')
+        )
+
+    @cached_property
+    def owned_team_ids(self):
+        return set(Team.objects.filter(owner=self.user).values_list('id', flat=True))
+
+    @cached_property
+    def assigned_project_ids(self):
+        return set(
+            ProjectAccess.objects.filter(
+                user=self.user,
+                role=ProjectAccess.ROLE_ASSIGNEE
+            ).values_list('project_id', flat=True)
+        )
+
+    def reset(self):
+        """Forget loaded data, e.g. after changing the user's memberships"""
+        for name in ('memberships', 'owned_team_ids', 'assigned_project_ids'):
+            self.__dict__.pop(name, None)
+
+    def role_in(self, team_id):
+        """Get the user's role in a team, or None if not a member"""
+        return self.memberships.get(team_id)
+
+    def _is_team_owner(self, team_id):
+        return team_id in self.owned_team_ids
+
+    def _is_project_manager(self):
+        return bool(getattr(self.user, 'is_project_manager', False))
+
+    def has_team_permission(self, team):
+        """Check if user has permission to access team"""
+        return (
+            self.user.pk == team.owner_id or
+            team.pk in self.memberships or
+            self._is_project_manager()
+        )
+
+    def has_project_permission(self, project):
+        """Check if user has permission to access project"""
+        # Project manager, team member or team owner always has access;
+        # cheapest checks first so most calls never load anything
+        if (self._is_project_manager() or
+                self.user.pk == project.manager_id or
+                project.team_id in self.memberships or
+                self._is_team_owner(project.team_id)):
+            return True
+        # Otherwise the user needs assigned tasks in the project
+        return project.pk in self.assigned_project_ids
+
+    def has_task_permission(self, task):
+        """Check if user has permission to access/modify task"""
+        project = task.project
+        return (
+            self._is_project_manager() or
+            self.user.pk == project.manager_id or
+            self.user.pk == task.assigned_to_id or
+            project.team_id in self.memberships or
+            self._is_team_owner(project.team_id)
+        )
+
+    def can_manage_team(self, team):
+        """Check if user can manage team settings"""
+        if self.user.pk == team.owner_id or self._is_project_manager():
+            return True
+        return self.role_in(team.pk) in MANAGER_ROLES
+
+    can_create_team_members = can_manage_team
+    can_generate_reports = can_manage_team
+
+    def can_manage_project(self, project):
+        """Check if user can manage project settings"""
+        role = self.role_in(project.team_id)
+        if role is None:
+            return False
+        return self.user.pk == project.manager_id or role in MANAGER_ROLES
+
+    def can_manage_task(self, task):
+        """Check if user can manage task"""
+        project = task.project
+        role = self.role_in(project.team_id)
+        if role is None:
+            return False
+        created_by = getattr(task, 'created_by', None)
+        return (
+            (created_by is not None and self.user.pk == created_by.pk) or
+            self.user.pk == task.assigned_to_id or
+            self.user.pk == project.manager_id or
+            role in MANAGER_ROLES
+        )
+
+    def can_assign_tasks(self, project):
+        """Check if user can assign tasks in project"""
+        if self.user.pk == project.manager_id:
+            return True
+        return self.role_in(project.team_id) in MANAGER_ROLES
+
+    def check_many(self, objects, check):
+        """
+        Run one check over many objects without extra queries per object
+        Args:
+            objects: Iterable of model instances
+            check: Name of a resolver method, e.g. 'has_project_permission'
+        Returns:
+            Dict mapping object pk to the check result
+        """
+        method = getattr(self, check)
+        return {obj.pk: method(obj) for obj in objects}
+
+    def filter_permitted(self, objects, check):
+        """Return the objects that pass the given check, preserving order"""
+        method = getattr(self, check)
+        return [obj for obj in objects if method(obj)]
+
+def get_permission_resolver(user):
+    """
+    Get the resolver attached to this user for the current request, or a
+    one-off resolver when none is attached (e.g. outside a request)
+    """
+    resolver = getattr(user, '_permission_resolver', None)
+    if resolver is None:
+        resolver = PermissionResolver(user)
+    return resolver
 
 def has_team_permission(user, team):
     """Check if user has permission to access team"""
-    return (
-        user == team.owner or 
-        TeamMember.objects.filter(user=user, team=team).exists() or
-        user.is_project_manager
-    )
+    return get_permission_resolver(user).has_team_permission(team)
 
 def has_project_permission(user, project):
     """Check if user has permission to access project"""
-    # Project manager, team owner, or project manager always has access
-    if user == project.manager or user == project.team.owner or user.is_project_manager:
-        return True
-        
-    # Check team membership
-    try:
-        member = TeamMember.objects.get(team=project.team, user=user)
-        # Team owners and managers have full access
-        if member.role in ['owner', 'manager']:
-            return True
-        # Regular members can access projects in their team
-        return member.team == project.team
-    except TeamMember.DoesNotExist:
-        # Check if user has assigned tasks even without membership
-        return project.tasks.filter(assigned_to=user).exists()
+    return get_permission_resolver(user).has_project_permission(project)
 
 def has_task_permission(user, task):
     """Check if user has permission to access/modify task"""
-    # Project manager, team owner, task assignee have access
-    if (user == task.project.manager or 
-        user == task.project.team.owner or
-        user == task.assigned_to or
-        user.is_project_manager):
-        return True
-        
-    try:
-        member = TeamMember.objects.get(team=task.project.team, user=user)
-        # Owners and managers have full access
-        if member.role in ['owner', 'manager']:
-            return True
-        # Regular members can access tasks in their team
-        return member.team == task.project.team
-    except TeamMember.DoesNotExist:
-        return False
+    return get_permission_resolver(user).has_task_permission(task)
 
 def can_manage_team(user, team):
     """Check if user can manage team settings"""
-    try:
-        if user == team.owner or user.is_project_manager:
-            return True
-            
-        member = TeamMember.objects.get(team=team, user=user)
-        return member.role in ['owner', 'manager']
-    except TeamMember.DoesNotExist:
-        return False
+    return get_permission_resolver(user).can_manage_team(team)
 
 def can_manage_project(user, project):
     """Check if user can manage project settings"""
-    try:
-        member = TeamMember.objects.get(team=project.team, user=user)
-        return (
-            user == project.manager or 
-            member.role in ['owner', 'manager']
-        )
-    except TeamMember.DoesNotExist:
-        return False
+    return get_permission_resolver(user).can_manage_project(project)
 
 def can_manage_task(user, task):
     """Check if user can manage task"""
-    try:
-        member = TeamMember.objects.get(team=task.project.team, user=user)
-        return (
-            user == task.created_by or
-            user == task.assigned_to or
-            user == task.project.manager or
-            member.role in ['owner', 'manager']
-        )
-    except TeamMember.DoesNotExist:
-        return False
+    return get_permission_resolver(user).can_manage_task(task)
 
 def can_create_team_member(user, team):
     """Check if user can create team members"""
-    try:
-        if user == team.owner or user.is_project_manager:
-            return True
-            
-        member = TeamMember.objects.get(team=team, user=user)
-        return member.role in ['owner', 'manager']
-    except TeamMember.DoesNotExist:
-        return False
+    return get_permission_resolver(user).can_create_team_members(team)
 
 def can_assign_tasks(user, project):
     """Check if user can assign tasks in project"""
-    try:
-        if user == project.manager:
-            return True
-            
-        member = TeamMember.objects.get(team=project.team, user=user)
-        return member.role in ['owner', 'manager']
-    except TeamMember.DoesNotExist:
-        return False
+    return get_permission_resolver(user).can_assign_tasks(project)
 
 def can_generate_reports(user, team):
     """Check if user can generate team/project reports"""
-    try:
-        if user == team.owner or user.is_project_manager:
-            return True
-            
-        member = TeamMember.objects.get(team=team, user=user)
-        return member.role in ['owner', 'manager']
-    except TeamMember.DoesNotExist:
-        return False
+    return get_permission_resolver(user).can_generate_reports(team)
 
 def verify_team_permission(user, team):
     """Verify team access or raise PermissionDenied"""
@@ -128,4 +195,4 @@ def verify_project_permission(user, project):
 def verify_task_permission(user, task):
     """Verify task access or raise PermissionDenied"""
     if not has_task_permission(user, task):
-        raise PermissionDenied("You don't have permission to access this task")
\ No newline at end of file
+        raise PermissionDenied("You don't have permission to access this task")
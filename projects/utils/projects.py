@@ -1,7 +1,9 @@
 from django.utils import timezone
 from django.db.models import Q, Prefetch, Count
 from django.template.defaulttags import register
-from ..models import Project, TeamMember, Task
+from ..models import Project, ProjectAccess, TeamMember, Task
+from .access import get_accessible_projects
+from .aggregates import count_all, count_matching, percentage
 
 def get_user_projects(user):
     """Get all projects accessible to user"""
@@ -9,15 +11,12 @@ def get_user_projects(user):
         # Superusers see all projects
         return Project.objects.all()
     
-    query = Q(team__members__user=user)  # Projects where user is team member
+    roles = [ProjectAccess.ROLE_MEMBER, ProjectAccess.ROLE_ASSIGNEE]  # Team member or assigned tasks
     
     if user.is_project_manager:
-        query |= Q(manager=user)  # Add projects managed by user
+        roles.append(ProjectAccess.ROLE_MANAGER)  # Add projects managed by user
         
-    # Add projects where user is assigned tasks
-    query |= Q(tasks__assigned_to=user)
-        
-    return Project.objects.filter(query).distinct().select_related(
+    return get_accessible_projects(user, roles).select_related(
         'team',
         'manager'
     ).prefetch_related(
@@ -68,52 +67,34 @@ def get_assigned_projects(user):
         'team__members__user'
     ).order_by('-created_at')
 
+def with_card_data(projects):
+    """Load everything projects/includes/project_card.html renders, so cards add no queries"""
+    return projects.select_related(
+        'team',
+        'team__owner',
+        'manager'
+    ).prefetch_related(
+        'team__members__user__profile'
+    )
+
 @register.filter
 def completed_projects_count(projects):
-    """Count completed projects"""
-    if not projects:
-        return 0
-    # Handle both QuerySet and related manager
-    if hasattr(projects, 'all'):
-        projects = projects.all()
-    return projects.filter(status='completed').count()
+    """Count completed projects, from loaded projects or annotations when available"""
+    return count_matching(projects, 'status', {'completed'}, 'completed_projects_count')
 
 @register.filter 
 def active_projects_count(projects):
     """Count active projects"""
-    if not projects:
-        return 0
-    # Handle both QuerySet and related manager
-    if hasattr(projects, 'all'):
-        projects = projects.all()
-    return projects.filter(
-        Q(status='active') | Q(status='planned')
-    ).count()
+    return count_matching(projects, 'status', {'active', 'planned'}, 'active_projects_count')
 
 @register.filter
 def calculate_completion_rate(projects):
     """Calculate completion rate for projects"""
-    if not projects:
-        return 0
-    
-    # Handle both QuerySet and related manager
-    if hasattr(projects, 'all'):
-        projects = projects.all()
-        
-    total = projects.count()
-    if total == 0:
-        return 0
-        
-    completed = projects.filter(status='completed').count()
-    return round((completed / total) * 100)
+    return percentage(completed_projects_count(projects), count_all(projects, 'projects_count'))
 
 @register.filter
 def get_project_progress(project):
-    """Calculate progress for a single project"""
-    if not project or not project.tasks.exists():
+    """Calculate progress for a single project from its task counters"""
+    if not project:
         return 0
-        
-    total_tasks = project.tasks.count()
-    completed_tasks = project.tasks.filter(status='done').count()
-    
-    return round((completed_tasks / total_tasks) * 100) if total_tasks > 0 else 0
\ No newline at end of file
+    return project.progress
\ No newline at end of file
@@ -0,0 +1,175 @@
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from django.db import connections
+from django.dispatch import Signal
+from django.utils.module_loading import import_string
+import functools
+import hashlib
+import re
+import threading
+import time
+
+# Sent by QueryBudgetMiddleware after each request with request and stats
+query_stats_recorded = Signal()
+
+DEFAULT_BUDGETS = 'projects.urls.QUERY_BUDGETS'
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def fingerprint(sql):
+    """
+    Identify the shape of a query: the parameterized SQL with whitespace and
+    IN lists collapsed, so one query repeated per row (N+1) shares a fingerprint
+    """
+    normalized = _IN_LIST.sub('IN (...)', _WHITESPACE.sub(' ', sql.strip()))
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+class QueryStats:
+    """Query count, SQL time and repeated query shapes of one unit of work"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = fingerprint(sql)
+            with self._lock:
+                self.count += 1
+                self.duration += elapsed
+                self.fingerprints[key] += 1
+                self.samples.setdefault(key, sql)
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+    @property
+    def duplicates(self):
+        """Fingerprints that ran more than once, mapped to their run count"""
+        return {key: count for key, count in self.fingerprints.most_common() if count > 1}
+
+    @property
+    def duplicate_count(self):
+        """Queries that repeated an earlier query shape"""
+        return sum(count - 1 for count in self.duplicates.values())
+
+    def as_dict(self):
+        return {
+            'queries': self.count,
+            'sql_ms': self.duration_ms,
+            'duplicate_queries': self.duplicate_count,
+            'duplicates': self.duplicates,
+        }
+
+    def server_timing(self):
+        """Server-Timing header value"""
+        return (
+            f'sql;dur={self.duration_ms};desc="{self.count} queries", '
+            f'sqldup;desc="{self.duplicate_count} repeated"'
+        )
+
+    def describe(self):
+        """Readable listing of repeated queries, for assertion messages"""
+        return '\n'.join(
+            f"  {count}x {self.samples[key]}" for key, count in self.duplicates.items()
+        )
+
+@contextmanager
+def record_queries(aliases=None):
+    """Record the queries run on the given (default: all) databases in this thread"""
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for alias in aliases or connections:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+def declared_budgets(path=DEFAULT_BUDGETS):
+    """URL name -> maximum queries per request, as declared next to the URLconf"""
+    return import_string(path)
+
+def budget_for(request, budgets=None):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return (declared_budgets() if budgets is None else budgets).get(match.url_name)
+
+
+class QueryBudget:
+    """
+    Test decorator (or context manager) that fails when a request exceeds the
+    query budget of its URL. Budgets default to QUERY_BUDGETS in
+    projects/urls.py; keyword arguments override them per URL name.
+    Requests are measured by QueryBudgetMiddleware, so session and
+    authentication queries count too.
+
+        @QueryBudget()
+        def test_team_list(self):
+            self.client.get(reverse('team_list'))
+
+        @QueryBudget(homepage=12, max_repeated=2)
+        def test_homepage(self): ...
+    """
+
+    def __init__(self, max_repeated=None, **budgets):
+        self.budgets = budgets
+        self.max_repeated = max_repeated
+        self.measured = []
+
+    def _record(self, sender, request, stats, **kwargs):
+        self.measured.append((request, stats))
+
+    def __enter__(self):
+        self.measured = []
+        query_stats_recorded.connect(self._record, dispatch_uid=id(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        query_stats_recorded.disconnect(dispatch_uid=id(self))
+        if exc_type is None:
+            self.check()
+
+    def check(self):
+        budgets = {**declared_budgets(), **self.budgets}
+        failures = []
+        for request, stats in self.measured:
+            budget = budget_for(request, budgets)
+            if budget is not None and stats.count > budget:
+                failures.append(
+                    f"{request.method} {request.path} ({request.resolver_match.url_name}) ran "
+                    f"{stats.count} queries, budget is {budget}\n{stats.describe()}"
+                )
+            if self.max_repeated is not None and stats.duplicate_count > self.max_repeated:
+                failures.append(
+                    f"{request.method} {request.path} repeated {stats.duplicate_count} queries, "
+                    f"limit is {self.max_repeated}\n{stats.describe()}"
+                )
+        if failures:
+            raise AssertionError('Query budget exceeded:\n' + '\n'.join(failures))
+
+    def __call__(self, func):
+        if isinstance(func, type):
+            # Decorate every test method of a TestCase
+            for name in dir(func):
+                if name.startswith('test') and callable(getattr(func, name)):
+                    setattr(func, name, self._copy()(getattr(func, name)))
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self._copy():
+                return func(*args, **kwargs)
+        return wrapper
+
+    def _copy(self):
+        return QueryBudget(self.max_repeated, **self.budgets)
@@ -0,0 +1,87 @@
+"""
+Fractional (lexicographic) rank keys for ordering Kanban cards.
+
+A rank is a base-36 fraction written without the leading "0.": "i" sits
+between "" (the start) and "z...", "ih" sits between "i" and "j", and so
+on. Moving a card only needs a key between its new neighbours, so no other
+row is rewritten. Keys never end in the smallest digit, which keeps room
+for a key before any other key. Keys get longer when a spot is split over
+and over; rebalance_keys() hands out short, evenly spaced keys again.
+
+This module only works on strings; see utils.kanban for the database side.
+"""
+from django.utils import timezone
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+TIME_KEY_WIDTH = 11
+TIME_KEY_SUFFIX = DIGITS[BASE // 2]
+
+
+class RankError(ValueError):
+    """Keys are out of order or not valid rank keys"""
+
+
+def _to_digits(value, width):
+    chars = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        chars.append(DIGITS[digit])
+    return ''.join(reversed(chars))
+
+def key_between(before=None, after=None):
+    """
+    Key sorting strictly between two keys
+    Args:
+        before: Key of the card above, or None at the top
+        after: Key of the card below, or None at the bottom
+    Raises:
+        RankError: before is not lower than after, or a key is malformed
+    """
+    before = before or ''
+    if after is not None and before >= after:
+        raise RankError(f"{before!r} is not lower than {after!r}")
+    if before.endswith(DIGITS[0]) or (after or '').endswith(DIGITS[0]):
+        raise RankError('Rank keys cannot end in the smallest digit')
+
+    if after:
+        # Copy the shared prefix, then split what follows it
+        n = 0
+        while (before[n] if n < len(before) else DIGITS[0]) == after[n]:
+            n += 1
+        if n:
+            return after[:n] + key_between(before[n:], after[n:])
+
+    low = DIGITS.index(before[0]) if before else 0
+    high = DIGITS.index(after[0]) if after else BASE
+    if high - low > 1:
+        return DIGITS[(low + high + 1) // 2]
+    if after and len(after) > 1:
+        return after[:1]
+    return DIGITS[low] + key_between(before[1:], None)
+
+def time_key(moment=None):
+    """
+    Default key of a new card: later moments get lower keys, so untouched
+    columns keep the newest-first order without reading any other row
+    """
+    moment = moment or timezone.now()
+    micros = int(moment.timestamp() * 1_000_000)
+    return _to_digits(BASE ** TIME_KEY_WIDTH - 1 - micros, TIME_KEY_WIDTH) + TIME_KEY_SUFFIX
+
+def rebalance_keys(count):
+    """
+    count short keys, evenly spaced and in ascending order
+    """
+    width = 1
+    while BASE ** width < 2 * (count + 1):
+        width += 1
+    step = BASE ** width // (count + 1)
+    keys = []
+    for i in range(1, count + 1):
+        value = i * step
+        if value % BASE == 0:
+            # Step is at least 2, so the next value is still below the next key
+            value += 1
+        keys.append(_to_digits(value, width))
+    return keys
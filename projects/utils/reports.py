@@ -1,13 +1,32 @@
 from django.utils import timezone
-from django.db.models import Q
-from datetime import timedelta
+from django.db.models import F, Q, Sum
+from datetime import datetime, time, timedelta
 import logging
-from ..models import Project, Task, Team
+from ..models import DailyTaskStats, Project, ProjectReport, Task, Team
 from .constants import TASK_STATUS_DONE
+from .counters import total_tasks_count
+from .jobs import PermanentJobError, enqueue, job_setting
+from .versions import SCOPE_USER, get_versions
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Rows of each report type: (data key, [(column, header)])
+REPORT_ROWS = {
+    'tasks': ('tasks', [
+        ('id', 'ID'), ('title', 'Task'), ('project_name', 'Project'), ('status_display', 'Status'),
+        ('priority', 'Priority'), ('due_date', 'Due Date'),
+    ]),
+    'projects': ('projects', [
+        ('id', 'ID'), ('name', 'Project'), ('team_name', 'Team'), ('status_display', 'Status'),
+        ('progress', 'Progress (%)'),
+    ]),
+    'team': ('teams', [
+        ('team_id', 'ID'), ('team_name', 'Team'), ('total_tasks', 'Total Tasks'),
+        ('completed_tasks', 'Completed Tasks'), ('completion_rate', 'Completion Rate (%)'),
+    ]),
+}
+
 def generate_report(user, start_date, end_date, report_type):
     """Generate report based on type and date range"""
     try:
@@ -22,19 +41,43 @@ def generate_report(user, start_date, end_date, report_type):
         logger.error(f"Error generating report: {e}")
         return None
 
+def _rollup_range(start_date, end_date):
+    """Rollup filter for tasks created between two datetimes (whole local days)"""
+    return Q(date__range=[timezone.localdate(start_date), timezone.localdate(end_date)])
+
+def _task_totals(stats):
+    """Total and completed task counts from rollup rows in one query"""
+    totals = stats.aggregate(
+        total=Sum('created_count'),
+        completed=Sum('created_count', filter=Q(status=TASK_STATUS_DONE))
+    )
+    return totals['total'] or 0, totals['completed'] or 0
+
+def _labels(model, field):
+    return dict(model._meta.get_field(field).choices)
+
 def generate_tasks_report(user, start_date, end_date):
-    """Generate tasks report"""
+    """Generate tasks report as JSON-serializable data"""
     try:
-        tasks = Task.objects.filter(
-            assigned_to=user,
-            created_at__range=[start_date, end_date]
-        ).select_related('project')
-        
+        labels = _labels(Task, 'status')
+        tasks = [
+            {**row, 'status_display': labels.get(row['status'], row['status'])}
+            for row in Task.objects.filter(
+                assigned_to=user,
+                created_at__range=[start_date, end_date]
+            ).order_by('-created_at').values(
+                'id', 'title', 'status', 'priority', 'due_date', project_name=F('project__name')
+            )
+        ]
+        total, completed = _task_totals(
+            DailyTaskStats.objects.filter(_rollup_range(start_date, end_date), user=user)
+        )
+
         return {
             'report_type': 'tasks',
-            'total_tasks': tasks.count(),
-            'completed_tasks': tasks.filter(status=TASK_STATUS_DONE).count(),
-            'pending_tasks': tasks.exclude(status=TASK_STATUS_DONE).count(),
+            'total_tasks': total,
+            'completed_tasks': completed,
+            'pending_tasks': total - completed,
             'tasks': tasks
         }
     except Exception as e:
@@ -42,18 +85,26 @@ def generate_tasks_report(user, start_date, end_date):
         return None
 
 def generate_projects_report(user, start_date, end_date):
-    """Generate projects report"""
+    """Generate projects report as JSON-serializable data, counted from one query"""
     try:
-        projects = Project.objects.filter(
+        labels = _labels(Project, 'status')
+        projects = []
+        for row in Project.objects.filter(
             Q(manager=user) | Q(team__members__user=user),
             created_at__range=[start_date, end_date]
-        ).distinct().select_related('team')
-        
+        ).distinct().order_by('name').values(
+            'id', 'name', 'status', 'done_tasks_count', team_name=F('team__name'), total_tasks=total_tasks_count()
+        ):
+            total, done = row.pop('total_tasks'), row.pop('done_tasks_count')
+            row['status_display'] = labels.get(row['status'], row['status'])
+            row['progress'] = round(done / total * 100) if total > 0 else 0
+            projects.append(row)
+
         return {
             'report_type': 'projects',
-            'total_projects': projects.count(),
-            'active_projects': projects.filter(status='active').count(),
-            'completed_projects': projects.filter(status='completed').count(),
+            'total_projects': len(projects),
+            'active_projects': sum(1 for row in projects if row['status'] == 'active'),
+            'completed_projects': sum(1 for row in projects if row['status'] == 'completed'),
             'projects': projects
         }
     except Exception as e:
@@ -61,23 +112,29 @@ def generate_projects_report(user, start_date, end_date):
         return None
 
 def generate_team_report(user, start_date, end_date):
-    """Generate team performance report"""
+    """Generate team performance report from the daily rollups in two queries"""
     try:
-        teams = Team.objects.filter(
-            members__user=user
-        ).distinct().prefetch_related('projects__tasks')
-        
+        teams = list(Team.objects.filter(members__user=user).distinct().values('id', 'name'))
+        rows = DailyTaskStats.objects.filter(
+            _rollup_range(start_date, end_date),
+            team_id__in=[team['id'] for team in teams]
+        ).values('team_id').annotate(
+            total=Sum('created_count'),
+            completed=Sum('created_count', filter=Q(status=TASK_STATUS_DONE))
+        ).order_by()
+        totals = {row['team_id']: row for row in rows}
+
         team_data = []
         for team in teams:
-            tasks = Task.objects.filter(
-                project__team=team,
-                created_at__range=[start_date, end_date]
-            )
+            row = totals.get(team['id'], {})
+            total = row.get('total') or 0
+            completed = row.get('completed') or 0
             team_data.append({
-                'team': team,
-                'total_tasks': tasks.count(),
-                'completed_tasks': tasks.filter(status=TASK_STATUS_DONE).count(),
-                'completion_rate': calculate_completion_rate(tasks)
+                'team_id': team['id'],
+                'team_name': team['name'],
+                'total_tasks': total,
+                'completed_tasks': completed,
+                'completion_rate': round((completed / total) * 100, 1) if total else 0
             })
         
         return {
@@ -98,4 +155,106 @@ def calculate_completion_rate(tasks):
         return round((completed / total) * 100, 1)
     except Exception as e:
         logger.error(f"Error calculating completion rate: {e}")
-        return 0
\ No newline at end of file
+        return 0
+
+def generate_project_report(report_id):
+    """Job handler filling in a ProjectReport queued with generate_report_later()"""
+    try:
+        report = ProjectReport.objects.select_related('project').get(pk=report_id)
+    except ProjectReport.DoesNotExist:
+        raise PermanentJobError(f"Report {report_id} no longer exists")
+    report.generate_report()
+
+def report_data_version(user):
+    """
+    The user's SCOPE_USER version, bumped whenever tasks, projects or teams
+    they can see change. Read in the requesting process and handed to the
+    job; see utils.versions for how versions are shared between processes.
+    """
+    return repr(get_versions((SCOPE_USER, user.pk))[0])
+
+def report_period(start_date, end_date):
+    """Aware datetimes covering whole days from start_date to end_date"""
+    return (
+        timezone.make_aware(datetime.combine(start_date, time.min)),
+        timezone.make_aware(datetime.combine(end_date, time.max))
+    )
+
+def _queue_build(report, version):
+    report.status = ProjectReport.STATUS_PENDING
+    report.error = ''
+    report.requested_at = timezone.now()
+    report.save(update_fields=['status', 'error', 'requested_at'])
+    enqueue(build_report, report_id=report.pk, data_version=version)
+
+def is_stalled(report):
+    """
+    A pending report whose job has had longer than JOB_QUEUE_LOCK_TIMEOUT,
+    e.g. because it failed for good or no worker picked it up
+    """
+    if report.status != ProjectReport.STATUS_PENDING:
+        return False
+    cutoff = timezone.now() - timedelta(seconds=job_setting('LOCK_TIMEOUT', 600))
+    return report.requested_at is None or report.requested_at < cutoff
+
+def resume_stalled_report(report):
+    """
+    Queue a stalled report again, so its page does not refresh forever
+    Returns:
+        True if a job was queued
+    """
+    if not is_stalled(report) or report.generated_by is None:
+        return False
+    logger.warning(f"Report {report.pk} was pending since {report.requested_at}; queueing it again")
+    _queue_build(report, report_data_version(report.generated_by))
+    return True
+
+def request_report(user, report_type, start_date, end_date):
+    """
+    Get the user's report for a type and date range, queueing a job to
+    (re)build it unless the stored result is still current
+    Returns:
+        Tuple of (ProjectReport, queued)
+    """
+    version = report_data_version(user)
+    report, created = ProjectReport.objects.get_or_create(
+        project=None, generated_by=user, report_type=report_type,
+        start_date=start_date, end_date=end_date
+    )
+    if report.is_ready and report.data_version == version:
+        return report, False
+    if report.status == ProjectReport.STATUS_PENDING and not created and not is_stalled(report):
+        # Already queued; a newer version is picked up on the next request
+        return report, False
+    _queue_build(report, version)
+    return report, True
+
+def build_report(report_id, data_version=''):
+    """Job handler generating a scoped report queued by request_report()"""
+    try:
+        report = ProjectReport.objects.select_related('generated_by').get(pk=report_id)
+    except ProjectReport.DoesNotExist:
+        raise PermanentJobError(f"Report {report_id} no longer exists")
+    if report.generated_by is None:
+        raise PermanentJobError(f"Report {report_id} has no owner")
+
+    data = generate_report(report.generated_by, *report_period(report.start_date, report.end_date), report.report_type)
+    if data is None:
+        report.status = ProjectReport.STATUS_FAILED
+        report.error = 'The report could not be generated.'
+    else:
+        report.status = ProjectReport.STATUS_READY
+        report.data = data
+        report.data_version = data_version
+        report.error = ''
+    report.completed_at = timezone.now()
+    report.save(update_fields=['status', 'data', 'data_version', 'error', 'completed_at'])
+
+def report_rows(report):
+    """
+    Returns:
+        Tuple of ([(column, header)], iterator of row value lists) for a ready report
+    """
+    key, columns = REPORT_ROWS[report.report_type]
+    rows = (report.data or {}).get(key, [])
+    return columns, ([row.get(column) for column, _ in columns] for row in rows)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+import logging
+import time
+from ..models import ArchivedNotification, Notification
+from .chrome import invalidate_header
+from .counters import delete_notifications
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = (
+    'pk', 'user_id', 'message', 'notification_type', 'action_type', 'read',
+    'content_type_id', 'object_id', 'created_at',
+)
+
+def retention_setting(name, default):
+    return getattr(settings, f'NOTIFICATION_RETENTION_{name}', default)
+
+def protected_ids(user_ids, keep_per_user):
+    """Ids of the newest keep_per_user notifications of each user"""
+    if not keep_per_user or not user_ids:
+        return set()
+    ranked = Notification.objects.filter(user_id__in=user_ids).annotate(
+        rank=Window(
+            RowNumber(), partition_by=F('user_id'), order_by=[F('created_at').desc(), F('pk').desc()]
+        )
+    )
+    return set(ranked.filter(rank__lte=keep_per_user).values_list('pk', flat=True))
+
+def _archive(rows):
+    ArchivedNotification.objects.bulk_create([
+        ArchivedNotification(
+            notification_id=row['pk'], user_id=row['user_id'], message=row['message'],
+            notification_type=row['notification_type'], action_type=row['action_type'],
+            read=row['read'], content_type_id=row['content_type_id'],
+            object_id=row['object_id'], created_at=row['created_at'],
+        )
+        for row in rows
+    ], ignore_conflicts=True)
+
+def _remove(rows):
+    """Delete one batch; the unread counts are settled from the locked rows"""
+    return delete_notifications(Notification.objects.filter(pk__in=[row['pk'] for row in rows]))[1]
+
+def _update_throughput(totals, started):
+    elapsed = time.perf_counter() - started
+    totals['seconds'] = round(elapsed, 2)
+    totals['rows_per_second'] = round(totals['removed'] / elapsed) if elapsed else 0
+
+def prune_notifications(days=None, keep_per_user=None, archive=None, batch_size=None,
+                        max_batches=None, pause=0, dry_run=False, progress=None):
+    """
+    Delete (or archive, then delete) notifications older than the retention
+    period, walking the table in primary-key order. Each batch is its own
+    short transaction, so writers are only ever blocked for one batch.
+    Args:
+        days: Retention period; defaults to NOTIFICATION_RETENTION_DAYS
+        keep_per_user: Newest notifications every user keeps regardless of age
+        archive: Copy rows to ArchivedNotification before deleting them
+        max_batches: Stop after this many batches (resume by running again)
+        pause: Seconds to sleep between batches, to leave room for writers
+        progress: Callable receiving the running totals after each batch
+    Returns:
+        Dict of scanned, kept, removed and archived rows, batches, seconds
+        and rows removed per second
+    """
+    days = retention_setting('DAYS', 90) if days is None else days
+    keep_per_user = retention_setting('KEEP_PER_USER', 20) if keep_per_user is None else keep_per_user
+    archive = retention_setting('ARCHIVE', False) if archive is None else archive
+    batch_size = batch_size or retention_setting('BATCH_SIZE', 1000)
+    cutoff = timezone.now() - timedelta(days=days)
+
+    started = time.perf_counter()
+    totals = {'scanned': 0, 'kept': 0, 'removed': 0, 'archived': 0, 'batches': 0}
+    kept_ids, checked_users = set(), set()
+    last_pk = 0
+    while max_batches is None or totals['batches'] < max_batches:
+        rows = list(
+            Notification.objects.filter(pk__gt=last_pk, created_at__lt=cutoff)
+            .order_by('pk').values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+
+        # Each user's newest rows are ranked once, the first time they appear
+        new_users = {row['user_id'] for row in rows} - checked_users
+        kept_ids |= protected_ids(new_users, keep_per_user)
+        checked_users |= new_users
+        doomed = [row for row in rows if row['pk'] not in kept_ids]
+
+        if doomed and not dry_run:
+            with transaction.atomic():
+                if archive:
+                    # Re-read under lock, so the archived read state is the deleted one
+                    _archive(
+                        Notification.objects.select_for_update()
+                        .filter(pk__in=[row['pk'] for row in doomed]).values(*ARCHIVED_FIELDS)
+                    )
+                touched = _remove(doomed)
+            invalidate_header(*touched)
+
+        totals['scanned'] += len(rows)
+        totals['kept'] += len(rows) - len(doomed)
+        totals['removed'] += len(doomed)
+        totals['archived'] += len(doomed) if archive else 0
+        totals['batches'] += 1
+        _update_throughput(totals, started)
+        if progress:
+            progress(dict(totals))
+        if pause:
+            time.sleep(pause)
+
+    _update_throughput(totals, started)
+    logger.info(f"Pruned notifications older than {days} days: {totals}")
+    return totals
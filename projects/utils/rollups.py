@@ -0,0 +1,189 @@
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+import logging
+from ..models import DailyTaskStats, Project, Task
+from .constants import TASK_STATUS_DONE
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+KEY_FIELDS = ('date', 'team_id', 'project_id', 'user_id', 'status')
+
+def _contributions(created_at, team_id, project_id, user_id, status, completed_at):
+    """
+    Rollup deltas for one task state
+    Returns:
+        Counter mapping (key, field) -> +1
+    """
+    counts = Counter()
+    if not (created_at and team_id and project_id and user_id):
+        return counts
+    counts[((timezone.localdate(created_at), team_id, project_id, user_id, status), 'created_count')] += 1
+    if status == TASK_STATUS_DONE and completed_at:
+        key = (timezone.localdate(completed_at), team_id, project_id, user_id, TASK_STATUS_DONE)
+        counts[(key, 'completed_count')] += 1
+    return counts
+
+def _current_contributions(task):
+    return _contributions(
+        task.created_at, task.project.team_id, task.project_id,
+        task.assigned_to_id, task.status, task.completed_at
+    )
+
+def _previous_contributions(task):
+    """Contributions of the task as it was loaded, before the last save"""
+    tracker = task.tracker
+    project_id = tracker.previous('project')
+    if project_id == task.project_id:
+        team_id = task.project.team_id
+    else:
+        team_id = Project.objects.filter(pk=project_id).values_list('team_id', flat=True).first()
+    return _contributions(
+        task.created_at, team_id, project_id,
+        tracker.previous('assigned_to'), tracker.previous('status'),
+        tracker.previous('completed_at')
+    )
+
+def apply_deltas(deltas):
+    """
+    Apply (key, field) -> delta changes with F() updates, creating rows for
+    keys that do not exist yet
+    """
+    by_key = {}
+    for (key, field), delta in deltas.items():
+        if delta:
+            by_key.setdefault(key, {})[field] = delta
+
+    for key, changes in by_key.items():
+        lookup = dict(zip(KEY_FIELDS, key))
+        updates = {field: F(field) + delta for field, delta in changes.items()}
+        decrement = any(delta < 0 for delta in changes.values())
+        if DailyTaskStats.objects.filter(**lookup).update(**updates):
+            if decrement:
+                # Keep the table compact by dropping rows that reached zero
+                DailyTaskStats.objects.filter(**lookup, created_count=0, completed_count=0).delete()
+            continue
+        if decrement:
+            # Row already gone (e.g. cascaded away); reconcile fixes any drift
+            continue
+        try:
+            with transaction.atomic():
+                DailyTaskStats.objects.create(**lookup, **changes)
+        except IntegrityError:
+            # Created concurrently; fall back to the update
+            DailyTaskStats.objects.filter(**lookup).update(**updates)
+
+def record_task_change(task, created):
+    """Move a saved task's contribution from its previous state to its current one"""
+    deltas = Counter(_current_contributions(task))
+    if not created:
+        deltas.subtract(_previous_contributions(task))
+    apply_deltas(deltas)
+
+def record_tasks_created(tasks):
+    """Add the contributions of bulk-created tasks, which skip post_save"""
+    deltas = Counter()
+    for task in tasks:
+        deltas.update(_current_contributions(task))
+    apply_deltas(deltas)
+
+def record_tasks_updated(tasks):
+    """
+    Move the contributions of bulk-updated tasks, which skip post_save;
+    the tasks carry their new state and their trackers the loaded one
+    """
+    deltas = Counter()
+    for task in tasks:
+        deltas.update(_current_contributions(task))
+        deltas.subtract(_previous_contributions(task))
+    apply_deltas(deltas)
+
+def record_task_delete(task):
+    """Remove a deleted task's contribution"""
+    deltas = Counter()
+    deltas.subtract(_current_contributions(task))
+    apply_deltas(deltas)
+
+def record_project_move(project):
+    """
+    Move a project's rollup rows to its new team. The project is part of
+    every key, so the rows move with one update; rows already under the new
+    team (drift) are merged through deltas instead.
+    """
+    rows = DailyTaskStats.objects.filter(project_id=project.pk).exclude(team_id=project.team_id)
+    try:
+        with transaction.atomic():
+            rows.update(team_id=project.team_id)
+    except IntegrityError:
+        deltas = Counter()
+        for row in rows.values(*KEY_FIELDS, 'created_count', 'completed_count'):
+            key = tuple(row[field] for field in KEY_FIELDS)
+            moved = (key[0], project.team_id, *key[2:])
+            for field in ('created_count', 'completed_count'):
+                deltas[(key, field)] -= row[field]
+                deltas[(moved, field)] += row[field]
+        apply_deltas(deltas)
+
+def compute_task_stats(task_model=Task):
+    """
+    Compute the expected rollup from the task table with two grouped queries
+    Returns:
+        Dict mapping key -> {'created_count': n, 'completed_count': n}
+    """
+    tz = timezone.get_current_timezone()
+    expected = {}
+    created = (
+        task_model.objects
+        .annotate(day=TruncDate('created_at', tzinfo=tz))
+        .values_list('day', 'project__team_id', 'project_id', 'assigned_to_id', 'status')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    for *key, count in created.iterator():
+        expected.setdefault(tuple(key), {'created_count': 0, 'completed_count': 0})['created_count'] = count
+
+    completed = (
+        task_model.objects
+        .filter(status=TASK_STATUS_DONE, completed_at__isnull=False)
+        .annotate(day=TruncDate('completed_at', tzinfo=tz))
+        .values_list('day', 'project__team_id', 'project_id', 'assigned_to_id', 'status')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    for *key, count in completed.iterator():
+        expected.setdefault(tuple(key), {'created_count': 0, 'completed_count': 0})['completed_count'] = count
+    return {key: counts for key, counts in expected.items() if all(key[1:4])}
+
+def reconcile_task_stats(dry_run=False, batch_size=1000):
+    """
+    Compare the rollup with the task table and repair any drift, e.g. from
+    queryset.update() calls that bypass signals. Also backfills an empty table.
+    Returns:
+        Dict with created/updated/deleted row counts
+    """
+    with transaction.atomic():
+        expected = compute_task_stats()
+        to_create, to_update, to_delete = [], [], []
+        rows = DailyTaskStats.objects.values_list('pk', *KEY_FIELDS, 'created_count', 'completed_count')
+        for pk, *key, created_count, completed_count in rows.iterator():
+            counts = expected.pop(tuple(key), None)
+            if counts is None:
+                to_delete.append(pk)
+            elif counts != {'created_count': created_count, 'completed_count': completed_count}:
+                to_update.append(DailyTaskStats(pk=pk, **counts))
+        for key, counts in expected.items():
+            to_create.append(DailyTaskStats(**dict(zip(KEY_FIELDS, key)), **counts))
+
+        result = {'created': len(to_create), 'updated': len(to_update), 'deleted': len(to_delete)}
+        if not dry_run:
+            for start in range(0, len(to_delete), batch_size):
+                DailyTaskStats.objects.filter(pk__in=to_delete[start:start + batch_size]).delete()
+            DailyTaskStats.objects.bulk_update(
+                to_update, ['created_count', 'completed_count'], batch_size=batch_size
+            )
+            DailyTaskStats.objects.bulk_create(to_create, batch_size=batch_size)
+    logger.info(f"Reconciled daily task stats: {result}")
+    return result
@@ -0,0 +1,191 @@
+from django.db import connection, transaction
+from django.db.models import Q, Subquery
+from django.urls import reverse
+import logging
+import re
+from ..models import Project, SearchDocument, Task, Team, TeamMember
+from .access import accessible_project_ids
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'projects_search_fts'
+MAX_TERMS = 8
+# Title matches weigh ten times more than body matches
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# PostgreSQL: must match the expression of the GIN index in migration 0025,
+# which also creates the SQLite FTS5 table and its triggers
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(projects_searchdocument.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(projects_searchdocument.body, '')), 'B')"
+)
+
+_fts_available = None
+
+def fts_backend():
+    """Return 'sqlite', 'postgresql' or None when only substring search is possible"""
+    global _fts_available
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor != 'sqlite':
+        return None
+    if _fts_available is None:
+        _fts_available = FTS_TABLE in connection.introspection.table_names(include_views=True)
+    return 'sqlite' if _fts_available else None
+
+def parse_query(text):
+    """Split user input into at most MAX_TERMS lowercase word terms"""
+    return [term.lower() for term in re.findall(r'\w+', text or '')][:MAX_TERMS]
+
+def fts5_expression(terms):
+    """Prefix-match every term: foo bar -> "foo"* "bar"* (implicit AND)"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def tsquery_expression(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+def _kind(obj):
+    if isinstance(obj, Task):
+        return SearchDocument.KIND_TASK
+    if isinstance(obj, Project):
+        return SearchDocument.KIND_PROJECT
+    return SearchDocument.KIND_TEAM
+
+def _document_values(obj):
+    """Searchable fields of a project, task or team"""
+    if isinstance(obj, Task):
+        return {
+            'title': obj.title,
+            'body': obj.description or '',
+            'project_id': obj.project_id,
+            'team_id': obj.project.team_id,
+        }
+    if isinstance(obj, Project):
+        return {
+            'title': obj.name,
+            'body': obj.description or '',
+            'project_id': obj.pk,
+            'team_id': obj.team_id,
+        }
+    return {
+        'title': obj.name,
+        'body': obj.description or '',
+        'project_id': None,
+        'team_id': obj.pk,
+    }
+
+def index_object(obj):
+    """Insert or refresh the search document of an object"""
+    kind, values = _kind(obj), _document_values(obj)
+    if SearchDocument.objects.filter(kind=kind, object_id=obj.pk).update(**values):
+        return
+    SearchDocument.objects.bulk_create(
+        [SearchDocument(kind=kind, object_id=obj.pk, **values)], ignore_conflicts=True
+    )
+
+def remove_object(obj):
+    """Drop the search document of a deleted object"""
+    SearchDocument.objects.filter(kind=_kind(obj), object_id=obj.pk).delete()
+
+def iter_documents(team_model, project_model, task_model, document_model):
+    """
+    Yield search documents for every team, project and task using three
+    queries
+    """
+    teams = team_model.objects.values_list('id', 'name', 'description')
+    for pk, name, description in teams.iterator():
+        yield document_model(kind='team', object_id=pk, title=name,
+                             body=description or '', team_id=pk)
+    projects = project_model.objects.values_list('id', 'name', 'description', 'team_id')
+    for pk, name, description, team_id in projects.iterator():
+        yield document_model(kind='project', object_id=pk, title=name,
+                             body=description or '', project_id=pk, team_id=team_id)
+    tasks = task_model.objects.values_list('id', 'title', 'description', 'project_id', 'project__team_id')
+    for pk, title, description, project_id, team_id in tasks.iterator():
+        yield document_model(kind='task', object_id=pk, title=title,
+                             body=description or '', project_id=project_id, team_id=team_id)
+
+def rebuild_search_index(batch_size=1000):
+    """
+    Rebuild all search documents (and the FTS5 table) from source tables
+    Returns:
+        Number of documents written
+    """
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.bulk_create(
+            iter_documents(Team, Project, Task, SearchDocument), batch_size=batch_size
+        )
+        if fts_backend() == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        written = SearchDocument.objects.count()
+    logger.info(f"Rebuilt search index: {written} documents")
+    return written
+
+def _visible_documents(user):
+    """Documents in projects the user can access, and teams they belong to"""
+    team_ids = TeamMember.objects.filter(user=user).values('team_id')
+    return SearchDocument.objects.filter(
+        Q(kind__in=[SearchDocument.KIND_PROJECT, SearchDocument.KIND_TASK],
+          project_id__in=accessible_project_ids(user)) |
+        Q(kind=SearchDocument.KIND_TEAM, team_id__in=Subquery(team_ids)) |
+        Q(kind=SearchDocument.KIND_TEAM, team__owner=user)
+    )
+
+def search(user, text, kind, limit=5):
+    """
+    Ranked prefix search over documents of one kind visible to the user
+    Returns:
+        List of SearchDocument, best match first
+    """
+    terms = parse_query(text)
+    if not terms:
+        return []
+    documents = _visible_documents(user).filter(kind=kind)
+    backend = fts_backend()
+    if backend == 'sqlite':
+        documents = documents.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = projects_searchdocument.id', f'{FTS_TABLE} MATCH %s'],
+            params=[fts5_expression(terms)],
+            select={'rank': f'bm25({FTS_TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT})'},
+            order_by=['rank'],
+        )
+    elif backend == 'postgresql':
+        documents = documents.extra(
+            where=[f"({PG_VECTOR}) @@ to_tsquery('simple', %s)"],
+            params=[tsquery_expression(terms)],
+            select={'rank': f"ts_rank(({PG_VECTOR}), to_tsquery('simple', %s))"},
+            select_params=[tsquery_expression(terms)],
+            order_by=['-rank'],
+        )
+    else:
+        for term in terms:
+            documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        documents = documents.order_by('title')
+    return list(documents[:limit])
+
+def document_url(document):
+    """URL of the object a search document points to"""
+    if document.kind == SearchDocument.KIND_TASK:
+        return reverse('task_detail', args=[document.project_id, document.object_id])
+    if document.kind == SearchDocument.KIND_PROJECT:
+        return reverse('project_detail', args=[document.object_id])
+    return reverse('team_detail', args=[document.object_id])
+
+def search_results(user, text, limit=5):
+    """Search results for the header search box, grouped by kind"""
+    results = []
+    for kind in (SearchDocument.KIND_PROJECT, SearchDocument.KIND_TASK, SearchDocument.KIND_TEAM):
+        for document in search(user, text, kind, limit):
+            results.append({
+                'type': kind,
+                'id': document.object_id,
+                'title': document.title,
+                'url': document_url(document)
+            })
+    return results
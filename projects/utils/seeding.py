@@ -0,0 +1,226 @@
+from collections import Counter
+from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+import logging
+import random
+import time
+from ..models import File, Notification, Profile, Project, Task, Team, TeamMember, User
+from .access import rebuild_project_access
+from .counters import repair_counters
+from .ranking import time_key
+from .rollups import reconcile_task_stats
+from .search import rebuild_search_index
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+BENCHMARK_PREFIX = 'bench'
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+# Volumes per scale; per-team and per-project figures are means
+SCALES = {
+    'small': {
+        'users': 50, 'teams': 5, 'projects_per_team': 4, 'tasks_per_project': 20,
+        'notifications_per_user': 20,
+    },
+    'medium': {
+        'users': 500, 'teams': 40, 'projects_per_team': 6, 'tasks_per_project': 60,
+        'notifications_per_user': 50,
+    },
+    'large': {
+        'users': 5000, 'teams': 300, 'projects_per_team': 8, 'tasks_per_project': 120,
+        'notifications_per_user': 100,
+    },
+}
+
+PROJECT_STATUS_WEIGHTS = {'planned': 20, 'active': 50, 'completed': 20, 'on_hold': 10}
+TASK_STATUS_WEIGHTS = {'todo': 40, 'inprogress': 25, 'done': 35}
+PRIORITY_WEIGHTS = {'low': 30, 'medium': 50, 'high': 20}
+NOTIFICATION_ACTION_WEIGHTS = {
+    'task_assigned': 35, 'task_status_changed': 25, 'task_completed': 15,
+    'deadline_approaching': 10, 'project_updated': 10, 'mention': 5,
+}
+WORDS = (
+    'api design review release client onboarding migration report dashboard audit '
+    'billing search mobile login invoice export import sprint backlog testing '
+    'deployment security metrics analytics budget roadmap survey content support'
+).split()
+HISTORY_DAYS = 180
+FILE_TASK_RATIO = 0.2
+NOTIFICATION_READ_RATIO = 0.6
+
+def _pick(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _around(rng, mean, low=1):
+    """Skewed positive count with the given mean: most are small, a few large"""
+    return max(low, round(rng.lognormvariate(0, 0.75) * mean / 1.32))
+
+def _phrase(rng, words=3):
+    return ' '.join(rng.sample(WORDS, words)).capitalize()
+
+def _moment(rng, start, end):
+    return start + timedelta(seconds=rng.uniform(0, max((end - start).total_seconds(), 0)))
+
+def _bulk_create_backdated(model, objects, batch_size):
+    """
+    bulk_create keeping the generated created_at values. auto_now_add stamps
+    every row on insert, so the wanted values are written back afterwards
+    with bulk_update.
+    """
+    created_at = [obj.created_at for obj in objects]
+    created = model.objects.bulk_create(objects, batch_size=batch_size)
+    for obj, value in zip(created, created_at):
+        obj.created_at = value
+    model.objects.bulk_update(created, ['created_at'], batch_size=batch_size)
+    return created
+
+def clear_benchmark_data(prefix=BENCHMARK_PREFIX):
+    """Delete users created by seed_benchmark_data; their teams and data cascade"""
+    deleted, _ = User.objects.filter(username__startswith=f'{prefix}_').delete()
+    return deleted
+
+def seed_benchmark_data(users=50, teams=5, projects_per_team=4, tasks_per_project=20,
+                        notifications_per_user=20, seed=42, prefix=BENCHMARK_PREFIX, batch_size=1000):
+    """
+    Generate users, teams, members, projects, tasks, files and notifications
+    with bulk_create. bulk_create skips signals, so the access index, rollups,
+    counters and search index are rebuilt afterwards with their repair tools.
+    Returns:
+        Dict of created row counts and elapsed seconds
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    now = timezone.now()
+    history_start = now - timedelta(days=HISTORY_DAYS)
+    password = make_password(BENCHMARK_PASSWORD)
+
+    with transaction.atomic():
+        # Users: about one in ten manages projects and owns teams
+        created_users = User.objects.bulk_create([
+            User(
+                username=f'{prefix}_{seed}_{i}',
+                email=f'{prefix}_{seed}_{i}@example.com',
+                first_name=_phrase(rng, 1),
+                password=password,
+                is_project_manager=i % 10 == 0,
+                date_joined=_moment(rng, history_start, now),
+            )
+            for i in range(users)
+        ], batch_size=batch_size)
+        Profile.objects.bulk_create([Profile(user=user) for user in created_users], batch_size=batch_size)
+        managers = [user for user in created_users if user.is_project_manager] or created_users[:1]
+
+        # Teams with skewed sizes; the owner is always a member
+        created_teams = Team.objects.bulk_create([
+            Team(name=f'{prefix} {seed} team {i}', description=_phrase(rng, 6), owner=managers[i % len(managers)])
+            for i in range(teams)
+        ], batch_size=batch_size)
+        # Users belong to one or two teams on average
+        mean_team_size = max(users * 3 // (2 * max(teams, 1)), 2)
+        team_members, memberships = {}, []
+        for team in created_teams:
+            size = min(len(created_users), _around(rng, mean_team_size, low=2))
+            members = [team.owner] + [
+                user for user in rng.sample(created_users, size) if user.pk != team.owner_id
+            ][:size - 1]
+            team_members[team.pk] = members
+            memberships.extend(
+                TeamMember(
+                    team=team, user=user, created_by=team.owner,
+                    role='owner' if user.pk == team.owner_id else ('manager' if index == 1 else 'member'),
+                )
+                for index, user in enumerate(members)
+            )
+        TeamMember.objects.bulk_create(memberships, batch_size=batch_size)
+
+        # Projects spread over the last months
+        projects = []
+        for team in created_teams:
+            for i in range(_around(rng, projects_per_team)):
+                start = (now - timedelta(days=rng.randint(0, HISTORY_DAYS))).date()
+                projects.append(Project(
+                    name=f'{_phrase(rng, 2)} {i}', description=_phrase(rng, 12), team=team,
+                    manager=team.owner, status=_pick(rng, PROJECT_STATUS_WEIGHTS),
+                    priority=_pick(rng, PRIORITY_WEIGHTS),
+                    start_date=start, end_date=start + timedelta(days=rng.randint(30, 120)),
+                ))
+        created_projects = Project.objects.bulk_create(projects, batch_size=batch_size)
+
+        # Tasks: a few members of each team carry most of the work
+        tasks = []
+        for project in created_projects:
+            members = team_members[project.team_id]
+            member_weights = [1 / rank for rank in range(1, len(members) + 1)]
+            for i in range(_around(rng, tasks_per_project)):
+                status = 'done' if project.status == 'completed' else _pick(rng, TASK_STATUS_WEIGHTS)
+                created_at = _moment(rng, history_start, now)
+                tasks.append(Task(
+                    project=project, title=f'{_phrase(rng)} {i}', description=_phrase(rng, 20),
+                    assigned_to=rng.choices(members, weights=member_weights)[0],
+                    status=status, priority=_pick(rng, PRIORITY_WEIGHTS),
+                    start_date=project.start_date,
+                    due_date=project.start_date + timedelta(days=rng.randint(1, 120)),
+                    created_at=created_at, rank=time_key(created_at),
+                    completed_at=_moment(rng, created_at, now) if status == 'done' else None,
+                ))
+        created_tasks = _bulk_create_backdated(Task, tasks, batch_size)
+
+        files = [
+            File(task=task, uploaded_by=task.assigned_to, file_name=f'{name}.pdf', file=f'files/{prefix}/{name}.pdf')
+            for task in created_tasks if rng.random() < FILE_TASK_RATIO
+            for name in {f'{rng.choice(WORDS)}-{task.pk}-{n}' for n in range(rng.randint(1, 3))}
+        ]
+        File.objects.bulk_create(files, batch_size=batch_size)
+
+        # Notifications about tasks, mostly recent, most of them read
+        task_type = ContentType.objects.get_for_model(Task)
+        tasks_by_user = {}
+        for task in created_tasks:
+            tasks_by_user.setdefault(task.assigned_to_id, []).append(task)
+        notifications = []
+        for user in created_users:
+            user_tasks = tasks_by_user.get(user.pk)
+            if not user_tasks:
+                continue
+            for _ in range(_around(rng, notifications_per_user)):
+                task = rng.choice(user_tasks)
+                notifications.append(Notification(
+                    user=user, message=f'Update on {task.title}',
+                    action_type=_pick(rng, NOTIFICATION_ACTION_WEIGHTS),
+                    read=rng.random() < NOTIFICATION_READ_RATIO,
+                    created_at=now - timedelta(hours=rng.expovariate(1 / 72)),
+                    content_type=task_type, object_id=task.pk,
+                ))
+        created_notifications = _bulk_create_backdated(Notification, notifications, batch_size)
+
+    rebuild_project_access(batch_size=batch_size)
+    reconcile_task_stats(batch_size=batch_size)
+    repair_counters(batch_size=batch_size)
+    rebuild_search_index(batch_size=batch_size)
+
+    result = {
+        'users': len(created_users),
+        'teams': len(created_teams),
+        'team_members': len(memberships),
+        'projects': len(created_projects),
+        'tasks': len(created_tasks),
+        'files': len(files),
+        'notifications': len(created_notifications),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"Seeded benchmark data: {result}")
+    return result
+
+def busiest_user(prefix=BENCHMARK_PREFIX):
+    """The seeded project manager with the most team memberships, to benchmark worst-case pages"""
+    counts = Counter(
+        TeamMember.objects.filter(user__username__startswith=f'{prefix}_', user__is_project_manager=True)
+        .values_list('user_id', flat=True)
+    )
+    if not counts:
+        return None
+    return User.objects.get(pk=counts.most_common(1)[0][0])
@@ -0,0 +1,20 @@
+from django.core.files.storage import default_storage
+import logging
+from .jobs import enqueue
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+def queue_file_delete(field_file):
+    """
+    Delete a stored file from a background worker once the transaction
+    commits, instead of inline: the request does not wait on the storage
+    backend, and a rolled-back change keeps its file
+    """
+    if field_file and field_file.name:
+        enqueue(delete_stored_file, name=field_file.name)
+
+def delete_stored_file(name):
+    """Job handler; deleting a missing file is a no-op"""
+    default_storage.delete(name)
+    logger.info(f"Deleted stored file {name}")
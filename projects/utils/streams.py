@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+import asyncio
+import json
+import logging
+import threading
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = 'projects.utils.streams.LocalChannel'
+REDIS_CHANNEL_NAME = 'projects:notification-stream'
+RECONNECT_DELAY_MS = 5000
+
+
+class StreamBroker:
+    """
+    In-process pub/sub for notification streams.
+    Each open stream subscribes one asyncio queue for its user; dispatching a
+    change signals every queue of the affected users from any thread. Queues
+    hold at most one pending signal, so bursts of changes coalesce into a
+    single refresh per stream.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Register a queue for a user; call from the stream's event loop"""
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=1))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[user_id]
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def dispatch(self, user_ids):
+        """Signal the streams of the given users that their data changed"""
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in set(user_ids)
+                for subscription in self._subscribers.get(user_id, ())
+            ]
+        for loop, stream_queue in targets:
+            try:
+                loop.call_soon_threadsafe(_signal, stream_queue)
+            except RuntimeError:
+                # Event loop already closed; the stream is gone
+                pass
+
+def _signal(stream_queue):
+    if stream_queue.empty():
+        stream_queue.put_nowait(True)
+
+broker = StreamBroker()
+
+
+class LocalChannel:
+    """Deliver changes to streams in this process only (single-process deployments)"""
+
+    def publish(self, user_ids):
+        broker.dispatch(user_ids)
+
+
+class RedisChannel(LocalChannel):
+    """
+    Fan changes out to every process through Redis pub/sub.
+    Requires the redis package and NOTIFICATION_STREAM_REDIS_URL.
+    """
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisChannel requires the 'redis' package")
+        url = getattr(settings, 'NOTIFICATION_STREAM_REDIS_URL', None)
+        if not url:
+            raise ImproperlyConfigured("RedisChannel requires NOTIFICATION_STREAM_REDIS_URL")
+        self.client = redis.Redis.from_url(url)
+        self._listener = threading.Thread(
+            target=self._listen, name='notification-stream-redis', daemon=True
+        )
+        self._listener.start()
+
+    def publish(self, user_ids):
+        self.client.publish(REDIS_CHANNEL_NAME, json.dumps(sorted(set(user_ids))))
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(REDIS_CHANNEL_NAME)
+        for message in pubsub.listen():
+            try:
+                broker.dispatch(json.loads(message['data']))
+            except Exception as e:
+                logger.error(f"Error dispatching stream message: {str(e)}")
+
+_channel = None
+_channel_lock = threading.Lock()
+
+def get_channel():
+    """Get the configured cross-process channel (NOTIFICATION_STREAM_CHANNEL)"""
+    global _channel
+    with _channel_lock:
+        if _channel is None:
+            path = getattr(settings, 'NOTIFICATION_STREAM_CHANNEL', DEFAULT_CHANNEL)
+            _channel = import_string(path)()
+    return _channel
+
+def publish_change(*user_ids):
+    """Tell open notification streams of these users to refresh, after commit"""
+    user_ids = [user_id for user_id in set(user_ids) if user_id]
+    if not user_ids:
+        return
+
+    def publish():
+        try:
+            get_channel().publish(user_ids)
+        except Exception as e:
+            logger.error(f"Error publishing notification stream change: {str(e)}")
+
+    transaction.on_commit(publish)
+
+def format_event(event, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def event_stream(user, heartbeat=None, max_age=None):
+    """
+    Server-Sent Events for a user's notification dropdown.
+    Sends the current notifications and unread count, then a fresh copy after
+    every change and a comment line as keep-alive while idle. Streams end after
+    max_age seconds so clients reconnect (and rebalance) periodically.
+    """
+    from asgiref.sync import sync_to_async
+    from .chrome import header_payload
+
+    heartbeat = heartbeat or getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 25)
+    max_age = max_age or getattr(settings, 'NOTIFICATION_STREAM_MAX_AGE', 600)
+    load_payload = sync_to_async(header_payload)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    # Subscribe before the first snapshot so no change can slip in between
+    subscription = broker.subscribe(user.pk)
+    _, stream_queue = subscription
+    try:
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        yield format_event('notifications', await load_payload(user))
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                await asyncio.wait_for(stream_queue.get(), timeout=min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event('notifications', await load_payload(user))
+    finally:
+        broker.unsubscribe(user.pk, subscription)
@@ -2,6 +2,7 @@ from django.db.models import Count, Q, F, FloatField, Case, When, Value, Express
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from ..models import Team, TeamMember, Task, Project
+from .permissions import get_permission_resolver
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,21 +32,19 @@ def get_user_team_members(user):
         return TeamMember.objects.none()
 
 def get_team_stats(team):
-    """Calculate team statistics"""
+    """Calculate team statistics; task figures come from the team counters"""
     try:
-        tasks = Task.objects.filter(project__team=team)
-        stats = {
-            'total_tasks': tasks.count(),
-            'completed_tasks': tasks.filter(status='done').count(),
-            'active_projects': team.projects.exclude(status='completed').count(),
-            'completed_projects': team.projects.filter(status='completed').count()
-        }
-        
-        stats['progress'] = (
-            (stats['completed_tasks'] / stats['total_tasks'] * 100)
-            if stats['total_tasks'] > 0 else 0
+        project_stats = team.projects.aggregate(
+            active=Count('pk', filter=~Q(status='completed')),
+            completed=Count('pk', filter=Q(status='completed'))
         )
-        return stats
+        return {
+            'total_tasks': team.total_tasks_count,
+            'completed_tasks': team.done_tasks_count,
+            'active_projects': project_stats['active'],
+            'completed_projects': project_stats['completed'],
+            'progress': team.calculate_progress()
+        }
     except Exception as e:
         logger.error(f"Error calculating team stats: {str(e)}")
         return {
@@ -82,14 +81,7 @@ def get_member_stats(member):
 def can_manage_team(user, team):
     """Check if user can manage team"""
     try:
-        if user == team.owner or user.is_project_manager:
-            return True
-            
-        return TeamMember.objects.filter(
-            user=user,
-            team=team,
-            role__in=['owner', 'manager']
-        ).exists()
+        return get_permission_resolver(user).can_manage_team(team)
     except Exception as e:
         logger.error(f"Error checking team permissions: {str(e)}")
         return False
@@ -126,15 +118,7 @@ def get_team_members_with_stats(team):
 
 def get_team_progress(team):
     """Calculate overall team progress"""
-    try:
-        tasks = Task.objects.filter(project__team=team)
-        total = tasks.count()
-        completed = tasks.filter(status='done').count()
-        
-        return (completed / total * 100) if total > 0 else 0
-    except Exception as e:
-        logger.error(f"Error calculating team progress: {str(e)}")
-        return 0
+    return team.calculate_progress()
 
 def get_active_teams(user):
     """Get active teams based on user role"""
@@ -146,25 +130,8 @@ def get_active_teams(user):
             # Regular users see teams they're members of
             query = Q(members__user=user)
             
-        return Team.objects.filter(query).annotate(
-            member_count=Count('members', distinct=True),
-            project_count=Count('projects', distinct=True),
-            completed_tasks=Count(
-                'projects__tasks',
-                filter=Q(projects__tasks__status='done'),
-                distinct=True
-            ),
-            total_tasks=Count('projects__tasks', distinct=True)
-        ).annotate(
-            progress=Case(
-                When(total_tasks=0, then=Value(0.0)),
-                default=ExpressionWrapper(
-                    F('completed_tasks') * 100.0 / F('total_tasks'),
-                    output_field=FloatField()
-                ),
-                output_field=FloatField()
-            )
-        ).distinct()
+        # Counts and progress are read from the team counters
+        return Team.objects.filter(query).distinct()
     except Exception as e:
         logger.error(f"Error getting active teams: {str(e)}")
         return Team.objects.none()
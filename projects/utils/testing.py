@@ -0,0 +1,33 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.template import Context, Template
+from django.template.loader import get_template
+from django.test.utils import CaptureQueriesContext
+
+def render_without_queries(template, context=None, request=None, using=DEFAULT_DB_ALIAS):
+    """
+    Render a template and fail if rendering runs any query, so everything it
+    shows must come from the view's select_related/prefetch_related,
+    annotations or counters
+    Args:
+        template: Template name, or a django.template.Template
+        context: Template context dict
+        request: Optional request, which also runs the context processors
+        using: Database alias to watch
+    Returns:
+        The rendered text
+    """
+    if isinstance(template, str):
+        template = get_template(template)
+    with CaptureQueriesContext(connections[using]) as queries:
+        if isinstance(template, Template):
+            rendered = template.render(Context(context or {}))
+        else:
+            rendered = template.render(context or {}, request)
+    if queries.captured_queries:
+        executed = '\n'.join(
+            f"{index}. {query['sql']}" for index, query in enumerate(queries.captured_queries, start=1)
+        )
+        raise AssertionError(
+            f"{len(queries.captured_queries)} queries executed while rendering:\n{executed}"
+        )
+    return rendered
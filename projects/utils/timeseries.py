@@ -0,0 +1,104 @@
+from datetime import datetime, time, timedelta
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+import logging
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+GRANULARITY_DAY = 'day'
+GRANULARITY_WEEK = 'week'
+GRANULARITY_MONTH = 'month'
+GRANULARITIES = (GRANULARITY_DAY, GRANULARITY_WEEK, GRANULARITY_MONTH)
+
+LABEL_FORMATS = {
+    GRANULARITY_DAY: '%b %d',
+    GRANULARITY_WEEK: '%b %d',
+    GRANULARITY_MONTH: '%b %Y',
+}
+
+def bucket_start(day, granularity):
+    """Truncate a date to the start of its bucket (weeks start on Monday)"""
+    if granularity == GRANULARITY_WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == GRANULARITY_MONTH:
+        return day.replace(day=1)
+    return day
+
+def _next_bucket(day, granularity):
+    if granularity == GRANULARITY_WEEK:
+        return day + timedelta(days=7)
+    if granularity == GRANULARITY_MONTH:
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+def get_buckets(time_range=7, granularity=GRANULARITY_DAY, end=None):
+    """
+    Get the bucket start dates covering the last N days
+    Args:
+        time_range: Number of days in the window, ending today
+        granularity: 'day', 'week' or 'month'
+        end: Last day of the window (defaults to today in TIME_ZONE)
+    Returns:
+        List of dates, oldest first
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    end = end or timezone.localdate()
+    current = bucket_start(end - timedelta(days=max(time_range, 1) - 1), granularity)
+    buckets = []
+    while current <= end:
+        buckets.append(current)
+        current = _next_bucket(current, granularity)
+    return buckets
+
+def get_bucket_labels(buckets, granularity=GRANULARITY_DAY):
+    """Format bucket dates as chart labels"""
+    return [bucket.strftime(LABEL_FORMATS[granularity]) for bucket in buckets]
+
+def count_by_bucket(queryset, field, buckets, granularity=GRANULARITY_DAY):
+    """
+    Count rows per bucket of a datetime field with a single grouped query.
+    Truncation happens in the database in the current time zone; buckets
+    with no rows are filled with zero.
+    Returns:
+        List of counts aligned with buckets
+    """
+    if not buckets:
+        return []
+    tz = timezone.get_current_timezone()
+    window_start = timezone.make_aware(datetime.combine(buckets[0], time.min), tz)
+    window_end = timezone.make_aware(
+        datetime.combine(_next_bucket(buckets[-1], granularity), time.min), tz
+    )
+    rows = (
+        queryset
+        .filter(**{f'{field}__gte': window_start, f'{field}__lt': window_end})
+        .annotate(bucket=Trunc(field, granularity, output_field=DateField(), tzinfo=tz))
+        .values('bucket')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    counts = {row['bucket']: row['count'] for row in rows}
+    return [counts.get(bucket, 0) for bucket in buckets]
+
+def sum_by_bucket(queryset, field, value, buckets, granularity=GRANULARITY_DAY):
+    """
+    Sum a column per bucket of a date field with a single grouped query,
+    e.g. for rollup tables whose dates are already local
+    Returns:
+        List of sums aligned with buckets
+    """
+    if not buckets:
+        return []
+    rows = (
+        queryset
+        .filter(**{f'{field}__gte': buckets[0], f'{field}__lt': _next_bucket(buckets[-1], granularity)})
+        .annotate(bucket=Trunc(field, granularity, output_field=DateField()))
+        .values('bucket')
+        .annotate(total=Sum(value))
+        .order_by()
+    )
+    totals = {row['bucket']: row['total'] or 0 for row in rows}
+    return [totals.get(bucket, 0) for bucket in buckets]
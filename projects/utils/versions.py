@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from datetime import datetime, timezone
+import hashlib
+import logging
+import time
+from ..models import Project, TeamMember
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Version scopes: what a bump of each one means
+SCOPE_NOTIFICATIONS = 'notifications'  # a user's notifications changed
+SCOPE_TEAM = 'team'  # a team's membership changed
+SCOPE_PROJECT = 'project'  # a project, its tasks or its team's membership changed
+SCOPE_USER = 'user'  # anything a user sees through their teams changed
+
+VERSION_KEY = 'version:{scope}:{id}'
+VERSION_CACHE = 'versions'
+# Backends that keep entries inside one process
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+def version_cache_alias():
+    """CACHES['versions'] when configured, else the default cache"""
+    return VERSION_CACHE if VERSION_CACHE in settings.CACHES else 'default'
+
+def version_cache_is_shared():
+    return settings.CACHES[version_cache_alias()]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+def _store(values):
+    """
+    Write versions. Shared caches keep them until evicted; a process-local
+    cache cannot see bumps made by other processes, so there they expire
+    after VERSION_LOCAL_TIMEOUT to bound how long a stale 304 is served.
+    """
+    timeout = None if version_cache_is_shared() else getattr(settings, 'VERSION_LOCAL_TIMEOUT', 60)
+    caches[version_cache_alias()].set_many(values, timeout)
+
+def _key(scope, obj_id):
+    return VERSION_KEY.format(scope=scope, id=obj_id)
+
+def bump(scope, *ids):
+    """
+    Move the version of the given objects forward once the surrounding
+    transaction commits, so readers never pair old data with a new version
+    """
+    keys = [_key(scope, obj_id) for obj_id in set(ids) if obj_id]
+    if not keys:
+        return
+
+    def write():
+        now = time.time()
+        _store({key: now for key in keys})
+
+    transaction.on_commit(write)
+
+def bump_team(team_id, *extra_user_ids):
+    """A team's membership changed: bump it, its projects and its members"""
+    bump(SCOPE_TEAM, team_id)
+    bump(SCOPE_PROJECT, *Project.objects.filter(team_id=team_id).values_list('id', flat=True))
+    bump_team_users(team_id, *extra_user_ids)
+
+def bump_team_users(team_id, *extra_user_ids):
+    """Bump the user scope of every member of a team"""
+    member_ids = TeamMember.objects.filter(team_id=team_id).values_list('user_id', flat=True)
+    bump(SCOPE_USER, *member_ids, *extra_user_ids)
+
+def get_versions(*scoped_ids):
+    """
+    Read versions with a single cache lookup
+    Args:
+        scoped_ids: (scope, id) pairs
+    Returns:
+        List of version timestamps aligned with scoped_ids. Versions missing
+        from the cache (never bumped or evicted) start now, which only costs
+        one extra full response.
+    """
+    keys = [_key(scope, obj_id) for scope, obj_id in scoped_ids]
+    versions = caches[version_cache_alias()].get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        _store(missing)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+def _validators(request, scoped_ids, extra):
+    """Compute (etag, last_modified) once per request"""
+    memo = getattr(request, '_version_validators', None)
+    if memo is None:
+        versions = get_versions(*scoped_ids)
+        raw = '|'.join(str(part) for part in [request.user.pk, *versions, *extra])
+        memo = request._version_validators = (
+            hashlib.sha1(raw.encode('utf-8')).hexdigest(),
+            datetime.fromtimestamp(max(versions), tz=timezone.utc) if versions else None
+        )
+    return memo
+
+def version_validators(scope_func):
+    """
+    Build etag_func and last_modified_func for django.views.decorators.http.condition
+    Args:
+        scope_func: Callable (request, *args, **kwargs) returning
+            (scoped_ids, extra) for the response, or None to skip
+            conditional handling for this request
+    Returns:
+        Dict of keyword arguments for condition()
+    """
+    def etag_func(request, *args, **kwargs):
+        scope = scope_func(request, *args, **kwargs)
+        return _validators(request, *scope)[0] if scope else None
+
+    def last_modified_func(request, *args, **kwargs):
+        scope = scope_func(request, *args, **kwargs)
+        return _validators(request, *scope)[1] if scope else None
+
+    return {'etag_func': etag_func, 'last_modified_func': last_modified_func}
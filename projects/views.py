@@ -5,7 +5,6 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm, AuthenticationForm
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied, ValidationError
-from django.core.paginator import Paginator
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction, connection
 from django.db.models import (
@@ -24,12 +23,14 @@ from django.db.models import (
 )
 from django.db.models.functions import Cast  # Change this line
 from django.db.utils import OperationalError, ProgrammingError
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import cache_control, cache_page
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
 
 # Python standard library imports
 from datetime import datetime
@@ -45,7 +46,9 @@ from .models import (
     Notification, 
     TeamMember, 
     File, 
-    User
+    User,
+    ProjectAccess,
+    ProjectReport
 )
 
 # Local form imports
@@ -73,6 +76,7 @@ from .utils.analytics import (
     get_timeline_labels,
     get_completed_tasks_data
 )
+from .utils.timeseries import GRANULARITY_DAY, GRANULARITIES
 from .utils.team import (
     get_team_stats,
     can_manage_team,
@@ -85,9 +89,31 @@ from .utils.tasks import (
     get_user_tasks,
     get_recent_activity
 )
-from .utils.projects import get_user_projects
-from .utils.reports import generate_report
-from .utils.email import send_team_removal_email 
+from .utils.projects import get_user_projects, with_card_data
+from .utils.access import (
+    get_accessible_projects,
+    accessible_project_ids,
+    MANAGING_ROLES
+)
+from .utils.reports import report_rows, request_report, resume_stalled_report
+from .utils.batch import apply_task_changes
+from .utils.imports import ImportFormatError, import_tasks, read_rows
+from .utils.kanban import move_task, neighbours_at
+from .utils.onboarding import provision_team_members
+from .utils.exports import (
+    CSV_CONTENT_TYPE, EXPORT_FORMATS, EXPORTS, JSON_CONTENT_TYPE, csv_lines, export_chunks, json_lines,
+    parse_export_filters, streaming_download
+)
+from .utils.search import search_results
+from .utils.streams import event_stream
+from .utils.chrome import header_payload, invalidate_header
+from .utils.counters import delete_notifications
+from .utils.pagination import CursorPaginator, RankCursorPaginator, page_response
+from .utils.versions import (
+    SCOPE_NOTIFICATIONS, SCOPE_PROJECT, SCOPE_USER, version_validators
+)
+from .utils.email import queue_team_removal_email
+from .utils.storage import queue_file_delete
 from .utils.notifications import send_notification
 from .utils.common import get_common_context
 from .utils.permissions import (
@@ -113,7 +139,11 @@ from .utils.constants import (
     NOTIFICATION_SUCCESS,
     MSG_LOGIN_SUCCESS,
     MSG_LOGOUT_SUCCESS,
-    MSG_INVALID_REQUEST
+    MSG_INVALID_REQUEST,
+    ANALYTICS_MAX_RANGE,
+    PROJECTS_PER_SECTION,
+    TASK_STATUSES,
+    TASKS_PER_COLUMN
 )
 
 Cast = functions.Cast
@@ -131,18 +161,50 @@ def get_tasks_by_status(user):
         'done_tasks': tasks.filter(status='done')
     }
 
+def _wants_json(request):
+    return (
+        request.GET.get('format') == 'json'
+        or request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    )
+
+def _notification_json(notification):
+    return {
+        'id': notification.id,
+        'message': notification.message,
+        'action_type': notification.action_type,
+        'read': notification.read,
+        'created_at': notification.created_at,
+    }
+
+def _task_json(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'status': task.status,
+        'priority': task.priority,
+        'due_date': task.due_date,
+        'project': {'id': task.project_id, 'name': task.project.name},
+        'url': reverse('task_detail', args=[task.project_id, task.id]),
+    }
+
+def _project_json(project):
+    return {
+        'id': project.id,
+        'name': project.name,
+        'status': project.status,
+        'priority': project.priority,
+        'progress': project.progress,
+        'team': {'id': project.team_id, 'name': project.team.name},
+        'url': reverse('project_detail', args=[project.id]),
+    }
+
 @login_required
 @handle_view_errors
 def homepage(request):
     """Homepage view showing dashboard with projects, tasks and activity"""
     try:
         # Get projects with all necessary relationships
-        projects = Project.objects.filter(
-            Q(team__members__user=request.user) |      # Team member projects
-            Q(team__owner=request.user) |              # Owned projects
-            Q(manager=request.user) |                  # Managed projects
-            Q(tasks__assigned_to=request.user)         # Projects with assigned tasks
-        ).distinct().select_related(
+        projects = get_accessible_projects(request.user).select_related(
             'team',
             'manager'
         ).prefetch_related(
@@ -303,40 +365,54 @@ def project_list(request):
         context = get_common_context(request)
         
         # Get all accessible projects
-        projects = Project.objects.filter(
-            Q(team__members__user=request.user) |
-            Q(team__owner=request.user) |
-            Q(manager=request.user) |
-            Q(tasks__assigned_to=request.user)
-        ).distinct().select_related(
-            'team',
-            'manager'
-        ).prefetch_related(
-            'team__members',
-            'tasks',
-            'tasks__assigned_to'
-        ).order_by('-created_at')
-
-        # Split projects by role
-        context.update({
-            'managed_projects': projects.filter(
-                Q(manager=request.user) | Q(team__owner=request.user)
-            ),
-            'team_projects': projects.filter(
-                team__members__user=request.user
-            ).exclude(
-                Q(manager=request.user) | Q(team__owner=request.user)
-            ),
-            'assigned_projects': projects.filter(
-                tasks__assigned_to=request.user
-            ).exclude(
-                Q(team__members__user=request.user) | 
-                Q(manager=request.user) | 
-                Q(team__owner=request.user)
+        # Progress and task totals come from the project counters
+        projects = with_card_data(get_accessible_projects(request.user)).order_by('-created_at')
+
+        # Split projects by role; each section is paginated on its own
+        managed_ids = accessible_project_ids(request.user, MANAGING_ROLES)
+        section_filters = {
+            'managed': Q(pk__in=managed_ids),
+            'team': Q(
+                pk__in=accessible_project_ids(request.user, [ProjectAccess.ROLE_MEMBER])
+            ) & ~Q(pk__in=managed_ids),
+            'assigned': Q(
+                pk__in=accessible_project_ids(request.user, [ProjectAccess.ROLE_ASSIGNEE])
+            ) & ~Q(
+                pk__in=accessible_project_ids(
+                    request.user,
+                    MANAGING_ROLES + [ProjectAccess.ROLE_MEMBER]
+                )
             ),
-            'projects_count': projects.count(),
-            'active_projects_count': projects.filter(status='active').count()
-        })
+        }
+        sections = {name: projects.filter(q) for name, q in section_filters.items()}
+
+        # JSON variant: the next page of one section, for infinite scroll
+        if _wants_json(request):
+            section = request.GET.get('section')
+            if section not in sections:
+                return JsonResponse({'success': False, 'message': 'Unknown section'}, status=400)
+            page = CursorPaginator(sections[section], PROJECTS_PER_SECTION).page(request.GET.get('cursor'))
+            return page_response(
+                request, page, 'projects/includes/project_cards.html', _project_json,
+                show_actions=section == 'managed'
+            )
+
+        # Section and stat totals in one query, pages are not counted
+        context.update(projects.aggregate(
+            projects_count=Count('pk'),
+            active_projects_count=Count('pk', filter=Q(status='active')),
+            **{
+                f'{section}_projects_count': Count('pk', filter=q)
+                for section, q in section_filters.items()
+            }
+        ))
+        for section, queryset in sections.items():
+            cursor = request.GET.get('cursor') if request.GET.get('section') == section else None
+            page = CursorPaginator(queryset, PROJECTS_PER_SECTION).page(cursor)
+            context.update({
+                f'{section}_projects': page,
+                f'{section}_projects_next': page.next_url(request, section=section),
+            })
         
         return render(request, 'projects/project_list.html', context)
 
@@ -604,36 +680,10 @@ def task_update(request, project_id, task_id):
 def team_list(request):
     """Display all teams the user is a member of"""
     # Get teams where user is either owner or member
+    # Member, project and progress figures come from the team counters
     teams = Team.objects.filter(
         Q(owner=request.user) | Q(members__user=request.user)
-    ).prefetch_related(
-        'members',
-        'projects',
-        'projects__tasks'
-    ).annotate(
-        member_count=Count('members', distinct=True),
-        project_count=Count('projects', distinct=True),
-        completed_tasks=Count(
-            'projects__tasks',
-            filter=Q(projects__tasks__status='done'),
-            distinct=True,
-            output_field=FloatField()
-        ),
-        total_tasks=Count(
-            'projects__tasks', 
-            distinct=True,
-            output_field=FloatField()
-        )
-    ).annotate(
-        team_progress=Case(
-            When(total_tasks=0, then=Value(0.0, output_field=FloatField())),
-            default=ExpressionWrapper(
-                (F('completed_tasks') / F('total_tasks')) * 100.0,
-                output_field=FloatField()
-            ),
-            output_field=FloatField()
-        )
-    ).distinct()
+    ).select_related('owner').distinct()
 
     return render(request, 'projects/team_list.html', {
         'teams': teams,
@@ -796,7 +846,7 @@ def team_detail(request, team_id):
             return redirect('team_list')
 
         # Get role-based permissions
-        is_member = TeamMember.objects.filter(team=team, user=request.user).exists()
+        is_member = request.permissions.role_in(team.pk) is not None
         is_manager = request.user.is_project_manager
         is_owner = request.user == team.owner
         
@@ -856,23 +906,37 @@ def team_detail(request, team_id):
         messages.error(request, MSG_ERROR)
         return redirect('team_list')
 
+def _analytics_versions(request):
+    # Buckets move with the calendar, so the day is part of the validator
+    extra = [request.GET.get('range', ''), request.GET.get('granularity', ''), timezone.localdate()]
+    return [(SCOPE_USER, request.user.pk)], extra
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(**version_validators(_analytics_versions))
 @handle_view_errors
 def analytics_data(request):
     """API endpoint for analytics data"""
     try:
-        time_range = int(request.GET.get('range', 7))
+        time_range = min(max(int(request.GET.get('range', 7)), 1), ANALYTICS_MAX_RANGE)
+        granularity = request.GET.get('granularity', GRANULARITY_DAY)
+        if granularity not in GRANULARITIES:
+            return JsonResponse({
+                'error': 'Failed to fetch analytics data',
+                'message': 'Invalid granularity'
+            }, status=400)
         user = request.user
         
         try:
+            timeline_labels = get_timeline_labels(time_range, granularity)
             data = {
-                'timelineLabels': get_timeline_labels(),
-                'completedTasksData': get_completed_tasks_data(user, time_range),
+                'timelineLabels': timeline_labels,
+                'completedTasksData': get_completed_tasks_data(user, time_range, granularity),
                 'taskDistribution': get_task_distribution(user),
                 'teamLabels': [team.name for team in Team.objects.filter(members__user=user)],
                 'teamPerformance': get_team_performance(user),
-                'trendLabels': get_timeline_labels(),
-                'completionTrend': get_completion_trend(user, time_range)  # Add time_range parameter
+                'trendLabels': timeline_labels,
+                'completionTrend': get_completion_trend(user, time_range, granularity)
             }
             
             return JsonResponse(data)
@@ -1014,6 +1078,107 @@ def update_task_status(request, task_id):
             'message': str(e)
         }, status=500)
 
+@login_required
+@handle_view_errors
+def reorder_task(request, task_id):
+    """
+    Persist a Kanban drag. Body: {"previous_id": id, "next_id": id} naming
+    the cards above and below the drop point (null at either end), or the
+    drop index as {"position": n, "list_id": status}.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method'}, status=400)
+    try:
+        task = Task.objects.select_related('project').get(id=task_id)
+    except Task.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'Task not found'}, status=404)
+    if not has_task_permission(request.user, task):
+        return JsonResponse({'success': False, 'message': MSG_PERMISSION_DENIED}, status=403)
+
+    try:
+        data = json.loads(request.body)
+        if 'previous_id' in data or 'next_id' in data:
+            previous_id, next_id = data.get('previous_id'), data.get('next_id')
+        else:
+            status = data.get('list_id') if data.get('list_id') in TASK_STATUSES else None
+            previous_id, next_id = neighbours_at(task, data['position'], status)
+        rank = move_task(
+            task,
+            previous_id=int(previous_id) if previous_id else None,
+            next_id=int(next_id) if next_id else None
+        )
+    except (ValueError, TypeError, KeyError, AttributeError):
+        # RankError is a ValueError: the client's view of the column is stale
+        return JsonResponse({'success': False, 'message': 'Invalid position'}, status=400)
+    except Task.DoesNotExist as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=404)
+    return JsonResponse({'success': True, 'task': {'id': task.pk, 'status': task.status, 'rank': rank}})
+
+@login_required
+@handle_view_errors
+def batch_update_tasks(request):
+    """
+    Apply one set of changes to many tasks, e.g. a multi-card Kanban drag or
+    closing every finished task. Body: {"tasks": [ids], "changes": {...}}
+    with any of status, assigned_to (user id), priority, start_date and
+    due_date. Nothing changes unless every task can be changed.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method'}, status=400)
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'message': 'Invalid request body'}, status=400)
+    try:
+        result = apply_task_changes(request.user, data.get('tasks') or [], data.get('changes'))
+    except ValidationError as e:
+        errors = e.message_dict if hasattr(e, 'error_dict') else None
+        return JsonResponse({
+            'success': False,
+            'message': 'Some tasks cannot be changed' if errors else e.messages[0],
+            'errors': errors
+        }, status=400)
+    except PermissionDenied as e:
+        return JsonResponse({'success': False, 'message': str(e) or MSG_PERMISSION_DENIED}, status=403)
+    except Task.DoesNotExist as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=404)
+    return JsonResponse({'success': True, **result})
+
+@login_required
+@handle_view_errors
+def import_tasks_api(request):
+    """
+    Create many tasks from an uploaded CSV/JSON file (multipart "file") or a
+    JSON/CSV request body. ?skip_invalid=1 inserts the valid rows even when
+    others fail; ?dry_run=1 only validates.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method'}, status=400)
+
+    upload = request.FILES.get('file')
+    if upload is not None:
+        data = upload
+        import_format = request.POST.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+    else:
+        data = request.body
+        import_format = 'csv' if 'csv' in request.content_type else 'json'
+    try:
+        rows = read_rows(data, import_format)
+    except ImportFormatError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    params = request.GET
+    result = import_tasks(
+        rows,
+        importer=request.user,
+        skip_invalid=params.get('skip_invalid') == '1',
+        dry_run=params.get('dry_run') == '1'
+    )
+    ok = not result['failed'] or params.get('skip_invalid') == '1'
+    return JsonResponse({'success': ok, **result}, status=200 if ok else 400)
+
 # Profile Views
 @login_required
 @handle_view_errors
@@ -1064,7 +1229,7 @@ def update_profile(request):
                 if 'profile_picture' in request.FILES:
                     # Delete old profile picture if it exists
                     if profile.profile_picture:
-                        profile.profile_picture.delete(save=False)
+                        queue_file_delete(profile.profile_picture)
                     profile.profile_picture = request.FILES['profile_picture']
                 
                 profile.save()
@@ -1100,7 +1265,7 @@ def remove_avatar(request):
         try:
             profile = request.user.profile
             if profile.profile_picture:
-                profile.profile_picture.delete()  # This will delete the file
+                queue_file_delete(profile.profile_picture)  # Deleted by a worker after commit
                 profile.profile_picture = None    # Set the field to None
                 profile.save()
 
@@ -1220,31 +1385,90 @@ def reports_view(request):
         if request.method == 'POST':
             form = ReportForm(request.POST)
             if form.is_valid():
-                start_date = timezone.make_aware(
-                    datetime.combine(form.cleaned_data['start_date'], datetime.min.time())
-                )
-                end_date = timezone.make_aware(
-                    datetime.combine(form.cleaned_data['end_date'], datetime.max.time())
+                # Generated by a job; a current stored result is reused as-is
+                report, queued = request_report(
+                    request.user,
+                    form.cleaned_data['report_type'],
+                    form.cleaned_data['start_date'],
+                    form.cleaned_data['end_date']
                 )
-                report_type = form.cleaned_data['report_type']
-                
-                report_data = generate_report(request.user, start_date, end_date, report_type)
-                if not report_data:
-                    messages.error(request, MSG_ERROR)
-                    return redirect('reports')
-                    
-                return render(request, 'projects/report_result.html', {
-                    'report_data': report_data,
-                    'form': form
-                })
+                return redirect('report_detail', report_id=report.id)
         else:
             form = ReportForm()
-        return render(request, 'projects/reports.html', {'form': form})
+        return render(request, 'projects/reports.html', {'form': form, 'exports': EXPORT_LABELS})
     except Exception as e:
         logger.error(f"Report generation error: {str(e)}")
         messages.error(request, MSG_ERROR)
         return redirect('homepage')
 
+REPORT_REFRESH_SECONDS = 3
+EXPORT_LABELS = [
+    ('tasks', 'Tasks'),
+    ('projects', 'Projects'),
+    ('team_members', 'Team membership'),
+    ('notifications', 'Notification history'),
+]
+
+@login_required
+@handle_view_errors
+def report_detail(request, report_id):
+    """Result of a scoped report, or a self-refreshing page while it is generated"""
+    report = get_object_or_404(ProjectReport, id=report_id, generated_by=request.user, project__isnull=True)
+    resume_stalled_report(report)
+    if _wants_json(request):
+        return JsonResponse({
+            'status': report.status,
+            'error': report.error,
+            'data': report.data if report.is_ready else None,
+        })
+    return render(request, 'projects/report_result.html', {
+        'report': report,
+        'report_data': report.data if report.is_ready else None,
+        'refresh_seconds': REPORT_REFRESH_SECONDS,
+    })
+
+@login_required
+@handle_view_errors
+def report_download(request, report_id, export_format):
+    """Stream a ready report as CSV or JSON"""
+    if export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export format")
+    report = get_object_or_404(
+        ProjectReport, id=report_id, generated_by=request.user, project__isnull=True,
+        status=ProjectReport.STATUS_READY
+    )
+    columns, rows = report_rows(report)
+    filename = f"{report.report_type}-report-{report.start_date}-{report.end_date}"
+    if export_format == 'json':
+        keys = [key for key, _ in columns]
+        return streaming_download(
+            json_lines(
+                (dict(zip(keys, row)) for row in rows), report_type=report.report_type,
+                start_date=report.start_date, end_date=report.end_date, generated_on=report.completed_at
+            ),
+            f"{filename}.json", JSON_CONTENT_TYPE, request
+        )
+    return streaming_download(
+        csv_lines([header for _, header in columns], rows), f"{filename}.csv", CSV_CONTENT_TYPE, request
+    )
+
+@login_required
+@handle_view_errors
+def export_data(request, export_name, export_format):
+    """
+    Stream tasks, projects, team members or notification history visible to
+    the user as CSV or JSON, optionally filtered by ?team=, ?project=,
+    ?start= and ?end= (YYYY-MM-DD)
+    """
+    if export_name not in EXPORTS or export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export")
+    filters = parse_export_filters(request.GET)
+    content_type = JSON_CONTENT_TYPE if export_format == 'json' else CSV_CONTENT_TYPE
+    filename = f"{export_name}-{timezone.localdate():%Y%m%d}.{export_format}"
+    return streaming_download(
+        export_chunks(export_name, export_format, request.user, **filters), filename, content_type, request
+    )
+
 # Team Member Management Views
 @login_required
 @handle_view_errors
@@ -1452,36 +1676,9 @@ def search_view(request):
                 'message': 'Query too short'
             })
 
-        # Search projects and tasks
-        projects = Project.objects.filter(
-            Q(title__icontains=query) | 
-            Q(description__icontains=query)
-        )[:5]
-
-        tasks = Task.objects.filter(
-            Q(title__icontains=query) | 
-            Q(description__icontains=query)
-        )[:5]
-
-        results = []
-        
-        for project in projects:
-            results.append({
-                'type': 'project',
-                'title': project.title,
-                'url': f'/projects/{project.id}/'
-            })
-            
-        for task in tasks:
-            results.append({
-                'type': 'task',
-                'title': task.title,
-                'url': f'/tasks/{task.id}/'
-            })
-
         return JsonResponse({
             'status': 'success',
-            'results': results
+            'results': search_results(request.user, query)
         })
 
     except Exception as e:
@@ -1490,8 +1687,13 @@ def search_view(request):
             'message': str(e)
         }, status=500)
 
+def _search_versions(request):
+    return [(SCOPE_USER, request.user.pk)], [request.GET.get('q', '').strip()]
+
 @login_required
 @csrf_exempt
+@cache_control(private=True, no_cache=True)
+@condition(**version_validators(_search_versions))
 @handle_view_errors
 def api_search(request):
     query = request.GET.get('q', '').strip()
@@ -1502,38 +1704,9 @@ def api_search(request):
         })
     
     try:
-        projects = Project.objects.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query),
-            team__members__user=request.user
-        ).distinct()[:5]
-        
-        tasks = Task.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query),
-            project__team__members__user=request.user
-        ).distinct()[:5]
-        
-        results = []
-        for project in projects:
-            results.append({
-                'type': 'project',
-                'id': project.id,
-                'title': project.name,
-                'url': reverse('project_detail', args=[project.id])
-            })
-            
-        for task in tasks:
-            results.append({
-                'type': 'task',
-                'id': task.id,
-                'title': task.title,
-                'url': reverse('task_detail', args=[task.project.id, task.id])
-            })
-            
         return JsonResponse({
             'status': 'success',
-            'results': results
+            'results': search_results(request.user, query)
         })
     except Exception as e:
         logger.error(f"API search error: {str(e)}")
@@ -1551,7 +1724,9 @@ def clear_all_notifications(request):
         return JsonResponse({'status': 'error', 'message': 'Invalid request method'})
         
     try:
-        count = Notification.objects.filter(user=request.user).delete()[0]
+        # One DELETE and one counter update instead of signals per row
+        count, _ = delete_notifications(Notification.objects.filter(user=request.user))
+        invalidate_header(request.user.pk)
         return JsonResponse({
             'status': 'success',
             'message': f'Cleared {count} notifications',
@@ -1576,13 +1751,11 @@ def mark_notification_as_read(request, notification_id):
             id=notification_id, 
             user=request.user
         )
-        notification.read = True
-        notification.save()
-        
-        unread_count = Notification.objects.filter(
-            user=request.user, 
-            read=False
-        ).count()
+        unread_count = request.user.unread_notifications_count
+        if not notification.read:
+            notification.read = True
+            notification.save()
+            unread_count = max(unread_count - 1, 0)
         
         return JsonResponse({
             'status': 'success',
@@ -1613,19 +1786,6 @@ def all_team_members(request):
         'members__user__profile',
         'projects',
         'members__user__assigned_tasks'
-    ).annotate(
-        completion_rate=Subquery(
-            Task.objects.filter(
-                project__team=OuterRef('pk'),
-                status='done'
-            ).values('project__team')
-            .annotate(rate=ExpressionWrapper(
-                Cast('id', output_field=FloatField()) * 100.0 / 
-                Cast('project', output_field=FloatField()),
-                output_field=FloatField()
-            ))
-            .values('rate')[:1]
-        )
     ).distinct()
     
     context = {
@@ -1853,50 +2013,33 @@ def task_list(request):
     """View to display all tasks for the current user"""
     # Get tasks by status using the helper function
     tasks_by_status = get_tasks_by_status(request.user)
-    
+    requested_status = request.GET.get('status')
+
+    # JSON variant: the next page of one kanban column, for infinite scroll
+    if _wants_json(request):
+        if requested_status not in TASK_STATUSES:
+            return JsonResponse({'success': False, 'message': 'Unknown status'}, status=400)
+        page = RankCursorPaginator(
+            tasks_by_status[f'{requested_status}_tasks'], TASKS_PER_COLUMN
+        ).page(request.GET.get('cursor'))
+        return page_response(request, page, 'projects/includes/task_cards.html', _task_json)
+
+    # Column totals come from the task rollups rather than counting every task
+    todo_count, inprogress_count, done_count = get_task_distribution(request.user)
     context = {
-        'todo_tasks': tasks_by_status['todo_tasks'],
-        'inprogress_tasks': tasks_by_status['inprogress_tasks'],
-        'done_tasks': tasks_by_status['done_tasks'],
+        'todo_count': todo_count,
+        'inprogress_count': inprogress_count,
+        'done_count': done_count,
         'completion_rate': calculate_completion_rate(request.user)
     }
+    for status in TASK_STATUSES:
+        cursor = request.GET.get('cursor') if requested_status == status else None
+        page = RankCursorPaginator(tasks_by_status[f'{status}_tasks'], TASKS_PER_COLUMN).page(cursor)
+        context[f'{status}_tasks'] = page
+        context[f'{status}_tasks_next'] = page.next_url(request, status=status)
     
     return render(request, 'projects/task_list.html', context)
 
-def base_context(request):
-    """Context processor to add common data to all templates"""
-    if request.user.is_authenticated:
-        user_teams = Team.objects.filter(members__user=request.user).distinct()
-        user_tasks = Task.objects.filter(assigned_to=request.user)
-        
-        return {
-            'unread_notifications': Notification.objects.filter(
-                user=request.user, 
-                read=False
-            ).count(),
-            'user_teams': user_teams,
-            'team_members_count': TeamMember.objects.filter(
-                team__in=user_teams
-            ).distinct().count(),
-            'completed_tasks_count': user_tasks.filter(
-                status=TASK_STATUS_DONE
-            ).count(),
-            'tasks_count': user_tasks.count(),
-            'projects_count': Project.objects.filter(
-                team__in=user_teams
-            ).distinct().count(),
-            'active_projects_count': Project.objects.filter(
-                team__in=user_teams,
-                status='active'
-            ).distinct().count(),
-            'pending_tasks_count': user_tasks.filter(
-                status__in=['todo', 'inprogress']
-            ).count(),
-            'completion_rate': calculate_completion_rate(request.user)
-        }
-    return {}   
-
-
 @login_required
 @handle_view_errors
 def project_stats(request, project_id):
@@ -2083,7 +2226,7 @@ def update_avatar(request):
             
             # Delete old avatar if exists
             if profile.profile_picture:
-                profile.profile_picture.delete(save=False)
+                queue_file_delete(profile.profile_picture)
                 
             profile.profile_picture = image
             profile.save()
@@ -2106,41 +2249,56 @@ def update_avatar(request):
         'message': 'Invalid request method'
     }, status=405)
 
+def _notification_versions(request):
+    if request.headers.get('X-Requested-With') != 'XMLHttpRequest':
+        return None
+    return [(SCOPE_NOTIFICATIONS, request.user.pk)], []
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(**version_validators(_notification_versions))
 def notification_list(request):
     """Display all notifications or return JSON for AJAX requests"""
+    # Handle AJAX requests for JSON data: pages when a cursor is given,
+    # otherwise the polling fallback of the notification stream; unchanged polls already got a 304 from the
+    # notification watermark, the rest are served from the header cache
+    if 'cursor' in request.GET and _wants_json(request):
+        # Next page of the full list, for infinite scroll
+        page = CursorPaginator(
+            Notification.objects.filter(user=request.user)
+        ).page(request.GET['cursor'])
+        return page_response(
+            request, page, 'projects/includes/notification_items.html', _notification_json
+        )
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse(header_payload(request.user))
+
     notifications_queryset = (
         Notification.objects.filter(user=request.user)
         .select_related('user')
-        .order_by('-created_at')
     )
-    
-    unread_count = notifications_queryset.filter(read=False).count()
-    
-    # Handle AJAX requests for JSON data
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return JsonResponse({
-            'notifications': [
-                {
-                    'id': n.id,
-                    'message': n.message,
-                    'created_at': n.created_at.isoformat(),
-                    'read': n.read
-                } for n in notifications_queryset[:5]  # Return latest 5
-            ],
-            'unread_count': unread_count
-        })
+    # Seek on the (user, -created_at) index instead of COUNT(*) plus OFFSET
+    notifications = CursorPaginator(notifications_queryset).page(request.GET.get('cursor'))
 
-    # Handle regular page request
-    paginator = Paginator(notifications_queryset, 10)
-    page = request.GET.get('page')
-    notifications = paginator.get_page(page)
-    
     return render(request, 'projects/notifications.html', {
         'notifications': notifications,
-        'unread_count': unread_count
+        'next_url': notifications.next_url(request),
+        'unread_count': request.user.unread_notifications_count
     })
 
+@login_required
+async def notification_stream(request):
+    """Push notification dropdown updates as Server-Sent Events"""
+    if not isinstance(request, ASGIRequest):
+        # A stream would pin a WSGI worker; 204 tells EventSource to stop
+        # reconnecting, and the client falls back to conditional polling
+        return HttpResponse(status=204)
+    user = await request.auser()
+    response = StreamingHttpResponse(event_stream(user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 def handler404(request, exception):
     """Custom 404 error handler"""
     return render(request, 'errors/404.html', status=404)
@@ -2237,6 +2395,46 @@ def create_team_member(request, team_id, team=None):
         messages.error(request, MSG_ERROR)
         return redirect('manage_team_members', team_id=team_id)
 
+@login_required
+@handle_view_errors
+def import_team_members(request, team_id):
+    """
+    Create accounts for a roster (multipart "file", or a CSV/JSON request
+    body) and add them to the team. Columns: username, email and optionally
+    password, first_name and last_name. ?skip_invalid=1 creates the valid
+    rows even when others fail; ?dry_run=1 only validates.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method'}, status=400)
+    team = get_object_or_404(Team.objects.select_related('owner'), id=team_id)
+    if not team.can_create_team_members(request.user):
+        return JsonResponse({
+            'success': False,
+            'message': "Only team managers or owners can create team members"
+        }, status=403)
+
+    upload = request.FILES.get('file')
+    if upload is not None:
+        data = upload
+        import_format = request.POST.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+    else:
+        data = request.body
+        import_format = 'csv' if 'csv' in request.content_type else 'json'
+    try:
+        rows = read_rows(data, import_format, key='members')
+        params = request.GET
+        result = provision_team_members(
+            team, rows,
+            created_by=request.user,
+            skip_invalid=params.get('skip_invalid') == '1',
+            dry_run=params.get('dry_run') == '1'
+        )
+    except (ImportFormatError, ValidationError) as e:
+        message = e.messages[0] if isinstance(e, ValidationError) else str(e)
+        return JsonResponse({'success': False, 'message': message}, status=400)
+    ok = not result['failed'] or params.get('skip_invalid') == '1'
+    return JsonResponse({'success': ok, **result}, status=200 if ok else 400)
+
 @login_required
 @handle_view_errors
 @transaction_handler
@@ -2339,7 +2537,7 @@ def remove_team_member(request, team_id, member_id):
             team.remove_member(user)
             
             if request.POST.get('notify_member') == 'on':
-                send_team_removal_email(user, team, request.POST.get('reason'))
+                queue_team_removal_email(user, team, request.POST.get('reason'))
             
             return JsonResponse({
                 'success': True,
@@ -2357,7 +2555,13 @@ def remove_team_member(request, team_id, member_id):
         'message': MSG_INVALID_REQUEST
     }, status=400)
 
+def _project_team_versions(request, project_id):
+    # Membership changes bump every project of the team
+    return [(SCOPE_PROJECT, project_id)], []
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(**version_validators(_project_team_versions))
 @handle_view_errors
 def get_project_team_members(request, project_id):
     try:
@@ -282,7 +282,7 @@ const searchSystem = {
                 <a href="${result.url}" 
                    class="d-flex align-items-center gap-2 p-2 text-decoration-none text-body rounded hover-bg-light ${index === 0 ? 'active' : ''}"
                    role="option">
-                    <i class="bi bi-${result.type === 'project' ? 'folder' : 'check-square'} text-primary"></i>
+                    <i class="bi bi-${{ project: 'folder', task: 'check-square', team: 'people' }[result.type] || 'search'} text-primary"></i>
                     <span>${result.title}</span>
                 </a>
             `).join('');
@@ -333,15 +333,17 @@ const searchSystem = {
         state: {
             isLoading: false,
             notifications: [],
-            unreadCount: 0
+            unreadCount: 0,
+            etag: null,
+            stream: null,
+            pollTimer: null
         },
     
         init() {
             // Initialize containers and state
             this.setupToastContainer();
             this.setupNotificationListeners();
-            this.loadInitialNotifications();
-            this.startPeriodicCheck();
+            this.startStream();
         },
     
         setupToastContainer() {
@@ -376,19 +378,18 @@ const searchSystem = {
             this.state.isLoading = true;
         
             try {
-                const response = await fetch('/notifications/?format=json', {
-                    headers: {
-                        'X-Requested-With': 'XMLHttpRequest',
-                        'Accept': 'application/json'
-                    }
-                });
-        
+                const headers = {
+                    'X-Requested-With': 'XMLHttpRequest',
+                    'Accept': 'application/json'
+                };
+                if (this.state.etag) headers['If-None-Match'] = this.state.etag;
+
+                const response = await fetch('/notifications/?format=json', { headers });
+                if (response.status === 304) return;
                 if (!response.ok) throw new Error('Failed to fetch notifications');
         
-                const data = await response.json();
-                this.state.notifications = data.notifications;
-                this.updateNotificationsList(data.notifications);
-                this.updateUnreadCount(data.unread_count);
+                this.state.etag = response.headers.get('ETag');
+                this.applyNotifications(await response.json());
             } catch (error) {
                 console.error('Failed to load notifications:', error);
                 utils.showNotification('Failed to load notifications', 'error');
@@ -497,8 +498,38 @@ const searchSystem = {
             }
         },
     
+        applyNotifications(data) {
+            this.state.notifications = data.notifications;
+            this.updateNotificationsList(data.notifications);
+            this.updateUnreadCount(data.unread_count);
+        },
+
+        startStream() {
+            // Server-Sent Events push every change; fall back to polling when
+            // the browser or server (e.g. a WSGI deployment) cannot stream
+            if (!window.EventSource) {
+                this.startPeriodicCheck();
+                return;
+            }
+            const stream = new EventSource('/notifications/stream/');
+            stream.addEventListener('notifications', e => {
+                this.applyNotifications(JSON.parse(e.data));
+            });
+            stream.onerror = () => {
+                if (stream.readyState === EventSource.CLOSED) {
+                    this.state.stream = null;
+                    this.startPeriodicCheck();
+                }
+            };
+            this.state.stream = stream;
+        },
+
         startPeriodicCheck() {
-            setInterval(async () => {
+            if (this.state.pollTimer) return;
+            this.loadInitialNotifications();
+            this.state.pollTimer = setInterval(async () => {
+                // Hidden tabs skip polls; conditional requests keep the rest cheap
+                if (document.hidden) return;
                 await this.loadInitialNotifications();
             }, 30000); // Check every 30 seconds
         }
@@ -675,6 +706,86 @@ const statsSystem = {
     }
 };
 
+// Infinite Scroll System
+// Containers marked data-infinite-scroll carry the URL of their next page in
+// data-next-url; the "Load more" link rendered after them (marked
+// data-infinite-scroll-fallback="<container id>") doubles as the sentinel.
+// Pages are fetched as JSON and their rendered html is appended as-is.
+const infiniteScrollSystem = {
+    state: {
+        loading: new Set()
+    },
+
+    init() {
+        this.containers = document.querySelectorAll('[data-infinite-scroll]');
+        if (!this.containers?.length || !('IntersectionObserver' in window)) return;
+
+        this.observer = new IntersectionObserver(
+            (entries) => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        this.loadMore(entry.target);
+                    }
+                });
+            },
+            { rootMargin: '200px' }
+        );
+
+        this.containers.forEach(container => {
+            const sentinel = this.getSentinel(container);
+            if (!sentinel) return;
+            sentinel.addEventListener('click', (e) => {
+                e.preventDefault();
+                this.loadMore(sentinel);
+            });
+            this.observer.observe(sentinel);
+        });
+    },
+
+    getSentinel(container) {
+        return container.id
+            ? document.querySelector(`[data-infinite-scroll-fallback="${container.id}"]`)
+            : null;
+    },
+
+    async loadMore(sentinel) {
+        const container = document.getElementById(sentinel.dataset.infiniteScrollFallback);
+        const url = container?.dataset.nextUrl;
+        if (!url || this.state.loading.has(container.id)) return;
+
+        this.state.loading.add(container.id);
+        sentinel.classList.add('loading');
+        try {
+            const response = await fetch(url, {
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest',
+                    'Accept': 'application/json'
+                }
+            });
+            if (!response.ok) throw new Error('Failed to load more items');
+
+            const data = await response.json();
+            container.insertAdjacentHTML('beforeend', data.html);
+            container.dataset.nextUrl = data.next_url || '';
+
+            if (!data.next_url) {
+                this.observer.unobserve(sentinel);
+                sentinel.remove();
+            } else {
+                // Re-observing reports the sentinel again if it is still in view
+                this.observer.unobserve(sentinel);
+                this.observer.observe(sentinel);
+            }
+        } catch (error) {
+            console.error('Infinite scroll error:', error);
+            utils.showNotification('Failed to load more items', 'error');
+        } finally {
+            this.state.loading.delete(container.id);
+            sentinel.classList.remove('loading');
+        }
+    }
+};
+
 // Update visibility handler
 document.addEventListener('visibilitychange', () => {
     if (document.visibilityState === 'visible') {
@@ -772,8 +883,13 @@ const taskSystem = {
         const newStatus = evt.to.dataset.status;
         const oldStatus = evt.from.dataset.status;
     
-        // Don't make API call if status hasn't changed
-        if (newStatus === oldStatus) return;
+        // Same column: only the order changed
+        if (newStatus === oldStatus) {
+            if (evt.oldIndex !== evt.newIndex) {
+                await this.handleTaskReorder(evt);
+            }
+            return;
+        }
         
         try {
             // Update URL to match Django URL pattern
@@ -800,6 +916,7 @@ const taskSystem = {
             if (data.success) {
                 utils.showNotification(data.message || `Task moved to ${newStatus}`, 'success');
                 this.updateTaskCounts();
+                await this.handleTaskReorder(evt);
                 
                 // Update completion rate if provided
                 if (data.completion_rate !== undefined) {
@@ -1252,15 +1369,19 @@ const logoutSystem = {
 };
 
 taskSystem.handleTaskReorder = async function(evt) {
-    if (!evt?.item?.dataset?.taskId || evt.newIndex === undefined) {
+    const taskId = evt?.item?.dataset?.taskId || evt?.item?.dataset?.id;
+    if (!taskId || evt.newIndex === undefined) {
         console.error('Invalid task reorder event:', evt);
         return;
     }
 
-    const taskId = evt.item.dataset.taskId;
     const newIndex = evt.newIndex;
-    const listId = evt.to.dataset.listId;
+    const listId = evt.to.dataset.listId || evt.to.dataset.status;
     const originalPosition = evt.oldIndex;
+    // The cards around the drop point; the server ranks the task between them
+    const cardId = card => card ? (card.dataset.taskId || card.dataset.id || null) : null;
+    const previousId = cardId(evt.item.previousElementSibling);
+    const nextId = cardId(evt.item.nextElementSibling);
 
     try {
         const response = await fetch(`/api/tasks/${taskId}/reorder/`, {
@@ -1271,6 +1392,8 @@ taskSystem.handleTaskReorder = async function(evt) {
                 'X-Requested-With': 'XMLHttpRequest'
             },
             body: JSON.stringify({ 
+                previous_id: previousId,
+                next_id: nextId,
                 position: newIndex,
                 list_id: listId,
                 original_position: originalPosition
@@ -1355,6 +1478,9 @@ document.addEventListener('DOMContentLoaded', function() {
         if (document.querySelector('.task-list')) {
             taskSystem.init();
         }
+        if (document.querySelector('[data-infinite-scroll]')) {
+            infiniteScrollSystem.init();
+        }
 
         // Core functionality systems
         keyboardShortcuts.init();
@@ -1374,6 +1500,7 @@ document.addEventListener('DOMContentLoaded', function() {
             notificationSystem,
             keyboardShortcuts,
             taskSystem,
+            infiniteScrollSystem,
             modalSystem,
             formSystem,
             loadingSystem